@@ -0,0 +1,154 @@
+"""Synthetic, offline fixtures shared by the benchmarks"""
+import fitz  # PyMuPDF
+
+LINE = "Led a team of engineers delivering payment services, cutting latency by 35% and costs by 20%."
+
+
+def make_resume_pdf(
+    pages: int = 1,
+    lines_per_page: int = 45,
+    image_pages: int = 0,
+    images_per_page: int = 0
+) -> bytes:
+    """
+    Build a resume PDF with the given number of text pages, followed by
+    image_pages pages that carry only an image (like a scanned page).
+    images_per_page adds distinct photo-sized images to every text page.
+    """
+    doc = fitz.open()
+    for _ in range(image_pages):
+        page = doc.new_page(-1)
+        pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 600, 800), False)
+        pixmap.clear_with(200)
+        page.insert_image(page.rect, pixmap=pixmap)
+    for page_number in range(pages):
+        page = doc.new_page(page_number)
+        y = 72
+        page.insert_text((72, y), f"Jane Doe - page {page_number + 1}", fontsize=16)
+        for line in range(lines_per_page):
+            y += 15
+            page.insert_text((72, y), f"{line + 1}. {LINE}", fontsize=9)
+        for image in range(images_per_page):
+            pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 300, 300), False)
+            pixmap.clear_with((page_number * images_per_page + image) % 256)
+            x = 420 + (image % 2) * 80
+            y = 72 + (image // 2) * 80
+            page.insert_image(fitz.Rect(x, y, x + 72, y + 72), pixmap=pixmap)
+    pdf_bytes = doc.tobytes()
+    doc.close()
+    return pdf_bytes
+
+
+def make_resume_content(experience_entries: int = 5) -> dict:
+    """Build a structured resume in the shape AIService returns"""
+    return {
+        "contact_info": {
+            "name": "Jane Doe",
+            "email": "jane@example.com",
+            "phone": "+1 555 0100",
+            "location": "Austin, TX",
+            "linkedin": "linkedin.com/in/janedoe",
+        },
+        "summary": "Backend engineer with ten years of experience building reliable payment platforms.",
+        "experience": [
+            {
+                "title": "Senior Software Engineer",
+                "company": f"Company {i}",
+                "duration": "2018 - 2022",
+                "location": "Remote",
+                "achievements": [LINE, LINE.replace("payment", "search"), LINE.replace("35%", "50%")],
+            }
+            for i in range(experience_entries)
+        ],
+        "education": [
+            {"degree": "BSc Computer Science", "school": "State University", "graduation": "2012"}
+        ],
+        "skills": ["Python", "Go", "PostgreSQL", "Kafka", "Kubernetes", "AWS"],
+        "certifications": ["AWS Solutions Architect"],
+    }
+
+
+DATA_SCIENTIST_RESUME = {
+    "contact_info": {"name": "Sam Lee", "email": "sam@example.com", "location": "Boston, MA"},
+    "summary": "Data scientist applying statistics and machine learning to pricing and churn problems.",
+    "experience": [
+        {
+            "title": "Data Scientist",
+            "company": "Retail Analytics Co",
+            "duration": "2019 - 2024",
+            "achievements": [
+                "Built churn prediction models in Python with scikit-learn and XGBoost, lifting retention 8%",
+                "Designed A/B tests and causal analyses for pricing experiments",
+                "Automated feature pipelines in SQL and Airflow on Snowflake",
+            ],
+        }
+    ],
+    "education": [{"degree": "MSc Statistics", "school": "Tech Institute", "graduation": "2019"}],
+    "skills": ["Python", "SQL", "Pandas", "scikit-learn", "XGBoost", "Statistics", "Airflow", "Tableau"],
+}
+
+MARKETING_RESUME = {
+    "contact_info": {"name": "Alex Kim", "email": "alex@example.com", "location": "Chicago, IL"},
+    "summary": "Marketing manager running brand campaigns and social media for consumer products.",
+    "experience": [
+        {
+            "title": "Marketing Manager",
+            "company": "Consumer Brands Inc",
+            "duration": "2017 - 2024",
+            "achievements": [
+                "Ran social media and influencer campaigns that grew followers 120%",
+                "Managed a $2M advertising budget across search, display and print",
+                "Coordinated product launches with sales and creative agencies",
+            ],
+        }
+    ],
+    "education": [{"degree": "BA Communications", "school": "City College", "graduation": "2016"}],
+    "skills": ["Brand strategy", "Social media", "Copywriting", "Google Ads", "Campaign management"],
+}
+
+BACKEND_POSTING = """
+Senior Backend Engineer. We are looking for a backend engineer to build and scale our payment
+platform. You will design services in Python and Go, own PostgreSQL schemas, run event streaming on
+Kafka and deploy to Kubernetes on AWS. Requirements: 5+ years of backend engineering experience,
+strong Python or Go, PostgreSQL, Kafka, Kubernetes, AWS, experience with payment systems and
+reliability engineering. Nice to have: Terraform, gRPC, observability with Prometheus.
+"""
+
+DATA_POSTING = """
+Data Scientist, Growth. Join our analytics team to build machine learning models for churn, pricing
+and customer lifetime value. You will run A/B tests, design experiments and communicate results to
+stakeholders. Requirements: strong Python and SQL, pandas, scikit-learn, statistics and experiment
+design, experience with Airflow or similar orchestration, dashboards in Tableau or Looker. An MSc in
+statistics, mathematics or a related field is preferred.
+"""
+
+FRONTEND_POSTING = """
+Frontend Engineer. Build delightful user interfaces for our web application using React, TypeScript
+and Next.js. You will work closely with designers on accessibility, component libraries and
+performance. Requirements: 3+ years with React and TypeScript, CSS, testing with Jest and Playwright,
+REST and GraphQL APIs. Experience with Python or backend services is a plus.
+"""
+
+MARKETING_POSTING = """
+Brand Marketing Manager. Lead integrated marketing campaigns for our consumer products across social
+media, influencer partnerships, paid search and events. You will own the brand strategy, manage agency
+relationships and the advertising budget, and report on campaign performance. Requirements: 5+ years
+in brand or campaign management, copywriting skills, Google Ads, social media strategy.
+"""
+
+# Hand-graded fit of each resume for each posting (0-100), used as the
+# reference for score correlation when no live model is available
+MATCH_FIXTURES = [
+    (make_resume_content(3), BACKEND_POSTING, 90),
+    (make_resume_content(3), DATA_POSTING, 30),
+    (make_resume_content(3), FRONTEND_POSTING, 35),
+    (make_resume_content(3), MARKETING_POSTING, 5),
+    (DATA_SCIENTIST_RESUME, BACKEND_POSTING, 30),
+    (DATA_SCIENTIST_RESUME, DATA_POSTING, 90),
+    (DATA_SCIENTIST_RESUME, FRONTEND_POSTING, 15),
+    (DATA_SCIENTIST_RESUME, MARKETING_POSTING, 15),
+    (MARKETING_RESUME, BACKEND_POSTING, 5),
+    (MARKETING_RESUME, DATA_POSTING, 15),
+    (MARKETING_RESUME, FRONTEND_POSTING, 10),
+    (MARKETING_RESUME, MARKETING_POSTING, 90),
+]
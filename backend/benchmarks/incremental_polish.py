@@ -0,0 +1,116 @@
+"""
+Benchmark: incremental (per-section) re-polish versus polishing everything again.
+
+Simulates an edit loop on a structured resume: each round changes one
+achievement in one experience entry and polishes again. "full" re-polishes the
+whole resume every round (prose-only, no cache); "incremental" goes through
+AIService.polish_sections with the previous version, so only the edited entry
+is sent. Reports prompt tokens and latency per round. Offline, the fake
+backend models prompt processing at --prefill-ms-per-1k-tokens, output at
+--output-ms-per-1k-tokens, plus a fixed --latency:
+
+    python -m benchmarks.incremental_polish --entries 8 --edits 10
+"""
+import os
+import json
+import copy
+import time
+import asyncio
+import argparse
+import statistics
+
+os.environ.setdefault("LLM_BACKEND", "fake")
+
+from services.ai_service import AIService  # noqa: E402
+from services.llm_client import FakeBackend, LLMClient  # noqa: E402
+from services.prompt_format import estimate_tokens  # noqa: E402
+from benchmarks.fixtures import make_resume_content  # noqa: E402
+
+
+class ProseEcho:
+    """Fake model reply for prose prompts: the same sections, reworded, with token counts kept"""
+
+    def __init__(self, output_seconds_per_token: float):
+        self.output_seconds_per_token = output_seconds_per_token
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+
+    def __call__(self, prompt: str) -> str:
+        prose = json.loads(prompt.split("RESUME:\n", 1)[1])
+        reply = {
+            "experience": [{"achievements": [f"Delivered: {line}" for line in entry["achievements"]]}
+                           for entry in prose["experience"]],
+            "improvements_made": ["Stronger action verbs"],
+        }
+        if "summary" in prose:
+            reply["summary"] = f"Accomplished {prose['summary']}"
+        response = json.dumps(reply)
+        self.prompt_tokens += estimate_tokens(prompt)
+        self.output_tokens += estimate_tokens(response)
+        # Output time isn't modelled by FakeBackend itself
+        time.sleep(estimate_tokens(response) * self.output_seconds_per_token)
+        return response
+
+
+def _edit(content: dict, round_index: int) -> dict:
+    edited = copy.deepcopy(content)
+    entry = edited["experience"][round_index % len(edited["experience"])]
+    entry["achievements"][0] = f"Reworked the on-call rotation, round {round_index}."
+    return edited
+
+
+async def run(mode: str, entries: int, edits: int, args) -> dict:
+    echo = ProseEcho(args.output_ms_per_1k_tokens / 1e6)
+    ai = AIService(llm=LLMClient(FakeBackend(
+        latency=args.latency, responder=echo, prefill_seconds_per_token=args.prefill_ms_per_1k_tokens / 1e6
+    )), cache=None)
+
+    content = make_resume_content(entries)
+    polished, _ = await ai.polish_sections(content)
+    echo.prompt_tokens = echo.output_tokens = 0
+
+    samples = []
+    for round_index in range(edits):
+        edited = _edit(content, round_index)
+        started = time.perf_counter()
+        if mode == "incremental":
+            polished, _ = await ai.polish_sections(edited, content, polished)
+        else:
+            polished, _ = await ai.polish_sections(edited)
+        samples.append((time.perf_counter() - started) * 1000)
+        content = edited
+
+    return {
+        "mode": mode,
+        "entries": entries,
+        "edits": edits,
+        "prompt_tokens_per_edit": round(echo.prompt_tokens / edits),
+        "output_tokens_per_edit": round(echo.output_tokens / edits),
+        "median_ms": round(statistics.median(samples), 1),
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entries", type=int, nargs="+", default=[4, 8, 16])
+    parser.add_argument("--edits", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.3, help="Fake fixed latency in seconds")
+    parser.add_argument("--prefill-ms-per-1k-tokens", type=float, default=200)
+    parser.add_argument("--output-ms-per-1k-tokens", type=float, default=10000,
+                        help="Fake generation time per 1000 output tokens")
+    args = parser.parse_args()
+
+    report = []
+    for entries in args.entries:
+        rows = {mode: asyncio.run(run(mode, entries, args.edits, args)) for mode in ("full", "incremental")}
+        rows["incremental"]["token_reduction"] = round(
+            (rows["full"]["prompt_tokens_per_edit"] + rows["full"]["output_tokens_per_edit"])
+            / (rows["incremental"]["prompt_tokens_per_edit"] + rows["incremental"]["output_tokens_per_edit"]), 1
+        )
+        rows["incremental"]["speedup"] = round(rows["full"]["median_ms"] / rows["incremental"]["median_ms"], 1)
+        report += rows.values()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,90 @@
+"""
+Benchmark: saved-posting search with the memory-mapped job index.
+
+Fills a fresh index in a temp directory with synthetic postings, then measures
+ingest throughput, search latency for a resume (the /api/jobs/search path) and
+incremental delete/add cost. Runs offline:
+
+    python -m benchmarks.job_search --postings 10000
+"""
+import json
+import time
+import random
+import argparse
+import tempfile
+import statistics
+
+from services.job_index import JobIndex
+from services.job_match_service import JobMatchService
+from services.llm_client import FakeBackend, LLMClient
+from benchmarks.fixtures import BACKEND_POSTING, DATA_POSTING, FRONTEND_POSTING, MARKETING_POSTING, make_resume_content
+
+TEMPLATES = [BACKEND_POSTING, DATA_POSTING, FRONTEND_POSTING, MARKETING_POSTING]
+
+
+def make_posting(rng: random.Random) -> str:
+    """Shuffle sentences of the fixture postings into a new posting"""
+    sentences = [s for template in rng.sample(TEMPLATES, 2) for s in template.split(". ")]
+    rng.shuffle(sentences)
+    return ". ".join(sentences[: rng.randint(4, len(sentences))])
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--postings", type=int, default=10000)
+    parser.add_argument("--searches", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    postings = [{"title": f"Posting {i}", "text": make_posting(rng)} for i in range(args.postings)]
+    resume_text = JobMatchService(llm=LLMClient(FakeBackend(0))).resume_text(
+        make_resume_content(5)
+    )
+
+    with tempfile.TemporaryDirectory() as path:
+        index = JobIndex(path)
+        started = time.perf_counter()
+        ids = []
+        for offset in range(0, len(postings), 500):
+            ids.extend(index.add(postings[offset:offset + 500]))
+        ingest_seconds = time.perf_counter() - started
+
+        latencies = []
+        for _ in range(args.searches):
+            started = time.perf_counter()
+            index.search(resume_text, args.top_k)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        for posting_id in ids[:100]:
+            index.delete(posting_id)
+        delete_ms = (time.perf_counter() - started) * 10
+        started = time.perf_counter()
+        for posting in postings[:100]:
+            index.add([posting])
+        add_ms = (time.perf_counter() - started) * 10
+
+        # Reopening reads only the slot table; vectors stay memory-mapped
+        started = time.perf_counter()
+        reopened = JobIndex(path)
+        reopened.search(resume_text, args.top_k)
+        reopen_ms = (time.perf_counter() - started) * 1000
+        stats = reopened.stats()
+
+    print(json.dumps({
+        "postings": args.postings,
+        "dim": stats["dim"],
+        "capacity": stats["capacity"],
+        "ingest_postings_per_s": round(args.postings / ingest_seconds),
+        "search_p50_ms": round(statistics.median(latencies), 2),
+        "search_p99_ms": round(statistics.quantiles(latencies, n=100)[98], 2),
+        "delete_ms_each": round(delete_ms, 3),
+        "incremental_add_ms_each": round(add_ms, 3),
+        "reopen_and_first_search_ms": round(reopen_ms, 1),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,122 @@
+"""
+Benchmark: keyword matching in JobMatchService._analyze_keywords.
+
+Compares the term-index matcher against the previous substring scan over
+json.dumps(resume) on synthetic large resumes and postings, and measures how
+many "found" keywords are false positives (substring hits such as "java" in
+"javascript", or JSON key names such as "achievements"). Runs offline:
+
+    python -m benchmarks.keyword_match --postings 200 --experience 40
+"""
+import os
+import re
+import json
+import time
+import random
+import argparse
+
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark-dummy-key")
+
+from services.job_match_service import JobMatchService  # noqa: E402
+
+VOCABULARY = [
+    "python", "javascript", "typescript", "react", "docker", "kubernetes", "terraform",
+    "postgresql", "redis", "kafka", "spark", "airflow", "graphql", "microservices",
+    "leadership", "mentoring", "budgeting", "forecasting", "negotiation", "salesforce",
+    "analytics", "tableau", "excel", "agile", "scrum", "devops", "security", "compliance",
+    "marketing", "branding", "copywriting", "recruiting", "onboarding", "logistics",
+]
+# Terms that the old matcher finds as substrings of resume text or JSON keys
+TRAPS = ["java", "script", "type", "act", "post", "achievements", "company", "title", "duration", "skill"]
+
+
+def _legacy_analyze_keywords(service, resume_content, job_description):
+    """The previous implementation, kept here for comparison"""
+    job_keywords = service._extract_keywords(job_description.lower())
+    resume_text = json.dumps(resume_content).lower()
+    missing_keywords = [kw for kw in job_keywords if kw not in resume_text]
+    found_keywords = [kw for kw in job_keywords if kw in resume_text]
+    return found_keywords, missing_keywords
+
+
+def make_resume(rng: random.Random, experience_entries: int) -> dict:
+    words = VOCABULARY[: len(VOCABULARY) // 2]
+    return {
+        "contact_info": {"name": "Jane Doe", "email": "jane@example.com", "location": "Austin, TX"},
+        "summary": "Engineer focused on " + ", ".join(rng.sample(words, 5)),
+        "experience": [
+            {
+                "title": "Senior Engineer",
+                "company": f"Company {i}",
+                "duration": "2015 - 2020",
+                "location": "Remote",
+                "achievements": [
+                    "Delivered " + " and ".join(rng.sample(words, 3)) + " projects for customers"
+                    for _ in range(4)
+                ],
+            }
+            for i in range(experience_entries)
+        ],
+        "education": [{"degree": "BSc Computer Science", "school": "State University"}],
+        "skills": rng.sample(words, 10),
+    }
+
+
+def make_posting(rng: random.Random, length: int) -> str:
+    terms = rng.sample(VOCABULARY, 12) + rng.sample(TRAPS, 4)
+    filler = ["we", "are", "looking", "for", "a", "candidate", "with", "strong", "experience", "in"]
+    tokens = [rng.choice(terms + filler) for _ in range(length)]
+    return " ".join(tokens)
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--postings", type=int, default=200)
+    parser.add_argument("--experience", type=int, default=40)
+    parser.add_argument("--posting-words", type=int, default=600)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    service = JobMatchService()
+    resume = make_resume(rng, args.experience)
+    postings = [make_posting(rng, args.posting_words) for _ in range(args.postings)]
+
+    # Ground truth: whole terms that appear in resume field values
+    truth = set(re.findall(r"[a-z]+", " ".join(service._iter_field_values(resume)).lower()))
+
+    started = time.perf_counter()
+    legacy_false_positives = legacy_found = 0
+    for posting in postings:
+        found, _ = _legacy_analyze_keywords(service, resume, posting)
+        legacy_found += len(found)
+        legacy_false_positives += sum(1 for kw in found if kw not in truth)
+    legacy_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    terms = service._index_resume(resume)
+    indexed_false_positives = indexed_found = 0
+    for posting in postings:
+        result = service._analyze_keywords(resume, posting, terms)["keyword_analysis"]
+        indexed_found += result["matched_keywords"]
+    indexed_seconds = time.perf_counter() - started
+    for posting in postings:
+        keywords = service._extract_keywords(posting)
+        indexed_false_positives += sum(1 for kw in keywords if kw in terms and kw not in truth)
+
+    print(json.dumps({
+        "postings": args.postings,
+        "experience_entries": args.experience,
+        "resume_json_chars": len(json.dumps(resume)),
+        "legacy_seconds": round(legacy_seconds, 4),
+        "indexed_seconds": round(indexed_seconds, 4),
+        "speedup": round(legacy_seconds / indexed_seconds, 1) if indexed_seconds else None,
+        "legacy_found": legacy_found,
+        "legacy_false_positives": legacy_false_positives,
+        "indexed_found": indexed_found,
+        "indexed_false_positives": indexed_false_positives,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main_cli()
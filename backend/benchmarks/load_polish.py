@@ -0,0 +1,141 @@
+"""
+Load test: /health latency while many /api/polish calls are in flight.
+
+The Gemini backend is replaced by the fake backend with a fixed latency, so this runs offline.
+Run from the backend directory:
+
+    python -m benchmarks.load_polish --polish-calls 50 --latency 0.5
+
+The "blocking" mode makes the fake backend sleep synchronously, the way the old
+code called the model on the event loop, to show the difference.
+"""
+import os
+import json
+import time
+import socket
+import asyncio
+import argparse
+import logging
+import statistics
+import threading
+
+os.environ.setdefault("LLM_BACKEND", "fake")
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+
+import main  # noqa: E402
+from services.llm_client import FakeBackend, LLMClient  # noqa: E402
+
+RESUME_TEXT = "Jane Doe\nSoftware Engineer with ten years of experience building web services. " * 4
+
+
+def resume_text(index: int) -> str:
+    """A distinct resume per request, so identical calls aren't coalesced into one model call"""
+    return f"Candidate {index}\n{RESUME_TEXT}"
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(app, port: int) -> uvicorn.Server:
+    """Run the app in a background thread with its own event loop"""
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+
+def _probe(base_url: str, stop: threading.Event, interval: float, samples: list):
+    with httpx.Client(base_url=base_url) as client:
+        while not stop.is_set():
+            started = time.perf_counter()
+            client.get("/health")
+            samples.append((time.perf_counter() - started) * 1000)
+            time.sleep(interval)
+
+
+def _probe_for(base_url: str, seconds: float, interval: float) -> list:
+    samples = []
+    stop = threading.Event()
+    thread = threading.Thread(target=_probe, args=(base_url, stop, interval, samples))
+    thread.start()
+    time.sleep(seconds)
+    stop.set()
+    thread.join()
+    return samples
+
+
+async def _polish_load(base_url: str, calls: int) -> list:
+    limits = httpx.Limits(max_connections=calls)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=None) as client:
+        return await asyncio.gather(*[
+            client.post("/api/polish", json={"text": resume_text(i)}) for i in range(calls)
+        ])
+
+
+def run(mode: str, polish_calls: int, latency: float, probe_interval: float) -> dict:
+    main.ai_service.llm = LLMClient(FakeBackend(latency, blocking=mode == "blocking"))
+    # Every run has to reach the model, not the previous run's cached results
+    main.result_cache.clear()
+    calls_before = main.ai_service.inflight.calls
+
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = start_server(main.app, port)
+    try:
+        idle = _probe_for(base_url, 0.5, probe_interval)
+
+        loaded = []
+        stop = threading.Event()
+        prober = threading.Thread(target=_probe, args=(base_url, stop, probe_interval, loaded))
+        prober.start()
+        started = time.perf_counter()
+        results = asyncio.run(_polish_load(base_url, polish_calls))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        prober.join()
+    finally:
+        server.should_exit = True
+
+    return {
+        "mode": mode,
+        "polish_calls": polish_calls,
+        "model_latency_s": latency,
+        "polish_ok": sum(1 for r in results if r.status_code == 200),
+        "model_calls": main.ai_service.inflight.calls - calls_before,
+        "polish_wall_s": round(elapsed, 3),
+        "health_idle_p50_ms": round(statistics.median(idle), 2),
+        "health_idle_p99_ms": round(percentile(idle, 99), 2),
+        "health_loaded_samples": len(loaded),
+        "health_loaded_p50_ms": round(statistics.median(loaded), 2),
+        "health_loaded_p99_ms": round(percentile(loaded, 99), 2),
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--polish-calls", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--probe-interval", type=float, default=0.01)
+    parser.add_argument("--mode", choices=["async", "blocking", "both"], default="both")
+    args = parser.parse_args()
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    modes = ["blocking", "async"] if args.mode == "both" else [args.mode]
+    report = [run(mode, args.polish_calls, args.latency, args.probe_interval) for mode in modes]
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,108 @@
+"""
+Benchmark: local match scoring versus a model analysis for /api/analyze.
+
+For every resume/posting pair in fixtures.MATCH_FIXTURES, measures the local
+scorer's latency and the model analysis latency, and reports how well the local
+score correlates with the reference score and how many requests depth="auto"
+would answer without the model. Runs offline with the fake backend (reference =
+hand-graded fit); with --live the real model is called and its match_score
+becomes the reference:
+
+    python -m benchmarks.match_prefilter --llm-latency 1.5
+    GOOGLE_API_KEY=... python -m benchmarks.match_prefilter --live
+"""
+import os
+import sys
+import json
+import math
+import time
+import asyncio
+import argparse
+import statistics
+
+if "--live" not in sys.argv:
+    os.environ.setdefault("LLM_BACKEND", "fake")
+
+from services.llm_client import FakeBackend, LLMClient, get_llm_client  # noqa: E402
+from services.job_match_service import (  # noqa: E402
+    JobMatchService, LOCAL_MATCH_LLM_MIN_SCORE, LOCAL_MATCH_LLM_MAX_SCORE
+)
+from benchmarks.fixtures import MATCH_FIXTURES  # noqa: E402
+
+
+def pearson(xs, ys) -> float:
+    mean_x, mean_y = statistics.fmean(xs), statistics.fmean(ys)
+    cov = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    var_x = sum((x - mean_x) ** 2 for x in xs)
+    var_y = sum((y - mean_y) ** 2 for y in ys)
+    return cov / math.sqrt(var_x * var_y) if var_x and var_y else 0.0
+
+
+def ranks(values):
+    """Average ranks (ties share the mean rank), for Spearman correlation"""
+    order = sorted(range(len(values)), key=lambda i: values[i])
+    result = [0.0] * len(values)
+    start = 0
+    while start < len(order):
+        end = start
+        while end + 1 < len(order) and values[order[end + 1]] == values[order[start]]:
+            end += 1
+        for position in range(start, end + 1):
+            result[order[position]] = (start + end) / 2 + 1
+        start = end + 1
+    return result
+
+
+async def run(service: JobMatchService, repeats: int, live: bool) -> dict:
+    local_ms, llm_ms, auto_ms = [], [], []
+    local_scores, reference_scores = [], []
+    skipped = 0
+    for resume, posting, grade in MATCH_FIXTURES:
+        started = time.perf_counter()
+        for _ in range(repeats):
+            local = await service.analyze_job_match(resume, posting, depth="local")
+        local_ms.append((time.perf_counter() - started) / repeats * 1000)
+
+        started = time.perf_counter()
+        full = await service.analyze_job_match(resume, posting, depth="full")
+        llm_ms.append((time.perf_counter() - started) * 1000)
+
+        ambiguous = LOCAL_MATCH_LLM_MIN_SCORE <= local["match_score"] <= LOCAL_MATCH_LLM_MAX_SCORE
+        skipped += not ambiguous
+        auto_ms.append(llm_ms[-1] if ambiguous else local_ms[-1])
+        local_scores.append(local["match_score"])
+        reference_scores.append(full["match_score"] if live else grade)
+
+    return {
+        "pairs": len(MATCH_FIXTURES),
+        "reference": "live model match_score" if live else "hand-graded fit",
+        "local_ms_mean": round(statistics.fmean(local_ms), 3),
+        "local_ms_max": round(max(local_ms), 3),
+        "llm_ms_mean": round(statistics.fmean(llm_ms), 1),
+        "auto_ms_mean": round(statistics.fmean(auto_ms), 1),
+        "auto_llm_skipped": skipped,
+        "ambiguous_band": [LOCAL_MATCH_LLM_MIN_SCORE, LOCAL_MATCH_LLM_MAX_SCORE],
+        "pearson": round(pearson(local_scores, reference_scores), 3),
+        "spearman": round(pearson(ranks(local_scores), ranks(reference_scores)), 3),
+        "scores": [
+            {"local": local_score, "reference": reference}
+            for local_score, reference in zip(local_scores, reference_scores)
+        ],
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--llm-latency", type=float, default=1.5,
+                        help="Fake model latency in seconds (ignored with --live)")
+    parser.add_argument("--repeats", type=int, default=200, help="Local scoring repetitions per pair")
+    parser.add_argument("--live", action="store_true", help="Call the real model (needs GOOGLE_API_KEY)")
+    args = parser.parse_args()
+
+    llm = get_llm_client() if args.live else LLMClient(FakeBackend(args.llm_latency))
+    service = JobMatchService(llm=llm)
+    print(json.dumps(asyncio.run(run(service, args.repeats, args.live)), indent=2))
+
+
+if __name__ == "__main__":
+    main_cli()
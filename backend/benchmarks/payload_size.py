@@ -0,0 +1,121 @@
+"""
+Benchmark: bytes on the wire and JSON serialization time for upload and polish.
+
+Calls /api/upload and /api/polish in-process for a rendered resume with
+--entries experience entries and reports the response size as sent for
+each Accept-Encoding, with and without include_original=false or a
+fields= projection. Then times serializing the same bodies the way
+FastAPI's JSONResponse does (jsonable_encoder + json.dumps) against
+json.dumps alone and orjson. Runs offline with the fake model backend:
+
+    python -m benchmarks.payload_size --entries 10
+"""
+import os
+import json
+import time
+import asyncio
+import argparse
+import statistics
+
+os.environ.setdefault("LLM_BACKEND", "fake")
+
+import httpx  # noqa: E402
+import orjson  # noqa: E402
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+
+import main  # noqa: E402
+from services.compression import brotli  # noqa: E402
+from services.pdf_generator import PDFGenerator  # noqa: E402
+from services.llm_client import FakeBackend, LLMClient  # noqa: E402
+from benchmarks.fixtures import make_resume_content  # noqa: E402
+
+ENCODINGS = ["identity", "gzip"] + (["br"] if brotli is not None else [])
+
+
+async def _sizes(entries: int) -> tuple:
+    content = make_resume_content(entries)
+    polished = {**content, "improvements_made": ["Stronger action verbs", "Quantified results"]}
+    main.ai_service.llm = LLMClient(FakeBackend(0, responder=lambda prompt: json.dumps(polished)))
+    main.worker_pool.start()
+    pdf_bytes = PDFGenerator().generate_pdf(content)
+
+    rows, bodies = [], {}
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def upload(query, headers):
+            return await client.post(f"/api/upload{query}", headers=headers,
+                                     files={"file": ("resume.pdf", pdf_bytes, "application/pdf")})
+
+        upload_body = (await upload("", {})).json()
+        bodies["upload"] = upload_body
+
+        async def polish(query, headers):
+            return await client.post(f"/api/polish{query}", headers=headers, json={"text": upload_body["full_text"]})
+
+        bodies["polish"] = (await polish("", {})).json()
+
+        cases = [
+            ("upload", upload, ""),
+            ("upload", upload, "?include_original=false"),
+            ("upload", upload, "?fields=structured_content,page_count"),
+            ("polish", polish, ""),
+            ("polish", polish, "?include_original=false"),
+        ]
+        for endpoint, call, query in cases:
+            row = {"endpoint": endpoint, "query": query or "(default)"}
+            for encoding in ENCODINGS:
+                response = await call(query, {"Accept-Encoding": encoding})
+                row[f"{encoding}_bytes"] = response.num_bytes_downloaded
+            rows.append(row)
+    main.worker_pool.shutdown()
+
+    baseline = {endpoint: row["identity_bytes"] for endpoint, row in
+                ((row["endpoint"], row) for row in rows if row["query"] == "(default)")}
+    best = ENCODINGS[-1]
+    for row in rows:
+        row["reduction_pct"] = round(100 * (1 - row[f"{best}_bytes"] / baseline[row["endpoint"]]), 1)
+    return rows, bodies
+
+
+def _time(fn, repeat: int) -> float:
+    fn()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(samples), 4)
+
+
+def serialization(bodies: dict, repeat: int) -> list:
+    rows = []
+    for endpoint, body in bodies.items():
+        rows.append({
+            "endpoint": endpoint,
+            "bytes": len(orjson.dumps(body)),
+            "fastapi_json_ms": _time(lambda: json.dumps(
+                jsonable_encoder(body), ensure_ascii=False, separators=(",", ":")
+            ).encode(), repeat),
+            "json_dumps_ms": _time(lambda: json.dumps(body).encode(), repeat),
+            "orjson_ms": _time(lambda: orjson.dumps(body), repeat),
+        })
+        rows[-1]["speedup_vs_fastapi_json"] = round(rows[-1]["fastapi_json_ms"] / rows[-1]["orjson_ms"], 1)
+    return rows
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entries", type=int, default=10, help="Experience entries in the resume")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    rows, bodies = asyncio.run(_sizes(args.entries))
+    print(json.dumps({
+        "encodings": ENCODINGS,
+        "wire_bytes": rows,
+        "serialization": serialization(bodies, args.repeat),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,70 @@
+"""
+Benchmark: single-pass PDFService.extract_document vs the old validate + extract flow.
+
+The old flow opened the document once to validate it, again to extract it, and
+re-parsed the whole file with pdfplumber when PyMuPDF returned under 50
+characters. Runs offline:
+
+    python -m benchmarks.pdf_extract --repeat 20
+"""
+import io
+import json
+import time
+import argparse
+
+import fitz  # PyMuPDF
+import pdfplumber
+
+from services.pdf_service import PDFService
+
+from .fixtures import make_resume_pdf
+
+
+def _legacy_extract(pdf_bytes: bytes) -> str:
+    """The previous /api/upload parse path, kept here for comparison"""
+    if not PDFService.validate_pdf(pdf_bytes):
+        return ""
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    text = "".join(page.get_text() for page in doc).strip()
+    doc.close()
+    if len(text) > 50:
+        return text
+    with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
+        return "\n".join(page.extract_text() or "" for page in pdf.pages).strip()
+
+
+def _time(fn, pdf_bytes: bytes, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn(pdf_bytes)
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    cases = {
+        "text_1_page": make_resume_pdf(1),
+        "text_5_pages": make_resume_pdf(5),
+        "scanned_5_pages": make_resume_pdf(0, image_pages=5),
+        "mixed_4_text_1_scanned": make_resume_pdf(4, image_pages=1),
+    }
+    report = []
+    for name, pdf_bytes in cases.items():
+        legacy_ms = _time(_legacy_extract, pdf_bytes, args.repeat)
+        single_pass_ms = _time(PDFService.extract_document, pdf_bytes, args.repeat)
+        report.append({
+            "case": name,
+            "bytes": len(pdf_bytes),
+            "method": PDFService.extract_document(pdf_bytes)["method"],
+            "legacy_ms": round(legacy_ms, 2),
+            "single_pass_ms": round(single_pass_ms, 2),
+            "ratio": round(single_pass_ms / legacy_ms, 2) if legacy_ms else None,
+        })
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main_cli()
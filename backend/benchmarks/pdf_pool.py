@@ -0,0 +1,59 @@
+"""
+Benchmark: PDF extraction and rendering throughput, inline vs the worker pool.
+
+Inline mode runs each task on the event loop, as the handlers used to; pool mode
+goes through services.worker_pool.WorkerPool. Runs offline:
+
+    python -m benchmarks.pdf_pool --documents 32 --pages 5 --workers 4
+"""
+import os
+import json
+import time
+import asyncio
+import argparse
+
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark-dummy-key")
+
+from services.worker_pool import WorkerPool, extract_document_task, generate_pdf_task  # noqa: E402
+
+from .fixtures import make_resume_pdf, make_resume_content  # noqa: E402
+
+
+async def _throughput(pool: WorkerPool, fn, payload, documents: int) -> float:
+    started = time.perf_counter()
+    await asyncio.gather(*[pool.submit(fn, payload) for _ in range(documents)])
+    return documents / (time.perf_counter() - started)
+
+
+def run(workers: int, documents: int, pages: int, experience: int) -> dict:
+    pdf_bytes = make_resume_pdf(pages)
+    content = make_resume_content(experience)
+    report = {"workers": workers, "documents": documents, "pages": pages, "cpu_count": os.cpu_count()}
+
+    for mode, pool_workers in (("inline", 0), ("pool", workers)):
+        pool = WorkerPool(workers=pool_workers, queue_limit=documents, timeout=300)
+        pool.start()
+        try:
+            report[f"{mode}_extract_docs_per_s"] = round(
+                asyncio.run(_throughput(pool, extract_document_task, pdf_bytes, documents)), 2
+            )
+            report[f"{mode}_render_docs_per_s"] = round(
+                asyncio.run(_throughput(pool, generate_pdf_task, content, documents)), 2
+            )
+        finally:
+            pool.shutdown()
+    return report
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--documents", type=int, default=32)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--experience", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    print(json.dumps(run(args.workers, args.documents, args.pages, args.experience), indent=2))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,73 @@
+"""
+Benchmark: PDF render time and memory per page for each PDF_RENDERER.
+
+Renders synthetic resumes with a growing number of experience entries with
+every renderer and reports median time, pages, time per page and peak Python
+memory (tracemalloc) per page. Runs offline:
+
+    python -m benchmarks.pdf_render --entries 2 10 60 --repeat 5
+"""
+import json
+import time
+import argparse
+import statistics
+import tracemalloc
+
+import fitz  # PyMuPDF
+
+from services.pdf_generator import PDFGenerator
+from services.pdf_renderers import RENDERERS
+
+from .fixtures import make_resume_content
+
+
+def run(renderer: str, entries: int, repeat: int) -> dict:
+    generator = PDFGenerator(renderer=renderer)
+    content = make_resume_content(entries)
+    pdf_bytes = generator.generate_pdf(content)  # warm up
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        pages = doc.page_count
+
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        generator.generate_pdf(content)
+        samples.append((time.perf_counter() - started) * 1000)
+
+    tracemalloc.start()
+    generator.generate_pdf(content)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    median_ms = statistics.median(samples)
+    return {
+        "renderer": renderer,
+        "entries": entries,
+        "pages": pages,
+        "bytes": len(pdf_bytes),
+        "median_ms": round(median_ms, 1),
+        "ms_per_page": round(median_ms / pages, 1),
+        "peak_kb": round(peak / 1024),
+        "peak_kb_per_page": round(peak / 1024 / pages),
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entries", type=int, nargs="+", default=[2, 10, 60])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    report = [run(renderer, entries, args.repeat) for entries in args.entries for renderer in RENDERERS]
+    by_case = {(row["entries"], row["renderer"]): row for row in report}
+    for entries in args.entries:
+        baseline = by_case[(entries, "xhtml2pdf")]["median_ms"]
+        for renderer in RENDERERS:
+            by_case[(entries, renderer)]["speedup_vs_xhtml2pdf"] = round(
+                baseline / by_case[(entries, renderer)]["median_ms"], 2
+            )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main_cli()
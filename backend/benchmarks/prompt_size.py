@@ -0,0 +1,115 @@
+"""
+Benchmark: full versus compact prompts (PROMPT_MODE).
+
+Builds the polish and analysis prompts for the benchmark fixtures in both
+modes and reports their size in estimated tokens, then measures
+time-to-first-token for each. Offline, the fake backend models prompt
+processing at --prefill-ms-per-1k-tokens plus a fixed --latency. With --live
+the real model is streamed and tokens are counted with its tokenizer:
+
+    python -m benchmarks.prompt_size
+    GOOGLE_API_KEY=... python -m benchmarks.prompt_size --live
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import statistics
+
+if "--live" not in sys.argv:
+    os.environ.setdefault("LLM_BACKEND", "fake")
+
+from services.llm_client import FakeBackend, LLMClient, get_llm_client  # noqa: E402
+from services.ai_service import AIService  # noqa: E402
+from services.job_match_service import JobMatchService  # noqa: E402
+from services.prompt_format import estimate_tokens  # noqa: E402
+from benchmarks.fixtures import BACKEND_POSTING, make_resume_content  # noqa: E402
+
+RAW_RESUME = """
+Jane Doe      jane@example.com      +1 555 0100      Austin, TX
+
+
+SUMMARY
+    Backend engineer with ten years of experience building reliable payment platforms.
+
+EXPERIENCE
+    Senior Software Engineer,   Company 0      2018 - 2022
+        - Led a team of engineers delivering payment services, cutting latency by 35%.
+        - Migrated batch jobs to Kafka streams,   reducing settlement time from hours to minutes.
+
+
+    Software Engineer,   Company 1      2012 - 2018
+        - Built search indexing pipelines in Python and Go.
+
+SKILLS
+    Python,  Go,  PostgreSQL,  Kafka,  Kubernetes,  AWS
+"""
+
+
+def build_prompts(llm: LLMClient, mode: str) -> dict:
+    ai = AIService(llm=llm, prompt_mode=mode)
+    matcher = JobMatchService(llm=llm, prompt_mode=mode)
+    prepared = matcher._prepare_resume(make_resume_content(5))
+    return {
+        "polish": ai._create_polish_prompt(RAW_RESUME),
+        "analysis": matcher._create_analysis_prompt(prepared["content"], BACKEND_POSTING, prepared["formatted"]),
+    }
+
+
+async def time_to_first_token(llm: LLMClient, prompt: str, repeats: int) -> float:
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        stream = llm.stream(prompt)
+        async for _ in stream:
+            samples.append((time.perf_counter() - started) * 1000)
+            break
+        await stream.aclose()
+    return statistics.median(samples)
+
+
+async def run(llm: LLMClient, live: bool, repeats: int) -> dict:
+    prompts = {mode: build_prompts(llm, mode) for mode in ("full", "compact")}
+    report = {}
+    for kind in ("polish", "analysis"):
+        row = {}
+        for mode in ("full", "compact"):
+            prompt = prompts[mode][kind]
+            if live:
+                model = llm.backend._get_model(llm.model_name)
+                tokens = (await model.count_tokens_async(prompt)).total_tokens
+            else:
+                tokens = estimate_tokens(prompt)
+            row[mode] = {
+                "chars": len(prompt),
+                "tokens": tokens,
+                "ttft_ms": round(await time_to_first_token(llm, prompt, repeats), 1),
+            }
+        row["token_reduction_pct"] = round(100 * (1 - row["compact"]["tokens"] / row["full"]["tokens"]), 1)
+        row["ttft_reduction_pct"] = round(100 * (1 - row["compact"]["ttft_ms"] / row["full"]["ttft_ms"]), 1)
+        report[kind] = row
+    return report
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.3, help="Fake fixed latency in seconds")
+    parser.add_argument("--prefill-ms-per-1k-tokens", type=float, default=200,
+                        help="Fake prompt processing time per 1000 prompt tokens")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--live", action="store_true", help="Call the real model (needs GOOGLE_API_KEY)")
+    args = parser.parse_args()
+
+    if args.live:
+        llm = get_llm_client()
+    else:
+        llm = LLMClient(FakeBackend(
+            latency=args.latency, prefill_seconds_per_token=args.prefill_ms_per_1k_tokens / 1e6
+        ))
+    print(json.dumps(asyncio.run(run(llm, args.live, args.repeats)), indent=2))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,102 @@
+"""
+Benchmark: cold start to first healthy response.
+
+Starts the API in a fresh process for each launch mode and polls /health until
+it answers 200, reporting the median time over --repeat starts along with the
+time `import main` takes on its own:
+
+- "eager_imports": uvicorn, after importing fitz, pdfplumber and xhtml2pdf up
+  front the way the services used to
+- "uvicorn": `python -m uvicorn main:app`, a single process
+- "serve": `python serve.py` with --workers pre-forked workers
+
+Runs offline with the fake model backend:
+
+    python -m benchmarks.startup --repeat 5 --workers 2
+"""
+import os
+import sys
+import json
+import time
+import signal
+import tempfile
+import logging
+import argparse
+import statistics
+import subprocess
+
+import httpx
+
+from benchmarks.load_polish import _free_port
+
+EAGER_IMPORTS = "import fitz, pdfplumber, xhtml2pdf.pisa"
+
+
+def _commands(port: int) -> dict:
+    uvicorn_args = f"'main:app', host='127.0.0.1', port={port}, log_level='warning'"
+    return {
+        "eager_imports": [sys.executable, "-c", f"{EAGER_IMPORTS}; import uvicorn; uvicorn.run({uvicorn_args})"],
+        "uvicorn": [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+                    "--log-level", "warning"],
+        "serve": [sys.executable, "serve.py"],
+    }
+
+
+def time_import() -> float:
+    code = "import time; started = time.perf_counter(); import main; print(time.perf_counter() - started)"
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, env=_env(0, 1))
+    return float(output.stdout.strip().splitlines()[-1]) * 1000
+
+
+def _env(port: int, workers: int) -> dict:
+    env = dict(
+        os.environ, LLM_BACKEND="fake", PORT=str(port), SERVER_HOST="127.0.0.1", SERVER_WORKERS=str(workers),
+        PYTHONPATH=os.getcwd()
+    )
+    if workers > 1:
+        # serve.py won't run several workers without a shared job store
+        env.setdefault("JOB_QUEUE_DB", os.path.join(tempfile.gettempdir(), "startup_benchmark_jobs.db"))
+    return env
+
+
+def time_to_healthy(mode: str, workers: int, timeout: float = 60) -> float:
+    port = _free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        _commands(port)[mode], env=_env(port, workers), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                    return (time.perf_counter() - started) * 1000
+            except httpx.TransportError:
+                pass
+            time.sleep(0.01)
+        raise RuntimeError(f"{mode} did not become healthy within {timeout:.0f}s")
+    finally:
+        process.send_signal(signal.SIGTERM)
+        process.wait(timeout=30)
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Workers for serve.py")
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    report = {"import_main_ms": round(statistics.median(time_import() for _ in range(args.repeat)), 1)}
+    for mode in ("eager_imports", "uvicorn", "serve"):
+        samples = [time_to_healthy(mode, args.workers) for _ in range(args.repeat)]
+        report[mode] = {
+            "median_ms": round(statistics.median(samples), 1),
+            "min_ms": round(min(samples), 1),
+            "max_ms": round(max(samples), 1),
+        }
+    report["serve"]["workers"] = args.workers
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main_cli()
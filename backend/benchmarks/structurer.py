@@ -0,0 +1,99 @@
+"""
+Benchmark: local resume structuring versus a full polish prompt.
+
+Renders the fixture resumes with every PDF_RENDERER, extracts them again with
+PDFService.extract_document(..., with_lines=True) and structures the lines
+with ResumeStructurer. Reports the time spent structuring, how many fields
+match the source content, and how much smaller the prose-only polish prompt
+is than the full one. Runs offline:
+
+    python -m benchmarks.structurer --repeat 20
+"""
+import os
+import json
+import time
+import argparse
+import statistics
+
+os.environ.setdefault("LLM_BACKEND", "fake")
+
+from services.pdf_service import PDFService  # noqa: E402
+from services.pdf_generator import PDFGenerator  # noqa: E402
+from services.pdf_renderers import RENDERERS  # noqa: E402
+from services.ai_service import AIService  # noqa: E402
+from services.llm_client import FakeBackend, LLMClient  # noqa: E402
+from services.prompt_format import estimate_tokens  # noqa: E402
+from services.resume_structurer import ResumeStructurer  # noqa: E402
+from benchmarks.fixtures import DATA_SCIENTIST_RESUME, MARKETING_RESUME, make_resume_content  # noqa: E402
+
+FIXTURES = {
+    "backend_3": make_resume_content(3),
+    "backend_10": make_resume_content(10),
+    "data_scientist": DATA_SCIENTIST_RESUME,
+    "marketing": MARKETING_RESUME,
+}
+
+
+def _fields(content: dict) -> dict:
+    """Flatten the fields worth comparing into path -> normalized value"""
+    fields = {f"contact_info.{key}": value for key, value in content.get("contact_info", {}).items() if value}
+    if content.get("summary"):
+        fields["summary"] = content["summary"]
+    for section, keys in (("experience", ("title", "company", "duration", "location")),
+                          ("education", ("degree", "school", "graduation"))):
+        for index, entry in enumerate(content.get(section, [])):
+            for key in keys:
+                if entry.get(key):
+                    fields[f"{section}.{index}.{key}"] = entry[key]
+            if section == "experience":
+                fields[f"experience.{index}.achievements"] = entry.get("achievements", [])
+    for section in ("skills", "certifications"):
+        if content.get(section):
+            fields[section] = content[section]
+    return {path: json.dumps(value).lower() for path, value in fields.items()}
+
+
+def accuracy(expected: dict, actual: dict) -> float:
+    wanted, got = _fields(expected), _fields(actual)
+    return sum(got.get(path) == value for path, value in wanted.items()) / len(wanted)
+
+
+def run(renderer: str, name: str, content: dict, repeat: int) -> dict:
+    pdf_bytes = PDFGenerator(renderer=renderer).generate_pdf(content)
+    document = PDFService.extract_document(pdf_bytes, with_lines=True)
+    structurer = ResumeStructurer()
+
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        structured = structurer.structure(document["lines"])
+        samples.append((time.perf_counter() - started) * 1000)
+
+    ai = AIService(llm=LLMClient(FakeBackend(0)))
+    full_prompt = ai._create_polish_prompt(document["text"])
+    prose_prompt = ai._create_prose_prompt(ai._prose_fields(ai._prose_sections(structured)))
+    return {
+        "renderer": renderer,
+        "resume": name,
+        "lines": len(document["lines"]),
+        "median_ms": round(statistics.median(samples), 3),
+        "complete": ResumeStructurer.is_complete(structured),
+        "field_accuracy": round(accuracy(content, structured), 3),
+        "full_prompt_tokens": estimate_tokens(full_prompt),
+        "prose_prompt_tokens": estimate_tokens(prose_prompt),
+        "prompt_reduction_pct": round(100 * (1 - estimate_tokens(prose_prompt) / estimate_tokens(full_prompt)), 1),
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    report = [run(renderer, name, content, args.repeat)
+              for name, content in FIXTURES.items() for renderer in RENDERERS]
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main_cli()
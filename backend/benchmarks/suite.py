@@ -0,0 +1,279 @@
+"""
+Benchmark suite: service microbenchmarks and an HTTP load test, as one JSON report.
+
+Microbenchmarks cover PDFService.extract_text_from_pdf on synthetic 1, 5 and
+50 page resumes (text-only and image-heavy), PDFGenerator.generate_pdf, and
+JobMatchService._analyze_keywords / _extract_keywords. The load test runs
+main.app under uvicorn with the fake model backend and drives upload, polish,
+analyze and generate-pdf concurrently. Everything runs offline:
+
+    python -m benchmarks.suite --output bench.json
+    python -m benchmarks.suite --quick --baseline bench.json
+
+With --baseline, entries whose median is more than --tolerance slower than
+the baseline are listed under "regressions" and the exit status is 1.
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+import platform
+import statistics
+import subprocess
+from datetime import datetime, timezone
+
+os.environ.setdefault("LLM_BACKEND", "fake")
+
+import fitz  # noqa: E402
+import httpx  # noqa: E402
+
+import main  # noqa: E402
+from services.pdf_service import PDFService  # noqa: E402
+from services.pdf_generator import PDFGenerator  # noqa: E402
+from services.job_match_service import JobMatchService  # noqa: E402
+from services.llm_client import FakeBackend, LLMClient  # noqa: E402
+from benchmarks.load_polish import percentile, start_server, _free_port  # noqa: E402
+from benchmarks.fixtures import (  # noqa: E402
+    BACKEND_POSTING, DATA_POSTING, FRONTEND_POSTING, MARKETING_POSTING, make_resume_content, make_resume_pdf
+)
+
+PAGE_COUNTS = (1, 5, 50)
+IMAGES_PER_PAGE = 4
+RENDER_ENTRIES = (2, 10, 60)
+
+
+def _summary(name: str, samples_ms: list, **info) -> dict:
+    return {
+        "name": name,
+        "samples": len(samples_ms),
+        "median_ms": round(statistics.median(samples_ms), 3),
+        "min_ms": round(min(samples_ms), 3),
+        "p95_ms": round(percentile(samples_ms, 95), 3),
+        **info,
+    }
+
+
+def measure(name: str, fn, repeat: int, **info) -> dict:
+    """Time fn() repeat times after one warm-up call"""
+    fn()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return _summary(name, samples, **info)
+
+
+def _repeat_for(pages: int, repeat: int) -> int:
+    return max(3, repeat // pages) if pages > 1 else repeat
+
+
+def bench_extract(repeat: int) -> list:
+    results = []
+    for pages in PAGE_COUNTS:
+        for kind, images in (("text", 0), ("image_heavy", IMAGES_PER_PAGE)):
+            pdf_bytes = make_resume_pdf(pages, images_per_page=images)
+            results.append(measure(
+                f"extract_text_from_pdf.{kind}_{pages}_pages",
+                lambda: PDFService.extract_text_from_pdf(pdf_bytes),
+                _repeat_for(pages, repeat),
+                bytes=len(pdf_bytes),
+            ))
+    return results
+
+
+def bench_render(repeat: int) -> list:
+    generator = PDFGenerator()
+    results = []
+    for entries in RENDER_ENTRIES:
+        content = make_resume_content(entries)
+        with fitz.open(stream=generator.generate_pdf(content), filetype="pdf") as doc:
+            pages = doc.page_count
+        results.append(measure(
+            f"generate_pdf.{entries}_entries",
+            lambda: generator.generate_pdf(content),
+            _repeat_for(pages, repeat),
+            pages=pages,
+        ))
+    return results
+
+
+def bench_keywords(repeat: int) -> list:
+    service = JobMatchService(llm=LLMClient(FakeBackend(0)))
+    resume = make_resume_content(5)
+    postings = [BACKEND_POSTING, DATA_POSTING, FRONTEND_POSTING, MARKETING_POSTING]
+    long_posting = " ".join(postings) * 10
+    inner = 100
+
+    def analyze_all():
+        for _ in range(inner // len(postings)):
+            for posting in postings:
+                service._analyze_keywords(resume, posting)
+
+    def extract(text):
+        def run():
+            for _ in range(inner):
+                service._extract_keywords(text)
+        return run
+
+    # Each sample covers `inner` calls; report per-call times
+    results = []
+    for name, fn in (
+        ("analyze_keywords", analyze_all),
+        ("extract_keywords.posting", extract(BACKEND_POSTING)),
+        ("extract_keywords.long_posting", extract(long_posting)),
+    ):
+        result = measure(name, fn, repeat, calls_per_sample=inner)
+        for key in ("median_ms", "min_ms", "p95_ms"):
+            result[key] = round(result[key] / inner, 4)
+        results.append(result)
+    return results
+
+
+async def _drive(client: httpx.AsyncClient, name: str, make_request, requests: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    samples, statuses = [], {}
+
+    async def one(index: int):
+        async with semaphore:
+            started = time.perf_counter()
+            response = await make_request(client, index)
+            samples.append((time.perf_counter() - started) * 1000)
+            statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*[one(index) for index in range(requests)])
+    elapsed = time.perf_counter() - started
+    return _summary(
+        f"http.{name}", samples,
+        p99_ms=round(percentile(samples, 99), 3),
+        requests_per_s=round(requests / elapsed, 2),
+        # 503s are worker-pool backpressure once the queue limit is reached
+        status_codes=statuses,
+        concurrency=concurrency,
+    )
+
+
+async def _http_load(base_url: str, requests: int, concurrency: int) -> list:
+    upload_pdf = make_resume_pdf(2)
+    resume_text = PDFService.extract_text_from_pdf(upload_pdf)
+    content = make_resume_content(5)
+
+    # Each request differs slightly so caches and coalescing don't answer it
+    cases = {
+        "upload": lambda c, i: c.post("/api/upload", files={"file": (f"r{i}.pdf", upload_pdf, "application/pdf")}),
+        "polish": lambda c, i: c.post("/api/polish", json={"text": f"{resume_text}\n{i}"}),
+        "analyze_local": lambda c, i: c.post("/api/analyze", json={
+            "resume_content": content, "job_description": f"{BACKEND_POSTING} {i}", "depth": "local"
+        }),
+        "analyze_full": lambda c, i: c.post("/api/analyze", json={
+            "resume_content": content, "job_description": f"{BACKEND_POSTING} {i}", "depth": "full"
+        }),
+        "generate_pdf": lambda c, i: c.post("/api/generate-pdf", json={
+            "content": {**content, "summary": f"{content['summary']} {i}"}
+        }),
+    }
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=None) as client:
+        return [
+            await _drive(client, name, make_request, requests, concurrency)
+            for name, make_request in cases.items()
+        ]
+
+
+def bench_http(requests: int, concurrency: int, latency: float) -> list:
+    main.ai_service.llm = LLMClient(FakeBackend(latency))
+    main.job_match_service.llm = main.ai_service.llm
+    main.result_cache.clear()
+
+    port = _free_port()
+    server = start_server(main.app, port)
+    try:
+        return asyncio.run(_http_load(f"http://127.0.0.1:{port}", requests, concurrency))
+    finally:
+        server.should_exit = True
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results: list, baseline: dict, tolerance: float) -> list:
+    """Entries whose median got more than `tolerance` slower than the baseline"""
+    previous = {entry["name"]: entry for entry in baseline.get("results", [])}
+    regressions = []
+    for entry in results:
+        before = previous.get(entry["name"])
+        if before and before["median_ms"] > 0:
+            ratio = entry["median_ms"] / before["median_ms"]
+            if ratio > 1 + tolerance:
+                regressions.append({
+                    "name": entry["name"],
+                    "baseline_median_ms": before["median_ms"],
+                    "median_ms": entry["median_ms"],
+                    "ratio": round(ratio, 2),
+                })
+    return regressions
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20, help="Samples per microbenchmark (fewer for big PDFs)")
+    parser.add_argument("--requests", type=int, default=100, help="Requests per endpoint in the load test")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.2, help="Fake model latency in seconds")
+    parser.add_argument("--quick", action="store_true", help="Few samples, for CI smoke runs")
+    parser.add_argument("--skip-http", action="store_true")
+    parser.add_argument("--output", help="Write the report here as well as to stdout")
+    parser.add_argument("--baseline", help="Earlier report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown before flagging, 0.25 = 25%%")
+    args = parser.parse_args()
+
+    if args.quick:
+        args.repeat, args.requests = 3, 20
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    results = bench_extract(args.repeat) + bench_render(args.repeat) + bench_keywords(args.repeat)
+    if not args.skip_http:
+        results += bench_http(args.requests, args.concurrency, args.latency)
+
+    report = {
+        "environment": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "pymupdf": fitz.VersionBind,
+        },
+        "settings": {
+            "repeat": args.repeat,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "model_latency_s": args.latency,
+        },
+        "results": results,
+    }
+    if args.baseline:
+        with open(args.baseline) as f:
+            report["regressions"] = compare(results, json.load(f), args.tolerance)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+    if report.get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,291 @@
+"""
+Bulk resume ingestion: process every PDF in a directory or zip archive offline.
+
+Each resume is validated, extracted and structured locally (ResumeStructurer)
+in a pool of worker processes. Optionally it is also polished and analyzed
+against a job description, with at most --llm-concurrency documents in the
+AI stages at once. One JSON line per resume is appended to --output as soon
+as it finishes:
+
+    {"id": "alice.pdf", "status": "success", "page_count": 2, "structured_content": {...}, ...}
+    {"id": "scan.pdf", "status": "failed", "error": "Unable to extract sufficient text from PDF"}
+
+The output file is also the checkpoint: run the same command again and resumes
+already in it are skipped (failed ones too, unless --retry-failed). A retried
+resume gets a new line, and the latest line for an id is the one that counts;
+after a --retry-failed run the file is rewritten so that each id has only its
+latest line. Progress and the final throughput in documents per second go to
+stderr.
+
+    python ingest.py resumes/ --output resumes.jsonl
+    python ingest.py resumes.zip --output resumes.jsonl --polish --job-description posting.txt
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import zipfile
+import argparse
+from typing import Any, Dict, Iterator, Optional, Set, Tuple, Union
+
+from dotenv import load_dotenv
+
+from services.llm_client import LLMTimeoutError
+from services.upload_ingest import UPLOAD_MAX_BYTES, UPLOAD_MAX_PAGES
+from services.resume_structurer import ResumeStructurer
+from services.worker_pool import (
+    PDF_TASK_TIMEOUT_SECONDS, PDF_WORKERS, WorkerPool, WorkerTimeoutError, extract_document_task
+)
+
+load_dotenv()
+
+logger = logging.getLogger("ingest")
+
+PROGRESS_EVERY = 100
+
+
+def iter_sources(path: str) -> Iterator[Tuple[str, Optional[Union[bytes, str]]]]:
+    """
+    Yield (id, source) for every PDF under a directory, by relative path, or in
+    a zip archive, by member name. Zip members are read only when their turn
+    comes, so memory use doesn't grow with the archive; oversized ones come
+    back as None.
+    """
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for member in archive.infolist():
+                if member.is_dir() or not member.filename.lower().endswith(".pdf"):
+                    continue
+                if member.file_size > UPLOAD_MAX_BYTES:
+                    yield member.filename, None
+                    continue
+                yield member.filename, archive.read(member)
+        return
+
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(".pdf"):
+                full_path = os.path.join(root, name)
+                yield os.path.relpath(full_path, path), full_path
+
+
+def _latest_lines(output_path: str) -> Dict[str, Tuple[int, str]]:
+    """For each id in the output, the number and status of its latest line; a line cut off by a crash is ignored"""
+    latest: Dict[str, Tuple[int, str]] = {}
+    if not os.path.exists(output_path):
+        return latest
+    with open(output_path, encoding="utf-8") as f:
+        for number, line in enumerate(f):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            latest[record["id"]] = (number, record.get("status"))
+    return latest
+
+
+def load_checkpoint(output_path: str, retry_failed: bool) -> Set[str]:
+    """Ids already in the output, going by their latest line"""
+    return {
+        doc_id for doc_id, (_, status) in _latest_lines(output_path).items()
+        if status == "success" or not retry_failed
+    }
+
+
+def compact_output(output_path: str) -> int:
+    """
+    Rewrite the output keeping only the latest line for each id, so retried
+    resumes don't leave their earlier failures behind. Returns the number of
+    lines dropped.
+    """
+    keep = {number for number, _ in _latest_lines(output_path).values()}
+    dropped = 0
+    temp_path = f"{output_path}.compacting"
+    with open(output_path, encoding="utf-8") as source, open(temp_path, "w", encoding="utf-8") as target:
+        for number, line in enumerate(source):
+            if number in keep:
+                target.write(line)
+            else:
+                dropped += 1
+    # Atomic, so a crash leaves either the old file or the new one
+    os.replace(temp_path, output_path)
+    return dropped
+
+
+class Ingestor:
+    """Runs resumes through extraction and the optional AI stages, writing one line per resume"""
+
+    def __init__(
+        self,
+        workers: int = PDF_WORKERS,
+        llm_concurrency: int = 4,
+        max_pages: int = UPLOAD_MAX_PAGES,
+        polish: bool = False,
+        job_description: str = "",
+        depth: str = "auto",
+        include_text: bool = False
+    ):
+        self.max_pages = max_pages
+        self.polish = polish
+        self.job_description = job_description
+        self.depth = depth
+        self.include_text = include_text
+        # Enough documents in flight to keep the extraction workers and the AI stages busy
+        self.max_in_flight = max(workers, 1) * 2 + (llm_concurrency if polish or job_description else 0)
+        self.pool = WorkerPool(workers=workers, queue_limit=self.max_in_flight, timeout=PDF_TASK_TIMEOUT_SECONDS)
+        self.llm_slots = asyncio.Semaphore(llm_concurrency)
+        self.ai_service = None
+        self.job_match_service = None
+        if polish or job_description:
+            from services.ai_service import AIService
+            from services.job_match_service import JobMatchService
+            from services.result_cache import ResultCache
+            cache = ResultCache.from_env()
+            self.ai_service = AIService(cache=cache)
+            self.job_match_service = JobMatchService(cache=cache)
+        self.counts = {"succeeded": 0, "failed": 0, "skipped": 0}
+
+    async def run(self, input_path: str, output, done: Set[str]) -> Dict[str, Any]:
+        self.pool.start()
+        started = time.perf_counter()
+        slots = asyncio.Semaphore(self.max_in_flight)
+        tasks = set()
+
+        def finished(task: asyncio.Task) -> None:
+            tasks.discard(task)
+            slots.release()
+            if task.cancelled():
+                return
+            record = task.result()
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            output.flush()
+            self.counts["succeeded" if record["status"] == "success" else "failed"] += 1
+            processed = self.counts["succeeded"] + self.counts["failed"]
+            if processed % PROGRESS_EVERY == 0:
+                logger.info(f"{processed} resumes, {processed / (time.perf_counter() - started):.1f} docs/s")
+
+        try:
+            for doc_id, source in iter_sources(input_path):
+                if doc_id in done:
+                    self.counts["skipped"] += 1
+                    continue
+                await slots.acquire()
+                task = asyncio.create_task(self.process(doc_id, source))
+                tasks.add(task)
+                task.add_done_callback(finished)
+            if tasks:
+                await asyncio.wait(set(tasks))
+        finally:
+            self.pool.shutdown()
+
+        elapsed = time.perf_counter() - started
+        processed = self.counts["succeeded"] + self.counts["failed"]
+        return {
+            **self.counts,
+            "elapsed_s": round(elapsed, 2),
+            "docs_per_s": round(processed / elapsed, 2) if elapsed else 0.0,
+        }
+
+    async def process(self, doc_id: str, source: Optional[Union[bytes, str]]) -> Dict[str, Any]:
+        """Never raises; failures are recorded in the returned line"""
+        record: Dict[str, Any] = {"id": doc_id}
+        started = time.perf_counter()
+        try:
+            record.update(await self._extract(source))
+            content = record["structured_content"]
+            if self.ai_service is not None:
+                async with self.llm_slots:
+                    if self.polish:
+                        content = await self._polish(record, content)
+                    if self.job_description:
+                        record["analysis"] = await self.job_match_service.analyze_job_match(
+                            content, self.job_description, self.depth
+                        )
+            if not self.include_text:
+                record.pop("text")
+            record = {"id": doc_id, "status": "success", **record}
+        except LLMTimeoutError:
+            record = {"id": doc_id, "status": "failed", "error": "AI service took too long to respond"}
+        except WorkerTimeoutError:
+            record = {"id": doc_id, "status": "failed", "error": "PDF processing took too long"}
+        except Exception as e:
+            record = {"id": doc_id, "status": "failed", "error": str(e)}
+        record["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return record
+
+    async def _extract(self, source: Optional[Union[bytes, str]]) -> Dict[str, Any]:
+        # Same checks as /api/upload
+        if source is None or isinstance(source, str) and os.path.getsize(source) > UPLOAD_MAX_BYTES:
+            raise ValueError(f"File is too large. The maximum is {UPLOAD_MAX_BYTES // (1024 * 1024)} MB.")
+        document = await self.pool.submit(extract_document_task, source, self.max_pages, True)
+        if document["page_count"] > self.max_pages:
+            raise ValueError(f"PDF has too many pages. The maximum is {self.max_pages}.")
+        if not document["valid"]:
+            raise ValueError("Invalid PDF file or corrupted file")
+        if len(document["text"].strip()) < 50:
+            raise ValueError("Unable to extract sufficient text from PDF")
+        return {
+            "page_count": document["page_count"],
+            "extraction_method": document["method"],
+            "text": document["text"],
+            "structured_content": document["structured_content"],
+            "structure_complete": ResumeStructurer.is_complete(document["structured_content"]),
+        }
+
+    async def _polish(self, record: Dict[str, Any], structured: Dict[str, Any]) -> Dict[str, Any]:
+        if record["structure_complete"]:
+            polished, record["polish_method"] = await self.ai_service.polish_structured_content(structured), "prose"
+        else:
+            polished, record["polish_method"] = await self.ai_service.polish_resume_content(record["text"]), "full"
+        record["polished_content"] = polished
+        return polished
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("input", help="Directory of PDFs (searched recursively) or a zip archive")
+    parser.add_argument("--output", required=True, help="JSONL file to append to; also the checkpoint")
+    parser.add_argument("--workers", type=int, default=PDF_WORKERS, help="Extraction processes; 0 runs inline")
+    parser.add_argument("--max-pages", type=int, default=UPLOAD_MAX_PAGES)
+    parser.add_argument("--polish", action="store_true", help="Polish each resume with the AI")
+    parser.add_argument("--job-description", help="File with a job posting to analyze each resume against")
+    parser.add_argument("--depth", choices=["auto", "local", "full"], default="auto", help="Analysis depth")
+    parser.add_argument("--llm-concurrency", type=int, default=4, help="Resumes in the AI stages at once")
+    parser.add_argument("--include-text", action="store_true", help="Also write the full extracted text")
+    parser.add_argument("--retry-failed", action="store_true", help="Process resumes that failed last time again")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s", stream=sys.stderr)
+    if not os.path.exists(args.input):
+        parser.error(f"{args.input} does not exist")
+
+    job_description = ""
+    if args.job_description:
+        with open(args.job_description, encoding="utf-8") as f:
+            job_description = f.read().strip()
+
+    done = load_checkpoint(args.output, args.retry_failed)
+    if done:
+        logger.info(f"Resuming: {len(done)} resumes already in {args.output}")
+
+    ingestor = Ingestor(
+        workers=args.workers,
+        llm_concurrency=args.llm_concurrency,
+        max_pages=args.max_pages,
+        polish=args.polish,
+        job_description=job_description,
+        depth=args.depth,
+        include_text=args.include_text,
+    )
+    with open(args.output, "a", encoding="utf-8") as output:
+        summary = asyncio.run(ingestor.run(args.input, output, done))
+    if args.retry_failed:
+        summary["superseded_lines_removed"] = compact_output(args.output)
+    print(json.dumps(summary), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main_cli()
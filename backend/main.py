@@ -1,17 +1,34 @@
 import os
+import json
+import base64
+import asyncio
 import logging
-from fastapi import FastAPI, File, UploadFile, HTTPException, Response
+import contextlib
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse, PlainTextResponse
 from pydantic import BaseModel
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List, Literal, AsyncIterator, Tuple
 from dotenv import load_dotenv
 
 # Import our services
 from services.pdf_service import PDFService
 from services.ai_service import AIService
-from services.job_match_service import JobMatchService
-from services.pdf_generator import PDFGenerator
+from services.job_match_service import JobMatchService, BATCH_LLM_TOP_N
+from services.pdf_generator import (
+    PDFGenerator, PDF_CACHE_TTL_SECONDS, PDF_CACHE_MAX_ENTRIES, PDF_CACHE_MAX_BYTES
+)
+from services.llm_client import LLMTimeoutError
+from services.result_cache import ResultCache, MemoryCacheTier
+from services.job_index import JobIndex
+from services.job_queue import JobQueue, JobQueueFullError
+from services.resume_structurer import ResumeStructurer
+from services import metrics
+from services.compression import CompressionMiddleware
+from services.upload_ingest import UploadRejectedError, UPLOAD_MAX_PAGES, receive_pdf_upload
+from services.worker_pool import (
+    WorkerPool, WorkerPoolBusyError, WorkerTimeoutError, extract_document_task, generate_pdf_task
+)
 
 # Load environment variables
 load_dotenv()
@@ -20,11 +37,17 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+BATCH_MAX_POSTINGS = int(os.getenv("BATCH_MAX_POSTINGS", 500))
+# On shutdown, how long in-flight requests and running jobs get to finish
+SHUTDOWN_DRAIN_SECONDS = float(os.getenv("SHUTDOWN_DRAIN_SECONDS", 30))
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Resume Genie API",
     description="AI-powered resume enhancement and job matching service",
-    version="1.0.0"
+    version="1.0.0",
+    # orjson serializes several times faster than the json module
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
@@ -34,56 +57,172 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Content-Disposition"],
 )
 
+# gzip/brotli for JSON responses of at least COMPRESSION_MIN_BYTES
+app.add_middleware(CompressionMiddleware)
+
+# Request latency histograms for /metrics
+app.add_middleware(metrics.RequestLatencyMiddleware)
+
 # Initialize services
+result_cache = ResultCache.from_env()
 pdf_service = PDFService()
-ai_service = AIService()
-job_match_service = JobMatchService()
-pdf_generator = PDFGenerator()
+ai_service = AIService(cache=result_cache)
+job_match_service = JobMatchService(cache=result_cache)
+pdf_generator = PDFGenerator(
+    cache=MemoryCacheTier(PDF_CACHE_TTL_SECONDS, PDF_CACHE_MAX_ENTRIES, PDF_CACHE_MAX_BYTES)
+)
+worker_pool = WorkerPool()
+job_index = JobIndex()
+job_queue = JobQueue.from_env()
+
+@app.on_event("startup")
+async def start_worker_pool():
+    worker_pool.start()
+    job_queue.start()
+    app.state.loop_lag_monitor = asyncio.create_task(metrics.monitor_event_loop_lag())
+
+@app.on_event("shutdown")
+async def stop_worker_pool():
+    app.state.loop_lag_monitor.cancel()
+    await job_queue.shutdown(SHUTDOWN_DRAIN_SECONDS)
+    worker_pool.shutdown()
 
 # Pydantic models for request bodies
 class PolishRequest(BaseModel):
-    text: str
+    text: str = ""
+    # From /api/upload; when present only the prose is rewritten by the model
+    structured_content: Optional[Dict[str, Any]] = None
+
+class IncrementalPolishRequest(BaseModel):
+    text: str = ""
+    structured_content: Optional[Dict[str, Any]] = None
+    # The version polished last time (as text or structure) and the polished_content returned for it
+    previous_text: str = ""
+    previous_content: Optional[Dict[str, Any]] = None
+    previous_polished: Optional[Dict[str, Any]] = None
 
 class JobAnalysisRequest(BaseModel):
     resume_content: Dict[str, Any]
     job_description: str
+    # "auto" only asks the model when the local score is ambiguous
+    depth: Literal["auto", "local", "full"] = "auto"
+
+class JobPosting(BaseModel):
+    text: str
+    title: Optional[str] = None
+    id: Optional[str] = None
+
+class JobPostingsRequest(BaseModel):
+    postings: List[JobPosting]
+
+class JobSearchRequest(BaseModel):
+    resume_content: Dict[str, Any]
+    top_k: int = 10
+
+class BatchAnalysisRequest(BaseModel):
+    resume_content: Dict[str, Any]
+    job_descriptions: List[str]
+    top_n: int = BATCH_LLM_TOP_N
 
 class PDFGenerationRequest(BaseModel):
     content: Dict[str, Any]
 
+def _project(body: Dict[str, Any], fields: Optional[str], drop: Tuple[str, ...] = ()) -> ORJSONResponse:
+    """
+    Keep only the comma-separated top-level `fields` (and "status") of a
+    response body, minus `drop`. The body is plain JSON already, so it is
+    serialized directly instead of going through FastAPI's encoder first.
+    """
+    if fields:
+        requested = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = [name for name in requested if name not in body]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(body)}"
+            )
+        body = {key: value for key, value in body.items() if key == "status" or key in requested}
+    return ORJSONResponse({key: value for key, value in body.items() if key not in drop})
+
 # API Endpoints
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "service": "Resume Genie API"}
 
-@app.post("/api/upload")
-async def upload_resume(file: UploadFile = File(...)):
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Per-stage latency histograms and counters in Prometheus text format"""
+    metrics.WORKER_POOL_PENDING.set(worker_pool.pending)
+    for cache_name, stats in (("result", result_cache.stats()), ("pdf", pdf_generator.cache.stats())):
+        metrics.CACHE_LOOKUPS.set(stats["hits"], cache=cache_name, result="hit")
+        metrics.CACHE_LOOKUPS.set(stats["misses"], cache=cache_name, result="miss")
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/api/cache/stats")
+async def cache_stats():
+    """Hit/miss counters for the result and PDF caches, and coalesced model calls"""
+    return {
+        "status": "success",
+        # Under serve.py each worker process keeps its own counters
+        "worker_pid": os.getpid(),
+        "cache": result_cache.stats(),
+        "pdf_cache": pdf_generator.cache.stats(),
+        "coalesced": {
+            "polish": ai_service.inflight.stats(),
+            "analyze": job_match_service.inflight.stats()
+        }
+    }
+
+@app.post(
+    "/api/upload",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "properties": {"file": {"type": "string", "format": "binary"}},
+                        "required": ["file"]
+                    }
+                }
+            }
+        }
+    }
+)
+async def upload_resume(request: Request, fields: Optional[str] = None, include_original: bool = True):
     """
-    Upload and extract text from PDF resume
+    Upload and extract text from PDF resume. `fields` picks which response
+    fields to return; include_original=false leaves out full_text.
     """
+    upload = None
     try:
-        # Validate file type
-        if not file.filename.lower().endswith('.pdf'):
+        # Receive the file in chunks, rejecting non-PDF or oversized uploads early
+        upload = await receive_pdf_upload(
+            request.headers.get("content-type", ""),
+            request.headers.get("content-length"),
+            request.stream()
+        )
+        
+        # Validate PDF, extract text and structure it in a single pass in a worker process
+        document = await worker_pool.submit(extract_document_task, upload.source, UPLOAD_MAX_PAGES, True)
+        if document["page_count"] > UPLOAD_MAX_PAGES:
             raise HTTPException(
-                status_code=400, 
-                detail="Only PDF files are allowed"
+                status_code=413,
+                detail=f"PDF has too many pages. The maximum is {UPLOAD_MAX_PAGES}."
             )
         
-        # Read file content
-        pdf_bytes = await file.read()
-        
-        # Validate PDF
-        if not pdf_service.validate_pdf(pdf_bytes):
+        if not document["valid"]:
             raise HTTPException(
                 status_code=400,
                 detail="Invalid PDF file or corrupted file"
             )
         
-        # Extract text
-        extracted_text = pdf_service.extract_text_from_pdf(pdf_bytes)
+        extracted_text = document["text"]
         
         if len(extracted_text.strip()) < 50:
             raise HTTPException(
@@ -92,59 +231,206 @@ async def upload_resume(file: UploadFile = File(...)):
             )
         
         # Return response
-        return {
+        return _project({
             "status": "success",
-            "filename": file.filename,
+            "filename": upload.filename,
             "text_preview": extracted_text[:500] + "..." if len(extracted_text) > 500 else extracted_text,
             "full_text": extracted_text,
-            "character_count": len(extracted_text)
-        }
+            "character_count": len(extracted_text),
+            "page_count": document["page_count"],
+            "extraction_method": document["method"],
+            # Usable directly by /api/analyze and /api/generate-pdf, or by /api/polish for a prose-only rewrite
+            "structured_content": document["structured_content"],
+            "structure_complete": ResumeStructurer.is_complete(document["structured_content"])
+        }, fields, () if include_original else ("full_text",))
         
     except HTTPException:
         raise
+    except UploadRejectedError as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=e.detail
+        )
+    except WorkerPoolBusyError:
+        raise HTTPException(
+            status_code=503,
+            detail="Server is busy processing other PDFs. Please try again shortly.",
+            headers={"Retry-After": "1"}
+        )
+    except WorkerTimeoutError:
+        raise HTTPException(
+            status_code=504,
+            detail="PDF processing took too long. Please try a smaller file."
+        )
     except Exception as e:
         logger.error(f"Error in upload endpoint: {str(e)}")
         raise HTTPException(
             status_code=500,
             detail=f"Failed to process PDF: {str(e)}"
         )
+    finally:
+        if upload is not None:
+            upload.cleanup()
 
 @app.post("/api/polish")
-async def polish_resume(request: PolishRequest):
+async def polish_resume(
+    request: PolishRequest,
+    queue: bool = False,
+    fields: Optional[str] = None,
+    include_original: bool = True
+):
     """
-    Polish resume content using AI
+    Polish resume content using AI (with ?queue=true, as a background job).
+    `fields` picks which response fields to return; include_original=false
+    leaves out original_text.
     """
     try:
         # Validate input
-        if len(request.text.strip()) < 50:
+        if not _prose_only(request.structured_content) and len(request.text.strip()) < 50:
             raise HTTPException(
                 status_code=400,
-                detail="Resume text is too short. Please provide more content."
+                detail=(
+                    "Resume text is too short. Please provide more content."
+                    if request.structured_content is None else
+                    "structured_content is incomplete, so the resume text is needed as well."
+                )
             )
         
-        # Polish the resume
-        polished_content = await ai_service.polish_resume_content(request.text)
+        payload = {"text": request.text, "structured_content": request.structured_content}
+        if queue:
+            return _enqueue_job("polish", payload)
         
+        return _project(await _polish_job(payload), fields, () if include_original else ("original_text",))
+        
+    except HTTPException:
+        raise
+    except LLMTimeoutError:
+        raise HTTPException(
+            status_code=504,
+            detail="AI service took too long to respond. Please try again."
+        )
+    except Exception as e:
+        logger.error(f"Error in polish endpoint: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to polish resume: {str(e)}"
+        )
+
+def _prose_only(structured_content: Optional[Dict[str, Any]]) -> bool:
+    """Whether a structure from /api/upload is complete enough to polish only its prose"""
+    return structured_content is not None and ResumeStructurer.is_complete(structured_content)
+
+async def _polish_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    # An incomplete structure would lose the sections it missed; polish the full text instead
+    if _prose_only(payload.get("structured_content")):
+        polished_content = await ai_service.polish_structured_content(payload["structured_content"])
+    else:
+        polished_content = await ai_service.polish_resume_content(payload["text"])
+    return {
+        "status": "success",
+        "original_text": payload["text"],
+        "polished_content": polished_content,
+        "improvements_made": polished_content.get('improvements_made', [])
+    }
+
+@app.post("/api/polish/incremental")
+async def polish_resume_incremental(request: IncrementalPolishRequest):
+    """
+    Re-polish an edited resume, sending only the sections that changed since
+    the previous version to the AI; unchanged sections are reused
+    """
+    try:
+        structured = request.structured_content
+        if not _prose_only(structured):
+            if len(request.text.strip()) < 50:
+                raise HTTPException(
+                    status_code=400,
+                    detail=(
+                        "Resume text is too short. Please provide more content."
+                        if structured is None else
+                        "structured_content is incomplete, so the resume text is needed as well."
+                    )
+                )
+            if structured is None:
+                structured = ResumeStructurer().structure_text(request.text)
+            if not ResumeStructurer.is_complete(structured):
+                # Sections can't be told apart reliably, so polish the whole text
+                polished_content = await ai_service.polish_resume_content(request.text)
+                return {
+                    "status": "success",
+                    "polished_content": polished_content,
+                    "improvements_made": polished_content.get('improvements_made', []),
+                    "polish_method": "full"
+                }
+        
+        previous_content = request.previous_content
+        if previous_content is None and request.previous_text.strip():
+            previous_content = ResumeStructurer().structure_text(request.previous_text)
+        
+        polished_content, sections = await ai_service.polish_sections(
+            structured, previous_content, request.previous_polished
+        )
         return {
             "status": "success",
-            "original_text": request.text,
             "polished_content": polished_content,
-            "improvements_made": polished_content.get('improvements_made', [])
+            "improvements_made": polished_content.get('improvements_made', []),
+            "polish_method": "sections",
+            "sections": sections
         }
         
     except HTTPException:
         raise
+    except LLMTimeoutError:
+        raise HTTPException(
+            status_code=504,
+            detail="AI service took too long to respond. Please try again."
+        )
     except Exception as e:
-        logger.error(f"Error in polish endpoint: {str(e)}")
+        logger.error(f"Error in incremental polish endpoint: {str(e)}")
         raise HTTPException(
             status_code=500,
             detail=f"Failed to polish resume: {str(e)}"
         )
 
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.post("/api/polish/stream")
+async def polish_resume_stream(request: PolishRequest):
+    """
+    Polish resume content using AI, streaming each section as server-sent events
+    """
+    # Validate input
+    if len(request.text.strip()) < 50:
+        raise HTTPException(
+            status_code=400,
+            detail="Resume text is too short. Please provide more content."
+        )
+    
+    async def stream_events():
+        try:
+            async for event in ai_service.stream_polish_resume_content(request.text):
+                name = event.pop("event")
+                if name == "complete":
+                    event["improvements_made"] = event["polished_content"].get('improvements_made', [])
+                yield _sse(name, event)
+        except LLMTimeoutError:
+            yield _sse("error", {"detail": "AI service took too long to respond. Please try again."})
+        except Exception as e:
+            logger.error(f"Error in polish stream endpoint: {str(e)}")
+            yield _sse("error", {"detail": f"Failed to polish resume: {str(e)}"})
+    
+    return StreamingResponse(
+        stream_events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.post("/api/analyze")
-async def analyze_job_match(request: JobAnalysisRequest):
+async def analyze_job_match(request: JobAnalysisRequest, queue: bool = False):
     """
-    Analyze resume match with job description
+    Analyze resume match with job description (with ?queue=true, as a background job)
     """
     try:
         # Validate inputs
@@ -160,19 +446,18 @@ async def analyze_job_match(request: JobAnalysisRequest):
                 detail="Job description is too short. Please provide a detailed job posting."
             )
         
-        # Perform analysis
-        analysis = job_match_service.analyze_job_match(
-            request.resume_content, 
-            request.job_description
-        )
+        if queue:
+            return _enqueue_job("analyze", request.model_dump())
         
-        return {
-            "status": "success",
-            "analysis": analysis
-        }
+        return await _analyze_job(request.model_dump())
         
     except HTTPException:
         raise
+    except LLMTimeoutError:
+        raise HTTPException(
+            status_code=504,
+            detail="AI service took too long to respond. Please try again."
+        )
     except Exception as e:
         logger.error(f"Error in analyze endpoint: {str(e)}")
         raise HTTPException(
@@ -180,10 +465,173 @@ async def analyze_job_match(request: JobAnalysisRequest):
             detail=f"Failed to analyze job match: {str(e)}"
         )
 
+async def _analyze_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    analysis = await job_match_service.analyze_job_match(
+        payload["resume_content"], 
+        payload["job_description"],
+        payload["depth"]
+    )
+    return {
+        "status": "success",
+        "analysis": analysis
+    }
+
+@app.post("/api/analyze/batch")
+async def analyze_job_match_batch(request: BatchAnalysisRequest):
+    """
+    Rank a resume against many job descriptions, streamed back as NDJSON
+    """
+    if not request.resume_content:
+        raise HTTPException(
+            status_code=400,
+            detail="Resume content is required"
+        )
+    
+    if not request.job_descriptions or len(request.job_descriptions) > BATCH_MAX_POSTINGS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Please provide between 1 and {BATCH_MAX_POSTINGS} job descriptions."
+        )
+    
+    for index, job_description in enumerate(request.job_descriptions):
+        if len(job_description.strip()) < 100:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Job description {index} is too short. Please provide a detailed job posting."
+            )
+    
+    async def stream_results():
+        try:
+            # Closed with the response, so a disconnect cancels the model calls still running
+            async with contextlib.aclosing(job_match_service.analyze_batch(
+                request.resume_content,
+                request.job_descriptions,
+                top_n=request.top_n
+            )) as results:
+                async for result in results:
+                    yield json.dumps(result) + "\n"
+        except Exception as e:
+            logger.error(f"Error in batch analyze endpoint: {str(e)}")
+            yield json.dumps({"error": "Failed to analyze job matches"}) + "\n"
+    
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+@app.post("/api/jobs/postings")
+async def add_job_postings(request: JobPostingsRequest):
+    """
+    Save job postings to the search index
+    """
+    if not request.postings or len(request.postings) > BATCH_MAX_POSTINGS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Please provide between 1 and {BATCH_MAX_POSTINGS} job postings."
+        )
+    
+    for index, posting in enumerate(request.postings):
+        if len(posting.text.strip()) < 100:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Job posting {index} is too short. Please provide a detailed job posting."
+            )
+    
+    try:
+        ids = await asyncio.to_thread(job_index.add, [posting.model_dump() for posting in request.postings])
+        return {
+            "status": "success",
+            "ids": ids
+        }
+    except Exception as e:
+        logger.error(f"Error adding job postings: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to save job postings: {str(e)}"
+        )
+
+@app.get("/api/jobs/postings/{posting_id}")
+async def get_job_posting(posting_id: str):
+    """
+    Get a saved job posting
+    """
+    posting = await asyncio.to_thread(job_index.get, posting_id)
+    if posting is None:
+        raise HTTPException(status_code=404, detail="Job posting not found")
+    return {
+        "status": "success",
+        "posting": posting
+    }
+
+@app.delete("/api/jobs/postings/{posting_id}")
+async def delete_job_posting(posting_id: str):
+    """
+    Remove a saved job posting from the search index
+    """
+    if not await asyncio.to_thread(job_index.delete, posting_id):
+        raise HTTPException(status_code=404, detail="Job posting not found")
+    return {"status": "success"}
+
+@app.post("/api/jobs/search")
+async def search_jobs(request: JobSearchRequest):
+    """
+    Find the saved job postings most similar to a resume
+    """
+    if not request.resume_content:
+        raise HTTPException(
+            status_code=400,
+            detail="Resume content is required"
+        )
+    
+    try:
+        resume_text = job_match_service.resume_text(request.resume_content)
+        results = await asyncio.to_thread(job_index.search, resume_text, min(max(0, request.top_k), 100))
+        return {
+            "status": "success",
+            "results": results
+        }
+    except Exception as e:
+        logger.error(f"Error in job search endpoint: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to search job postings: {str(e)}"
+        )
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag (weak or strong). "*" is not
+    a match: the PDF is computed from the request body, so there is no stored
+    representation for it to refer to.
+    """
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+def _pdf_filename(content: Dict[str, Any]) -> str:
+    return f"resume_{content.get('contact_info', {}).get('name', 'generated').replace(' ', '_').lower()}.pdf"
+
+def _pdf_response(content: Dict[str, Any], pdf_bytes: bytes, etag: str) -> Response:
+    return Response(
+        content=pdf_bytes,
+        media_type="application/pdf",
+        headers={
+            "Content-Disposition": f"attachment; filename={_pdf_filename(content)}",
+            "ETag": etag,
+            "Cache-Control": "private, no-cache"
+        }
+    )
+
+async def _pdf_job(payload: Dict[str, Any]) -> bytes:
+    # Generate PDF in a worker process unless it was rendered recently
+    render_key = pdf_generator.render_key(payload["content"])
+    pdf_bytes = pdf_generator.get_cached_pdf(render_key)
+    if pdf_bytes is None:
+        pdf_bytes = await worker_pool.submit(generate_pdf_task, payload["content"])
+        pdf_generator.cache_pdf(render_key, pdf_bytes)
+    return pdf_bytes
+
 @app.post("/api/generate-pdf")
-async def generate_pdf(request: PDFGenerationRequest):
+async def generate_pdf(request: PDFGenerationRequest, http_request: Request, queue: bool = False):
     """
-    Generate PDF from resume content
+    Generate PDF from resume content (with ?queue=true, as a background job)
     """
     try:
         # Validate content
@@ -193,28 +641,317 @@ async def generate_pdf(request: PDFGenerationRequest):
                 detail="Invalid resume content. Please ensure all required fields are provided."
             )
         
-        # Generate PDF
-        pdf_bytes = pdf_generator.generate_pdf(request.content)
+        # Unchanged content: the client already has this PDF
+        render_key = pdf_generator.render_key(request.content)
+        etag = f'"{render_key}"'
+        if _etag_matches(http_request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        
+        if queue:
+            return _enqueue_job("pdf", {"content": request.content})
+        
+        pdf_bytes = await _pdf_job({"content": request.content})
         
         # Return PDF as response
-        filename = f"resume_{request.content.get('contact_info', {}).get('name', 'generated').replace(' ', '_').lower()}.pdf"
+        return _pdf_response(request.content, pdf_bytes, etag)
         
-        return Response(
-            content=pdf_bytes,
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"attachment; filename={filename}"
+    except HTTPException:
+        raise
+    except WorkerPoolBusyError:
+        raise HTTPException(
+            status_code=503,
+            detail="Server is busy processing other PDFs. Please try again shortly.",
+            headers={"Retry-After": "1"}
+        )
+    except WorkerTimeoutError:
+        raise HTTPException(
+            status_code=504,
+            detail="PDF processing took too long. Please try a smaller file."
+        )
+    except Exception as e:
+        logger.error(f"Error in generate-pdf endpoint: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to generate PDF: {str(e)}"
+        )
+
+async def _pipeline_stages(
+    text: str,
+    structured_content: Optional[Dict[str, Any]],
+    job_description: str,
+    depth: str
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Polish the extracted text, then analyze it and render its PDF at the
+    same time, yielding (stage, result) as each stage finishes. Stages after
+    polish report their own errors so the polished content is never lost.
+    When the local structure is complete only its prose goes to the model.
+    """
+    if _prose_only(structured_content):
+        polished_content, polish_method = await ai_service.polish_structured_content(structured_content), "prose"
+    else:
+        polished_content, polish_method = await ai_service.polish_resume_content(text), "full"
+    yield "polished", {
+        "polished_content": polished_content,
+        "improvements_made": polished_content.get('improvements_made', []),
+        "polish_method": polish_method
+    }
+    
+    async def analyze():
+        return {"analysis": await job_match_service.analyze_job_match(polished_content, job_description, depth)}
+    
+    async def render():
+        if not pdf_generator.validate_content(polished_content):
+            raise ValueError("Polished content is missing fields required for the PDF")
+        pdf_bytes = await _pdf_job({"content": polished_content})
+        return {
+            "filename": _pdf_filename(polished_content),
+            "etag": f'"{pdf_generator.render_key(polished_content)}"',
+            "pdf_base64": base64.b64encode(pdf_bytes).decode()
+        }
+    
+    tasks = {asyncio.create_task(render()): "pdf"}
+    if job_description:
+        tasks[asyncio.create_task(analyze())] = "analysis"
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                stage = tasks[task]
+                try:
+                    yield stage, task.result()
+                except LLMTimeoutError:
+                    yield stage, {"error": "AI service took too long to respond. Please try again."}
+                except (WorkerPoolBusyError, WorkerTimeoutError):
+                    yield stage, {"error": "Server is busy processing other PDFs. Please try again shortly."}
+                except Exception as e:
+                    logger.error(f"Error in pipeline {stage} stage: {str(e)}")
+                    yield stage, {"error": f"Failed to complete {stage}: {str(e)}"}
+    finally:
+        # The client went away; don't keep rendering or calling the model for it
+        for task in pending:
+            task.cancel()
+
+@app.post(
+    "/api/pipeline",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "properties": {
+                            "file": {"type": "string", "format": "binary"},
+                            "job_description": {"type": "string"}
+                        },
+                        "required": ["file"]
+                    }
+                }
             }
+        }
+    }
+)
+async def resume_pipeline(
+    request: Request,
+    depth: Literal["auto", "local", "full"] = "auto",
+    stream: bool = False
+):
+    """
+    Upload a PDF resume and polish it, then analyze it against an optional
+    job description while rendering the polished PDF, all in one request.
+    Returns one (gzipped) JSON document, or with ?stream=true one
+    server-sent event per stage as it finishes.
+    """
+    upload = None
+    try:
+        upload = await receive_pdf_upload(
+            request.headers.get("content-type", ""),
+            request.headers.get("content-length"),
+            request.stream(),
+            text_fields=("job_description",)
         )
         
+        job_description = upload.fields.get("job_description", "").strip()
+        if job_description and len(job_description) < 100:
+            raise HTTPException(
+                status_code=400,
+                detail="Job description is too short. Please provide a detailed job posting."
+            )
+        
+        document = await worker_pool.submit(extract_document_task, upload.source, UPLOAD_MAX_PAGES, True)
+        if document["page_count"] > UPLOAD_MAX_PAGES:
+            raise HTTPException(
+                status_code=413,
+                detail=f"PDF has too many pages. The maximum is {UPLOAD_MAX_PAGES}."
+            )
+        
+        if not document["valid"]:
+            raise HTTPException(
+                status_code=400,
+                detail="Invalid PDF file or corrupted file"
+            )
+        
+        if len(document["text"].strip()) < 50:
+            raise HTTPException(
+                status_code=400,
+                detail="Unable to extract sufficient text from PDF. Please ensure the PDF contains readable text."
+            )
+        
+        # The extracted text isn't sent back; the client only needs the polished version
+        extracted = {
+            "filename": upload.filename,
+            "character_count": len(document["text"]),
+            "page_count": document["page_count"],
+            "extraction_method": document["method"]
+        }
+        
+        if stream:
+            async def stream_events():
+                yield _sse("extracted", extracted)
+                try:
+                    async for stage, result in _pipeline_stages(
+                        document["text"], document["structured_content"], job_description, depth
+                    ):
+                        yield _sse(stage, result)
+                    yield _sse("complete", {"status": "success"})
+                except LLMTimeoutError:
+                    yield _sse("error", {"detail": "AI service took too long to respond. Please try again."})
+                except Exception as e:
+                    logger.error(f"Error in pipeline stream endpoint: {str(e)}")
+                    yield _sse("error", {"detail": f"Failed to polish resume: {str(e)}"})
+            
+            return StreamingResponse(
+                stream_events(),
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+            )
+        
+        result = {"status": "success", "extracted": extracted}
+        async for stage, stage_result in _pipeline_stages(
+            document["text"], document["structured_content"], job_description, depth
+        ):
+            result[stage] = stage_result
+        return ORJSONResponse(result)
+        
     except HTTPException:
         raise
+    except UploadRejectedError as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=e.detail
+        )
+    except WorkerPoolBusyError:
+        raise HTTPException(
+            status_code=503,
+            detail="Server is busy processing other PDFs. Please try again shortly.",
+            headers={"Retry-After": "1"}
+        )
+    except WorkerTimeoutError:
+        raise HTTPException(
+            status_code=504,
+            detail="PDF processing took too long. Please try a smaller file."
+        )
+    except LLMTimeoutError:
+        raise HTTPException(
+            status_code=504,
+            detail="AI service took too long to respond. Please try again."
+        )
     except Exception as e:
-        logger.error(f"Error in generate-pdf endpoint: {str(e)}")
+        logger.error(f"Error in pipeline endpoint: {str(e)}")
         raise HTTPException(
             status_code=500,
-            detail=f"Failed to generate PDF: {str(e)}"
+            detail=f"Failed to process resume: {str(e)}"
         )
+    finally:
+        if upload is not None:
+            upload.cleanup()
+
+# PDF renders get their own lane so they never wait behind model calls
+job_queue.register("polish", "llm", _polish_job)
+job_queue.register("analyze", "llm", _analyze_job)
+job_queue.register("pdf", "fast", _pdf_job)
+
+def _enqueue_job(kind: str, payload: Dict[str, Any]) -> JSONResponse:
+    """Queue a job and answer 202 with where to follow it"""
+    try:
+        job = job_queue.submit(kind, payload)
+    except JobQueueFullError:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many jobs are queued. Please try again shortly.",
+            headers={"Retry-After": "5"}
+        )
+    return JSONResponse(
+        status_code=202,
+        content={
+            "status": "queued",
+            "job_id": job.id,
+            "status_url": f"/api/jobs/{job.id}",
+            "events_url": f"/api/jobs/{job.id}/events"
+        },
+        headers={"Location": f"/api/jobs/{job.id}"}
+    )
+
+def _job_view(snapshot: Dict[str, Any]) -> Dict[str, Any]:
+    """Job snapshot with a download link in place of a binary result"""
+    if snapshot["type"] == "pdf" and snapshot["status"] == "succeeded":
+        snapshot["result_url"] = f"/api/jobs/{snapshot['id']}/result"
+    return snapshot
+
+def _get_job(job_id: str):
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Poll the status of a queued job; finished polish and analyze jobs include their result
+    """
+    return {
+        "status": "success",
+        "job": _job_view(_get_job(job_id).snapshot())
+    }
+
+@app.get("/api/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """
+    Follow a queued job as server-sent events, one per status change
+    """
+    _get_job(job_id)
+    
+    async def stream_events():
+        async for snapshot in job_queue.watch(job_id):
+            yield _sse(snapshot["status"], _job_view(snapshot))
+    
+    return StreamingResponse(
+        stream_events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/api/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """
+    Download the PDF produced by a finished PDF job
+    """
+    job = _get_job(job_id)
+    if job.kind != "pdf":
+        raise HTTPException(status_code=400, detail="Only PDF jobs have a downloadable result")
+    if job.status == "failed":
+        raise HTTPException(status_code=500, detail=f"Failed to generate PDF: {job.error}")
+    if job.status != "succeeded":
+        raise HTTPException(status_code=409, detail="PDF is not ready yet", headers={"Retry-After": "1"})
+    
+    pdf_bytes = await asyncio.to_thread(job_queue.result, job)
+    if pdf_bytes is None:
+        # Expired between the status check and reading it back
+        raise HTTPException(status_code=404, detail="Job not found")
+    etag = f'"{pdf_generator.render_key(job.payload["content"])}"'
+    return _pdf_response(job.payload["content"], pdf_bytes, etag)
 
 # Error handlers
 @app.exception_handler(404)
@@ -232,8 +969,8 @@ async def internal_error_handler(request, exc):
         content={"detail": "Internal server error"}
     )
 
-# Run the application
+# Run the development server (reload needs the app as an import string); see serve.py for production
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("BACKEND_PORT", 8000))
-    uvicorn.run(app, host="0.0.0.0", port=port, reload=True)
+    uvicorn.run("main:app", host="0.0.0.0", port=port, reload=True)
@@ -0,0 +1,157 @@
+"""
+Production server: SERVER_WORKERS uvicorn worker processes sharing one socket.
+
+The app is imported, the PDF libraries loaded and the resume template compiled
+once in this process, and the workers are forked from it. They start warm and
+share those pages instead of each importing everything again. PDF worker pools
+are sized so the whole tree uses about one process per CPU.
+
+SIGTERM or SIGINT stops the workers gracefully: each stops accepting
+connections and gives in-flight requests and running jobs up to
+SHUTDOWN_DRAIN_SECONDS to finish. A worker that dies is replaced.
+
+There is one worker unless SERVER_WORKERS says otherwise. More than one
+needs JOB_QUEUE_DB: queued jobs otherwise live in the memory of the worker
+that accepted them, and polling another worker for them would get a 404.
+Metrics and cache statistics are per worker either way.
+
+    python serve.py
+"""
+import gc
+import os
+import sys
+import time
+import signal
+import socket
+import logging
+from typing import Dict
+
+SERVER_HOST = os.getenv("SERVER_HOST", "0.0.0.0")
+SERVER_PORT = int(os.getenv("PORT", os.getenv("BACKEND_PORT", 8000)))
+SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", 1))
+SERVER_BACKLOG = int(os.getenv("SERVER_BACKLOG", 2048))
+
+# Every worker has its own PDF pool; split the CPUs between them unless told otherwise
+os.environ.setdefault("PDF_WORKERS", str(max(1, (os.cpu_count() or 1) // max(SERVER_WORKERS, 1))))
+
+logger = logging.getLogger("serve")
+
+
+def preload():
+    """Import the app and load everything its first requests would otherwise wait for"""
+    import main
+    from services.worker_pool import warm_up
+    warm_up()
+    return main
+
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(SERVER_BACKLOG)
+    sock.set_inheritable(True)
+    return sock
+
+
+class PreforkServer:
+    """Forks the workers, restarts any that exit, and drains them all on a stop signal"""
+
+    def __init__(self, app_module, sock: socket.socket, workers: int):
+        self.app_module = app_module
+        self.sock = sock
+        self.workers = workers
+        self.children: Dict[int, float] = {}
+        self.stopping = False
+        self.kill_deadline = None
+
+    def run(self) -> None:
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        for _ in range(self.workers):
+            self._spawn()
+        logger.info(f"Serving on {SERVER_HOST}:{SERVER_PORT} with {self.workers} workers")
+
+        while self.children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                if self.kill_deadline is not None and time.monotonic() > self.kill_deadline:
+                    logger.error(f"Workers {list(self.children)} did not stop in time; killing them")
+                    for child in self.children:
+                        os.kill(child, signal.SIGKILL)
+                    self.kill_deadline = None
+                time.sleep(0.1)
+                continue
+
+            started_at = self.children.pop(pid)
+            # A worker killed outright leaves its PDF processes behind, still holding the socket
+            try:
+                os.killpg(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            if not self.stopping:
+                logger.warning(f"Worker {pid} exited with code {os.waitstatus_to_exitcode(status)}; restarting it")
+                # Don't spin on a worker that fails straight away
+                if time.monotonic() - started_at < 1:
+                    time.sleep(1)
+                self._spawn()
+        logger.info("All workers stopped")
+
+    def _spawn(self) -> None:
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                # Its own process group, together with the PDF processes it starts
+                os.setpgid(0, 0)
+                self._run_worker()
+            except BaseException:
+                logger.exception("Worker crashed")
+                code = 1
+            finally:
+                os._exit(code)
+        self.children[pid] = time.monotonic()
+
+    def _run_worker(self) -> None:
+        import uvicorn
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        config = uvicorn.Config(
+            self.app_module.app,
+            timeout_graceful_shutdown=int(self.app_module.SHUTDOWN_DRAIN_SECONDS),
+            proxy_headers=True,
+        )
+        uvicorn.Server(config).run(sockets=[self.sock])
+
+    def _stop(self, signum, frame) -> None:
+        if self.stopping:
+            return
+        self.stopping = True
+        logger.info(f"Received {signal.Signals(signum).name}; draining workers")
+        # The app gives running jobs the drain time again after requests have finished
+        self.kill_deadline = time.monotonic() + 2 * self.app_module.SHUTDOWN_DRAIN_SECONDS + 5
+        for pid in self.children:
+            os.kill(pid, signal.SIGTERM)
+
+
+def main_cli():
+    if SERVER_WORKERS > 1 and not os.getenv("JOB_QUEUE_DB"):
+        sys.exit(
+            f"SERVER_WORKERS={SERVER_WORKERS} needs JOB_QUEUE_DB, so every worker can answer for jobs queued on "
+            "the others; set it to a sqlite path or run a single worker"
+        )
+    started = time.perf_counter()
+    sock = bind_socket(SERVER_HOST, SERVER_PORT)
+    app_module = preload()
+    # Keep the preloaded objects out of garbage collection so forked workers don't copy their pages
+    gc.freeze()
+    logger.info(f"Preloaded the app in {time.perf_counter() - started:.2f}s")
+    PreforkServer(app_module, sock, SERVER_WORKERS).run()
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main_cli()
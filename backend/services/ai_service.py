@@ -1,38 +1,313 @@
-import os
+from typing import Dict, Any, Optional, AsyncIterator, List, Tuple
+import copy
 import json
-import google.generativeai as genai
-from typing import Dict, Any
 import logging
 
+from .llm_client import LLMClient, LLMTimeoutError, get_llm_client
+from .result_cache import ResultCache, make_cache_key
+from .single_flight import SingleFlight
+from .json_extract import IncrementalSectionParser, extract_json, complete_response
+from .response_models import PolishedResume, PolishedProse
+from .prompt_format import PROMPT_MODE, compact_text, minify_schema, create_reask_prompt
+from .metrics import time_stage, record_llm_sizes, JSON_PARSE_FAILURES, JSON_RESPONSE_REPAIRS, POLISH_SECTIONS
+
 logger = logging.getLogger(__name__)
 
 class AIService:
-    def __init__(self):
-        api_key = os.getenv("GOOGLE_API_KEY")
-        if not api_key:
-            raise ValueError("GOOGLE_API_KEY environment variable not set")
-        
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-2.0-flash-lite')
+    # Bump whenever _create_polish_prompt changes so cached results are invalidated
+    POLISH_PROMPT_VERSION = "polish-v1"
+    COMPACT_POLISH_PROMPT_VERSION = "polish-compact-v1"
+    # Output shape for compact prompts, sent minified instead of an indented example
+    POLISH_SCHEMA = {
+        "contact_info": {"name": "str", "email": "str", "phone": "str", "location": "str",
+                         "linkedin": "str", "website": "str"},
+        "summary": "2-3 sentences",
+        "experience": [{"title": "str", "company": "str", "duration": "start - end", "location": "str",
+                        "achievements": ["quantified result"]}],
+        "education": [{"degree": "str", "school": "str", "graduation": "str", "location": "str",
+                       "details": "GPA, honors, coursework"}],
+        "skills": ["str"],
+        "certifications": ["str"],
+        "improvements_made": ["str"]
+    }
+    # Prose-only polish for resumes already structured by ResumeStructurer
+    PROSE_PROMPT_VERSION = "prose-v2"
+    PROSE_SCHEMA = {
+        "summary": "2-3 sentences",
+        "experience": [{"achievements": ["quantified result"]}],
+        "improvements_made": ["str"]
+    }
+    # Sections streamed one entry at a time rather than as a whole
+    STREAMED_ITEM_SECTIONS = ("experience", "education")
+
+    def __init__(
+        self,
+        cache: Optional[ResultCache] = None,
+        llm: Optional[LLMClient] = None,
+        prompt_mode: str = PROMPT_MODE
+    ):
+        # The shared client connects lazily, so no API key is needed until the first call
+        self.llm = llm or get_llm_client()
+        self.cache = cache
+        self.compact_prompts = prompt_mode == "compact"
+        self.prompt_version = (
+            self.COMPACT_POLISH_PROMPT_VERSION if self.compact_prompts else self.POLISH_PROMPT_VERSION
+        )
+        self.inflight = SingleFlight("ai")
     
     async def polish_resume_content(self, raw_text: str) -> Dict[str, Any]:
         """
         Polish resume content using AI to improve formatting, language, and impact
         """
         try:
-            prompt = self._create_polish_prompt(raw_text)
-            response = self.model.generate_content(prompt)
+            cache_key = make_cache_key(self.llm.model_name, self.prompt_version, raw_text)
+            if self.cache:
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    return cached
             
-            # Parse the response
-            polished_data = self._parse_polish_response(response.text)
-            return polished_data
+            # Identical requests already in flight share that model call
+            return await self.inflight.do(cache_key, lambda: self._polish_uncached(raw_text, cache_key))
             
+        except LLMTimeoutError:
+            raise
         except Exception as e:
             logger.error(f"Error polishing resume: {str(e)}")
             raise Exception(f"Failed to polish resume: {str(e)}")
     
+    async def _polish_uncached(self, raw_text: str, cache_key: str) -> Dict[str, Any]:
+        with time_stage("ai", "prompt_build"):
+            prompt = self._create_polish_prompt(raw_text)
+        with time_stage("ai", "llm_call"):
+            response_text = await self.llm.generate(prompt, endpoint="polish")
+        record_llm_sizes("ai", prompt, response_text)
+        
+        # Parse the response
+        polished_data, complete = await self._parse_polish_response(response_text, prompt)
+        
+        # Don't cache the fallback structure returned on parse failures
+        if self.cache and complete:
+            self.cache.set(cache_key, polished_data)
+        return polished_data
+    
+    async def stream_polish_resume_content(self, raw_text: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Polish resume content, yielding each section as soon as the model has written it.
+        
+        Yields {"event": "section", "section", "index", "value"} events (index is set for
+        each experience/education entry) followed by one {"event": "complete",
+        "polished_content"} event carrying the full parsed document.
+        """
+        try:
+            cache_key = make_cache_key(self.llm.model_name, self.prompt_version, raw_text)
+            cached = self.cache.get(cache_key) if self.cache else None
+            if cached is not None:
+                for event in self._section_events(cached):
+                    yield event
+                yield {"event": "complete", "polished_content": cached}
+                return
+            
+            with time_stage("ai", "prompt_build"):
+                prompt = self._create_polish_prompt(raw_text)
+            parser = IncrementalSectionParser(self.STREAMED_ITEM_SECTIONS)
+            with time_stage("ai", "llm_stream"):
+                async for chunk in self.llm.stream(prompt, endpoint="polish"):
+                    for section, index, value in parser.feed(chunk):
+                        yield {"event": "section", "section": section, "index": index, "value": value}
+            record_llm_sizes("ai", prompt, parser.buffer)
+            
+            # Parse the full response the same way as the non-streaming path
+            polished_data, complete = await self._parse_polish_response(parser.buffer, prompt)
+            if self.cache and complete:
+                self.cache.set(cache_key, polished_data)
+            yield {"event": "complete", "polished_content": polished_data}
+            
+        except LLMTimeoutError:
+            raise
+        except Exception as e:
+            logger.error(f"Error streaming polished resume: {str(e)}")
+            raise Exception(f"Failed to polish resume: {str(e)}")
+    
+    async def polish_structured_content(self, structured: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Polish a resume that is already structured (see ResumeStructurer): only
+        the summary and achievements go to the model, and the rewritten prose
+        is merged back into a copy of the structure
+        """
+        polished, _ = await self.polish_sections(structured)
+        return polished
+    
+    async def polish_sections(
+        self,
+        structured: Dict[str, Any],
+        previous_content: Optional[Dict[str, Any]] = None,
+        previous_polished: Optional[Dict[str, Any]] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, List[str]]]:
+        """
+        Incremental polish: only sections whose content changed go to the model.
+        
+        Sections are the summary and each experience entry, keyed by a hash of
+        their content. A section is reused from the previous version when its
+        hash matches one there, or from the per-section cache; the rest are
+        polished in one prompt and merged back. Returns the polished resume and
+        the ids of the "reused" and "polished" sections.
+        """
+        try:
+            sections = self._prose_sections(structured)
+            reusable = {}
+            if previous_content is not None and previous_polished is not None:
+                for section_id, key, _ in self._prose_sections(previous_content):
+                    value = self._section_value(previous_polished, section_id)
+                    if value:
+                        reusable[key] = value
+            
+            values: Dict[str, Any] = {}
+            changed = []
+            for section_id, key, content in sections:
+                value = reusable.get(key) or (self.cache.get(key) if self.cache else None)
+                if value:
+                    values[section_id] = value
+                else:
+                    changed.append((section_id, key, content))
+            
+            improvements = (previous_polished or {}).get("improvements_made", [])
+            if changed:
+                prose = self._prose_fields(changed)
+                prose_key = make_cache_key(self.llm.model_name, self.PROSE_PROMPT_VERSION, prose)
+                polished, complete = await self.inflight.do(
+                    prose_key, lambda: self._polish_prose_uncached(prose)
+                )
+                rewritten = iter(polished.get("experience") or [])
+                for section_id, key, _ in changed:
+                    if section_id == "summary":
+                        value = polished.get("summary")
+                    else:
+                        value = (next(rewritten, None) or {}).get("achievements")
+                    if value:
+                        values[section_id] = value
+                        if self.cache and complete:
+                            self.cache.set(key, value)
+                improvements = polished.get("improvements_made", [])
+            
+            polished_ids = [section_id for section_id, _, _ in changed]
+            reused_ids = [section_id for section_id, _, _ in sections if section_id not in polished_ids]
+            POLISH_SECTIONS.inc(len(reused_ids), result="reused")
+            POLISH_SECTIONS.inc(len(polished_ids), result="polished")
+            return self._merge_prose(structured, values, improvements), {
+                "reused": reused_ids,
+                "polished": polished_ids
+            }
+            
+        except LLMTimeoutError:
+            raise
+        except Exception as e:
+            logger.error(f"Error polishing structured resume: {str(e)}")
+            raise Exception(f"Failed to polish resume: {str(e)}")
+    
+    async def _polish_prose_uncached(self, prose: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        """Returns the parsed response and whether it is complete enough to cache"""
+        with time_stage("ai", "prompt_build"):
+            prompt = self._create_prose_prompt(prose)
+        with time_stage("ai", "llm_call"):
+            response_text = await self.llm.generate(prompt, endpoint="polish")
+        record_llm_sizes("ai", prompt, response_text)
+        
+        with time_stage("ai", "parse"):
+            polished, repaired = extract_json(response_text)
+        if polished is None:
+            logger.error("Failed to parse JSON response")
+            JSON_PARSE_FAILURES.inc(service="ai")
+            # Keep the original prose
+            return {"improvements_made": ["AI processing encountered formatting issues"]}, False
+        if repaired:
+            JSON_RESPONSE_REPAIRS.inc(service="ai", repair="truncation")
+        
+        async def reask(fields: List[str]) -> str:
+            with time_stage("ai", "llm_reask"):
+                return await self.llm.generate(create_reask_prompt(prompt, fields), endpoint="polish")
+        
+        # Only ask again for what was actually sent
+        # (the model sometimes answers null for a section it wasn't given)
+        if "summary" not in prose and polished.get("summary") is None:
+            polished["summary"] = ""
+        if not prose["experience"] and polished.get("experience") is None:
+            polished["experience"] = []
+        missing = await complete_response(polished, PolishedProse, reask, "ai")
+        polished = PolishedProse.model_validate(
+            {"summary": "", "experience": [], **polished}
+        ).model_dump(exclude_unset=True)
+        return polished, not missing and not repaired
+    
+    def _prose_sections(self, structured: Dict[str, Any]) -> List[Tuple[str, str, Any]]:
+        """(section id, content hash, content) for each part of the resume worth rewriting"""
+        contents = [("summary", structured.get("summary") or "")]
+        for index, entry in enumerate(structured.get("experience") or []):
+            # Title and company give the model context and make the hash specific to the job
+            contents.append((f"experience.{index}", {
+                "title": entry.get("title"), "company": entry.get("company"),
+                "achievements": entry.get("achievements") or []
+            }))
+        return [
+            (section_id, make_cache_key(self.llm.model_name, self.PROSE_PROMPT_VERSION, section_id.split(".")[0], content),
+             content)
+            for section_id, content in contents
+        ]
+    
+    @staticmethod
+    def _prose_fields(sections: List[Tuple[str, str, Any]]) -> Dict[str, Any]:
+        """Prompt input for the given sections; the summary is left out when it isn't among them"""
+        prose: Dict[str, Any] = {"experience": []}
+        for section_id, _, content in sections:
+            if section_id == "summary":
+                prose["summary"] = content
+            else:
+                prose["experience"].append(content)
+        return prose
+    
+    @staticmethod
+    def _section_value(polished: Dict[str, Any], section_id: str) -> Any:
+        if section_id == "summary":
+            return polished.get("summary")
+        experience = polished.get("experience") or []
+        index = int(section_id.split(".")[1])
+        return experience[index].get("achievements") if index < len(experience) else None
+    
+    @staticmethod
+    def _merge_prose(structured: Dict[str, Any], values: Dict[str, Any], improvements: List[str]) -> Dict[str, Any]:
+        result = copy.deepcopy(structured)
+        result["summary"] = values.get("summary") or result.get("summary") or ""
+        for index, entry in enumerate(result.get("experience") or []):
+            if values.get(f"experience.{index}"):
+                entry["achievements"] = values[f"experience.{index}"]
+        result["improvements_made"] = improvements
+        return result
+    
+    def _create_prose_prompt(self, prose: Dict[str, Any]) -> str:
+        """Rewrite only the summary and achievements; the rest of the structure is already known"""
+        return (
+            "You are an expert resume writer. Rewrite this resume's summary (if given) and each job's achievements: "
+            "professional, impactful language, strong action verbs, quantified results where the original "
+            "has numbers, correct grammar, ATS-friendly. Keep all original facts and don't invent new ones. "
+            "If the summary is given but empty, write one from the jobs.\n"
+            "Reply with only a JSON object in this shape, with one experience item per input job in the same order:\n"
+            f"{minify_schema(self.PROSE_SCHEMA)}\n"
+            f"RESUME:\n{json.dumps(prose, ensure_ascii=False, separators=(',', ':'))}"
+        )
+    
+    def _section_events(self, polished_data: Dict[str, Any]):
+        """Split a finished document into the same events the stream produces"""
+        for section, value in polished_data.items():
+            if section in self.STREAMED_ITEM_SECTIONS and isinstance(value, list):
+                for index, item in enumerate(value):
+                    yield {"event": "section", "section": section, "index": index, "value": item}
+            else:
+                yield {"event": "section", "section": section, "index": None, "value": value}
+    
     def _create_polish_prompt(self, raw_text: str) -> str:
         """Create a comprehensive prompt for resume polishing"""
+        if self.compact_prompts:
+            return self._create_compact_polish_prompt(raw_text)
+        
         return f"""
         You are an expert resume writer and career coach. Please analyze and improve the following resume content.
 
@@ -94,32 +369,29 @@ class AIService:
         Make sure the JSON is valid and properly formatted. Focus on making the resume more compelling while maintaining accuracy.
         """
     
-    def _parse_polish_response(self, response_text: str) -> Dict[str, Any]:
-        """Parse and validate the AI response"""
-        try:
-            # Clean the response to extract JSON
-            response_text = response_text.strip()
-            
-            # Find JSON content
-            start_idx = response_text.find('{')
-            end_idx = response_text.rfind('}') + 1
-            
-            if start_idx == -1 or end_idx == 0:
-                raise ValueError("No JSON found in response")
-            
-            json_text = response_text[start_idx:end_idx]
-            polished_data = json.loads(json_text)
-            
-            # Validate required fields
-            required_fields = ['contact_info', 'summary', 'experience', 'education', 'skills']
-            for field in required_fields:
-                if field not in polished_data:
-                    polished_data[field] = []
-            
-            return polished_data
-            
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse JSON response: {str(e)}")
+    def _create_compact_polish_prompt(self, raw_text: str) -> str:
+        """Same instructions as the full prompt with a minified schema and compacted input"""
+        return (
+            "You are an expert resume writer. Structure and improve this resume: professional, impactful "
+            "language, strong action verbs, quantified achievements, correct grammar, ATS-friendly. "
+            "Keep all original information.\n"
+            "Reply with only a JSON object in this shape (values show types or content):\n"
+            f"{minify_schema(self.POLISH_SCHEMA)}\n"
+            f"RESUME:\n{compact_text(raw_text)}"
+        )
+    
+    async def _parse_polish_response(self, response_text: str, prompt: str) -> Tuple[Dict[str, Any], bool]:
+        """
+        Parse and validate the AI response. Missing or invalid sections are
+        requested once more on their own; returns the content and whether it
+        is complete (and can be cached).
+        """
+        with time_stage("ai", "parse"):
+            polished_data, repaired = extract_json(response_text)
+        
+        if polished_data is None:
+            logger.error("Failed to parse JSON response")
+            JSON_PARSE_FAILURES.inc(service="ai")
             # Return a basic structure with the raw text
             return {
                 "contact_info": {},
@@ -130,10 +402,21 @@ class AIService:
                 "certifications": [],
                 "raw_improved_text": response_text,
                 "improvements_made": ["AI processing encountered formatting issues"]
-            }
-        except Exception as e:
-            logger.error(f"Error parsing polish response: {str(e)}")
-            raise Exception(f"Failed to parse polished content: {str(e)}")
+            }, False
+        if repaired:
+            JSON_RESPONSE_REPAIRS.inc(service="ai", repair="truncation")
+        
+        async def reask(fields: List[str]) -> str:
+            with time_stage("ai", "llm_reask"):
+                return await self.llm.generate(create_reask_prompt(prompt, fields), endpoint="polish")
+        
+        missing = await complete_response(polished_data, PolishedResume, reask, "ai")
+        defaults = {"contact_info": {}, "summary": ""}
+        for field in missing:
+            polished_data[field] = defaults.get(field, [])
+        
+        polished_data = PolishedResume.model_validate(polished_data).model_dump(exclude_unset=True)
+        return polished_data, not missing and not repaired
 
 # For testing
 if __name__ == "__main__":
@@ -0,0 +1,132 @@
+import os
+import gzip
+import logging
+from typing import Any, Dict, List, Optional
+
+try:
+    import brotli
+except ImportError:  # Brotli is in requirements.txt; a build without it serves gzip only
+    brotli = None
+
+from .metrics import COMPRESSED_RESPONSE_BYTES
+
+logger = logging.getLogger(__name__)
+
+# Smaller bodies go out as they are; compressing them saves less than it costs
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", 1024))
+GZIP_LEVEL = 6
+# Brotli's quality 4 compresses JSON better than gzip -6 at similar speed
+BROTLI_QUALITY = 4
+
+COMPRESSIBLE_TYPES = ("application/json", "text/plain", "text/html", "text/csv")
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    The encoding the client weights highest among those available, preferring
+    br to gzip at equal weight; None when neither is acceptable (q=0 or absent)
+    """
+    accepted = {}
+    for item in accept_encoding.lower().split(","):
+        name, *params = [part.strip() for part in item.split(";")]
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name:
+            accepted[name] = quality
+    available = ["br", "gzip"] if brotli is not None else ["gzip"]
+    weights = {encoding: accepted.get(encoding, accepted.get("*", 0.0)) for encoding in available}
+    best = max(available, key=lambda encoding: weights[encoding])
+    return best if weights[best] > 0 else None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing JSON and text responses of at least
+    COMPRESSION_MIN_BYTES with brotli or gzip, whichever the client prefers.
+
+    Only single-message bodies are compressed. Other content types (server-sent
+    events, NDJSON, PDFs) pass through untouched, headers included, the moment
+    they are sent, so streams aren't held back waiting for their first chunk.
+    """
+
+    def __init__(self, app: Any, min_bytes: int = COMPRESSION_MIN_BYTES):
+        self.app = app
+        self.min_bytes = min_bytes
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = dict(scope["headers"])
+        encoding = choose_encoding(request_headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: List[Dict[str, Any]] = []
+
+        async def send_compressed(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                headers = message.get("headers", [])
+                compressible = (
+                    _header(headers, b"content-type").split(";")[0].strip() in COMPRESSIBLE_TYPES
+                    and not _header(headers, b"content-encoding")
+                )
+                if not compressible:
+                    await send(message)
+                    return
+                # Hold the headers until the body shows whether it's worth compressing
+                start.append(message)
+                return
+            if message["type"] != "http.response.body" or not start:
+                await send(message)
+                return
+
+            response_start = start.pop()
+            headers = response_start["headers"]
+            headers = _set_header(headers, b"vary", _vary(_header(headers, b"vary")))
+            body = message.get("body", b"")
+            if message.get("more_body", False) or len(body) < self.min_bytes:
+                await send({**response_start, "headers": headers})
+                await send(message)
+                return
+
+            compressed = compress(body, encoding)
+            COMPRESSED_RESPONSE_BYTES.inc(len(body), encoding=encoding, stage="before")
+            COMPRESSED_RESPONSE_BYTES.inc(len(compressed), encoding=encoding, stage="after")
+            headers = _set_header(headers, b"content-encoding", encoding)
+            headers = _set_header(headers, b"content-length", str(len(compressed)))
+            await send({**response_start, "headers": headers})
+            await send({**message, "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
+
+
+def _header(headers: List, name: bytes) -> str:
+    for key, value in headers:
+        if key.lower() == name:
+            return value.decode("latin-1")
+    return ""
+
+
+def _set_header(headers: List, name: bytes, value: str) -> List:
+    return [(key, old) for key, old in headers if key.lower() != name] + [(name, value.encode("latin-1"))]
+
+
+def _vary(existing: str) -> str:
+    if "accept-encoding" in existing.lower():
+        return existing
+    return f"{existing}, Accept-Encoding" if existing else "Accept-Encoding"
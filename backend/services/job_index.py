@@ -0,0 +1,321 @@
+import os
+import re
+import time
+import uuid
+import zlib
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .match_scorer import COMMON_POSTING_TERMS, COMMON_TERM_WEIGHT
+from .metrics import time_stage
+
+logger = logging.getLogger(__name__)
+
+JOB_INDEX_DIR = os.getenv(
+    "JOB_INDEX_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'job_index')
+)
+# Width of the hashed feature vectors; only used when a new index is created
+JOB_INDEX_DIM = int(os.getenv("JOB_INDEX_DIM", 2048))
+JOB_INDEX_INITIAL_CAPACITY = 1024
+
+VECTOR_TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*")
+VECTOR_STOP_WORDS = frozenset({
+    'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'a', 'an',
+    'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had', 'do', 'does', 'did',
+    'will', 'would', 'could', 'should', 'we', 'as', 'it', 'i'
+})
+
+
+class HashedNgramVectorizer:
+    """
+    Embed text without a model or network: word unigrams and bigrams are hashed
+    into a fixed number of signed buckets, counts are dampened with log1p and
+    the vector is L2-normalized, so a dot product is the cosine similarity.
+    Common posting vocabulary is down-weighted like in the local match scorer.
+    """
+
+    def __init__(self, dim: int = JOB_INDEX_DIM):
+        self.dim = dim
+
+    def _features(self, text: str):
+        tokens = [token for token in VECTOR_TOKEN_PATTERN.findall(text.lower()) if token not in VECTOR_STOP_WORDS]
+        for index, token in enumerate(tokens):
+            yield token, COMMON_TERM_WEIGHT if token in COMMON_POSTING_TERMS else 1.0
+            if index:
+                yield f"{tokens[index - 1]} {token}", 1.0
+
+    def vectorize(self, text: str) -> np.ndarray:
+        buckets = []
+        values = []
+        for feature, weight in self._features(text):
+            # crc32 is stable across processes, unlike hash()
+            digest = zlib.crc32(feature.encode("utf-8"))
+            buckets.append(digest % self.dim)
+            values.append(-weight if digest & 0x80000000 else weight)
+
+        vector = np.zeros(self.dim, dtype=np.float32)
+        if buckets:
+            np.add.at(vector, np.asarray(buckets), np.asarray(values, dtype=np.float32))
+            vector = np.sign(vector) * np.log1p(np.abs(vector))
+            norm = np.linalg.norm(vector)
+            if norm:
+                vector /= norm
+        return vector
+
+
+class JobIndex:
+    """
+    Saved job postings with a cosine-similarity search.
+
+    Vectors live in a memory-mapped float32 matrix (vectors.f32, one row per
+    slot); posting text and the slot of each posting live in SQLite
+    (postings.db). Adds fill free slots or append rows, growing the file by
+    doubling; deletes free their slot. Neither rebuilds the index. The files
+    are opened on first use.
+
+    Several processes (the workers under serve.py) can share one index: slots
+    are allocated inside a SQLite write transaction, and every write bumps a
+    generation number that tells the other processes to reload their slot map.
+    """
+
+    def __init__(self, path: str = JOB_INDEX_DIR, dim: int = JOB_INDEX_DIM):
+        self.path = path
+        self.dim = dim
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._vectors: Optional[np.memmap] = None
+        self._alive: Optional[np.ndarray] = None
+        self._slot_ids: Dict[int, str] = {}
+        self._high_water = 0
+        self._generation = -1
+        self.vectorizer: Optional[HashedNgramVectorizer] = None
+
+    def _open(self) -> None:
+        # A connection inherited through fork (see serve.py) must not be used by the child
+        if self._pid != os.getpid():
+            self._conn = None
+            self._pid = os.getpid()
+        if self._conn is not None:
+            self._refresh()
+            return
+        os.makedirs(self.path, exist_ok=True)
+        # Autocommit; writes open their own BEGIN IMMEDIATE transactions
+        conn = sqlite3.connect(
+            os.path.join(self.path, "postings.db"), check_same_thread=False, isolation_level=None, timeout=30
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        with self._write(conn):
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS postings ("
+                "id TEXT PRIMARY KEY, slot INTEGER UNIQUE NOT NULL, title TEXT, text TEXT NOT NULL, "
+                "added_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS free_slots (slot INTEGER PRIMARY KEY)")
+            meta = dict(conn.execute("SELECT key, value FROM meta").fetchall())
+            if "dim" in meta:
+                if int(meta["dim"]) != self.dim:
+                    logger.warning(f"Job index at {self.path} uses {meta['dim']} dimensions, ignoring JOB_INDEX_DIM")
+                self.dim = int(meta["dim"])
+            else:
+                conn.executemany(
+                    "INSERT INTO meta (key, value) VALUES (?, ?)",
+                    [("dim", str(self.dim)), ("capacity", str(JOB_INDEX_INITIAL_CAPACITY))]
+                )
+            if "high_water" not in meta:
+                # Indexes created before slots were allocated in SQLite
+                used = {slot for (slot,) in conn.execute("SELECT slot FROM postings")}
+                high_water = max(used, default=-1) + 1
+                conn.executemany(
+                    "INSERT OR IGNORE INTO free_slots (slot) VALUES (?)",
+                    [(slot,) for slot in range(high_water) if slot not in used]
+                )
+                conn.executemany(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                    [("high_water", str(high_water)), ("generation", "0")]
+                )
+        self.vectorizer = HashedNgramVectorizer(self.dim)
+        self._conn = conn
+        self._generation = -1
+        self._refresh()
+        logger.info(f"Job index opened with {len(self._slot_ids)} postings")
+
+    @contextmanager
+    def _write(self, conn: sqlite3.Connection):
+        """A write transaction; BEGIN IMMEDIATE takes the lock up front so other processes wait for it"""
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            conn.execute("ROLLBACK")
+            # The in-memory slot map may have run ahead of the database; reload it next time
+            self._generation = -1
+            raise
+        conn.execute("COMMIT")
+
+    def _meta(self) -> Dict[str, int]:
+        return {key: int(value) for key, value in self._conn.execute(
+            "SELECT key, value FROM meta WHERE key IN ('capacity', 'high_water', 'generation')"
+        )}
+
+    def _refresh(self) -> None:
+        """Reload the slot map if another process has written since we last looked"""
+        meta = self._meta()
+        if meta["generation"] == self._generation:
+            return
+        capacity = meta["capacity"]
+        if self._vectors is None or len(self._vectors) != capacity:
+            self._vectors = self._map(capacity)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._slot_ids = {}
+        for posting_id, slot in self._conn.execute("SELECT id, slot FROM postings"):
+            self._slot_ids[slot] = posting_id
+            self._alive[slot] = True
+        self._high_water = meta["high_water"]
+        self._generation = meta["generation"]
+
+    def _map(self, capacity: int) -> np.memmap:
+        vectors_path = os.path.join(self.path, "vectors.f32")
+        size = capacity * self.dim * 4
+        with open(vectors_path, "ab") as f:
+            if f.tell() < size:
+                f.truncate(size)
+        return np.memmap(vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+
+    def _grow(self) -> None:
+        capacity = len(self._alive) * 2
+        self._vectors.flush()
+        self._vectors = self._map(capacity)
+        self._alive = np.concatenate([self._alive, np.zeros(capacity - len(self._alive), dtype=bool)])
+        self._conn.execute("UPDATE meta SET value = ? WHERE key = 'capacity'", (str(capacity),))
+
+    def _allocate_slot(self) -> int:
+        """A free slot, or a new row at the end; must run inside a write transaction"""
+        row = self._conn.execute("SELECT slot FROM free_slots ORDER BY slot LIMIT 1").fetchone()
+        if row is not None:
+            self._conn.execute("DELETE FROM free_slots WHERE slot = ?", row)
+            return row[0]
+        if self._high_water == len(self._alive):
+            self._grow()
+        slot = self._high_water
+        self._high_water += 1
+        self._conn.execute("UPDATE meta SET value = ? WHERE key = 'high_water'", (str(self._high_water),))
+        return slot
+
+    def _bump_generation(self) -> None:
+        self._generation += 1
+        self._conn.execute("UPDATE meta SET value = ? WHERE key = 'generation'", (str(self._generation),))
+
+    def add(self, postings: List[Dict[str, Any]]) -> List[str]:
+        """Add postings ({"text", optional "title" and "id"}) and return their ids"""
+        with self._lock:
+            self._open()
+        vectors = [
+            self.vectorizer.vectorize(f"{posting.get('title') or ''}\n{posting['text']}") for posting in postings
+        ]
+
+        ids = []
+        with self._lock:
+            self._open()
+            with self._write(self._conn):
+                # Under the write lock nobody else can change the slots; catch up with what they did before
+                self._refresh()
+                now = time.time()
+                for posting, vector in zip(postings, vectors):
+                    posting_id = posting.get("id") or uuid.uuid4().hex
+                    existing = self._conn.execute("SELECT slot FROM postings WHERE id = ?", (posting_id,)).fetchone()
+                    if existing is not None:
+                        slot = existing[0]
+                        self._conn.execute(
+                            "UPDATE postings SET title = ?, text = ?, added_at = ? WHERE id = ?",
+                            (posting.get("title"), posting["text"], now, posting_id)
+                        )
+                    else:
+                        slot = self._allocate_slot()
+                        # A plain INSERT: a slot that is somehow taken fails loudly instead of replacing a posting
+                        self._conn.execute(
+                            "INSERT INTO postings (id, slot, title, text, added_at) VALUES (?, ?, ?, ?, ?)",
+                            (posting_id, slot, posting.get("title"), posting["text"], now)
+                        )
+                    self._vectors[slot] = vector
+                    self._alive[slot] = True
+                    self._slot_ids[slot] = posting_id
+                    ids.append(posting_id)
+                self._vectors.flush()
+                self._bump_generation()
+        return ids
+
+    def delete(self, posting_id: str) -> bool:
+        with self._lock:
+            self._open()
+            with self._write(self._conn):
+                self._refresh()
+                row = self._conn.execute("SELECT slot FROM postings WHERE id = ?", (posting_id,)).fetchone()
+                if row is None:
+                    return False
+                slot = row[0]
+                self._conn.execute("DELETE FROM postings WHERE id = ?", (posting_id,))
+                self._conn.execute("INSERT INTO free_slots (slot) VALUES (?)", (slot,))
+                self._vectors[slot] = 0
+                self._vectors.flush()
+                self._alive[slot] = False
+                del self._slot_ids[slot]
+                self._bump_generation()
+            return True
+
+    def search(self, text: str, top_k: int = 10) -> List[Dict[str, Any]]:
+        """The top_k postings most similar to text, best first"""
+        with self._lock:
+            self._open()
+        with time_stage("job_index", "vectorize"):
+            query = self.vectorizer.vectorize(text)
+
+        with self._lock:
+            count = self._high_water
+            if not self._slot_ids or top_k <= 0:
+                return []
+            with time_stage("job_index", "search"):
+                scores = self._vectors[:count] @ query
+                scores[~self._alive[:count]] = -np.inf
+                k = min(top_k, len(self._slot_ids))
+                top = np.argpartition(-scores, k - 1)[:k]
+                top = top[np.argsort(-scores[top])]
+            ids = [self._slot_ids[int(slot)] for slot in top]
+            found = {
+                row[0]: row for row in self._conn.execute(
+                    f"SELECT id, title, substr(text, 1, 200) FROM postings WHERE id IN ({','.join('?' * len(ids))})",
+                    ids
+                )
+            }
+        return [
+            {"id": posting_id, "title": found[posting_id][1], "snippet": found[posting_id][2],
+             "score": round(float(scores[slot]), 4)}
+            for posting_id, slot in zip(ids, top)
+        ]
+
+    def get(self, posting_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._open()
+            row = self._conn.execute(
+                "SELECT id, title, text, added_at FROM postings WHERE id = ?", (posting_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"id": row[0], "title": row[1], "text": row[2], "added_at": row[3]}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._open()
+            return {
+                "postings": len(self._slot_ids),
+                "capacity": len(self._alive),
+                "dim": self.dim,
+                "path": self.path,
+            }
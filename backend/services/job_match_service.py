@@ -1,46 +1,273 @@
 import os
-import json
 import re
-from typing import Dict, List, Any
-import google.generativeai as genai
+import asyncio
+from collections import Counter
+from typing import Dict, List, Any, Optional, AsyncIterator, Iterator, Set, Tuple
 import logging
 
+from .llm_client import LLMClient, LLMTimeoutError, get_llm_client
+from .result_cache import ResultCache, make_cache_key
+from .single_flight import SingleFlight
+from .match_scorer import LocalMatchScorer
+from .prompt_format import PROMPT_MODE, compact_resume, compact_text, minify_schema, create_reask_prompt
+from .json_extract import extract_json, complete_response
+from .response_models import JobAnalysis
+from .metrics import (
+    time_stage, record_llm_sizes, JSON_PARSE_FAILURES, JSON_RESPONSE_REPAIRS, JOB_MATCH_ANALYSES
+)
+
 logger = logging.getLogger(__name__)
 
+# Batch matching: how many top keyword matches get a full model analysis
+BATCH_LLM_TOP_N = int(os.getenv("BATCH_LLM_TOP_N", 10))
+BATCH_LLM_CONCURRENCY = int(os.getenv("BATCH_LLM_CONCURRENCY", 4))
+# Upper bound on a client's top_n, so one request can't start a model call per posting
+BATCH_LLM_MAX_TOP_N = int(os.getenv("BATCH_LLM_MAX_TOP_N", 25))
+
+# Single matching: local scores inside this band are ambiguous and go to the model
+LOCAL_MATCH_LLM_MIN_SCORE = float(os.getenv("LOCAL_MATCH_LLM_MIN_SCORE", 35))
+LOCAL_MATCH_LLM_MAX_SCORE = float(os.getenv("LOCAL_MATCH_LLM_MAX_SCORE", 75))
+
+# Keyword matching
+STOP_WORDS = frozenset({
+    'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'a', 'an',
+    'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had', 'do', 'does', 'did',
+    'will', 'would', 'could', 'should'
+})
+KEYWORD_PATTERN = re.compile(r'\b[a-zA-Z]{3,}\b')
+TERM_PATTERN = re.compile(r'[a-z]+')
+
 class JobMatchService:
-    def __init__(self):
-        api_key = os.getenv("GOOGLE_API_KEY")
-        if not api_key:
-            raise ValueError("GOOGLE_API_KEY environment variable not set")
-        
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-2.0-flash-lite')
+    # Bump whenever _create_analysis_prompt changes so cached results are invalidated
+    ANALYSIS_PROMPT_VERSION = "analysis-v1"
+    COMPACT_ANALYSIS_PROMPT_VERSION = "analysis-compact-v1"
+    # Output shape for compact prompts, sent minified instead of an indented example
+    ANALYSIS_SCHEMA = {
+        "match_score": "int",
+        "overall_assessment": "str",
+        "strengths": ["str"],
+        "missing_keywords": ["str"],
+        "missing_skills": ["str"],
+        "knowledge_gaps": ["str"],
+        "suggestions": ["str"],
+        "concerns": ["str"],
+        "experience_match": {"score": "int", "notes": "str"},
+        "skills_match": {"score": "int", "notes": "str"},
+        "education_match": {"score": "int", "notes": "str"}
+    }
+
+    def __init__(
+        self,
+        cache: Optional[ResultCache] = None,
+        llm: Optional[LLMClient] = None,
+        prompt_mode: str = PROMPT_MODE
+    ):
+        # The shared client connects lazily, so no API key is needed until the first call
+        self.llm = llm or get_llm_client()
+        self.cache = cache
+        self.compact_prompts = prompt_mode == "compact"
+        self.prompt_version = (
+            self.COMPACT_ANALYSIS_PROMPT_VERSION if self.compact_prompts else self.ANALYSIS_PROMPT_VERSION
+        )
+        self.inflight = SingleFlight("job_match")
+        self.scorer = LocalMatchScorer()
     
-    def analyze_job_match(self, resume_content: Dict[str, Any], job_description: str) -> Dict[str, Any]:
+    async def analyze_job_match(
+        self,
+        resume_content: Dict[str, Any],
+        job_description: str,
+        depth: str = "auto"
+    ) -> Dict[str, Any]:
         """
-        Analyze how well a resume matches a job description
+        Analyze how well a resume matches a job description.
+        
+        The resume is scored locally first. With depth="auto" the model is only
+        asked when the local score is ambiguous; depth="full" always asks the
+        model and depth="local" never does.
         """
         try:
-            # Create analysis prompt
-            prompt = self._create_analysis_prompt(resume_content, job_description)
-            response = self.model.generate_content(prompt)
+            prepared = self._prepare_resume(resume_content)
+            with time_stage("job_match", "local_score"):
+                local = self._local_analysis(prepared, job_description)
             
-            # Parse the response
-            analysis = self._parse_analysis_response(response.text)
-            
-            # Add basic keyword analysis
-            keyword_analysis = self._analyze_keywords(resume_content, job_description)
-            analysis.update(keyword_analysis)
+            ambiguous = LOCAL_MATCH_LLM_MIN_SCORE <= local["match_score"] <= LOCAL_MATCH_LLM_MAX_SCORE
+            if depth == "local" or (depth == "auto" and not ambiguous):
+                JOB_MATCH_ANALYSES.inc(method="local")
+                return local
             
+            JOB_MATCH_ANALYSES.inc(method="llm")
+            analysis = await self._analyze_prepared(
+                prepared, job_description, {"keyword_analysis": local["keyword_analysis"]}
+            )
+            analysis.setdefault("analysis_method", "llm")
+            analysis["local_match_score"] = local["match_score"]
             return analysis
             
+        except LLMTimeoutError:
+            raise
         except Exception as e:
             logger.error(f"Error analyzing job match: {str(e)}")
             raise Exception(f"Failed to analyze job match: {str(e)}")
     
-    def _create_analysis_prompt(self, resume_content: Dict[str, Any], job_description: str) -> str:
+    async def analyze_batch(
+        self,
+        resume_content: Dict[str, Any],
+        job_descriptions: List[str],
+        top_n: int = BATCH_LLM_TOP_N,
+        max_parallel: int = BATCH_LLM_CONCURRENCY
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Rank one resume against many job descriptions.
+
+        The resume is prepared once and every posting gets a local keyword score.
+        Postings outside the top_n by keyword score are yielded straight away with
+        only the keyword analysis; the top_n go to the model with at most
+        max_parallel calls in flight and are yielded as each one finishes.
+        top_n is capped at BATCH_LLM_MAX_TOP_N. Closing the generator early
+        cancels the model calls still running.
+        """
+        top_n = min(max(0, top_n), BATCH_LLM_MAX_TOP_N)
+        prepared = self._prepare_resume(resume_content)
+        with time_stage("job_match", "batch_keywords"):
+            keyword_results = self._score_postings(prepared, job_descriptions)
+        
+        ranked = sorted(
+            range(len(job_descriptions)),
+            key=lambda i: keyword_results[i]["keyword_analysis"].get("keyword_match_score", 0),
+            reverse=True
+        )
+        ranks = {index: rank + 1 for rank, index in enumerate(ranked)}
+        
+        def result_for(index: int) -> Dict[str, Any]:
+            return {
+                "index": index,
+                "rank": ranks[index],
+                "keyword_analysis": keyword_results[index]["keyword_analysis"],
+                "analysis": None
+            }
+        
+        for index in ranked[top_n:]:
+            yield result_for(index)
+        
+        slots = asyncio.Semaphore(max(1, max_parallel))
+        
+        async def analyze(index: int) -> Dict[str, Any]:
+            result = result_for(index)
+            async with slots:
+                try:
+                    result["analysis"] = await self._analyze_prepared(
+                        prepared, job_descriptions[index], keyword_results[index], endpoint="batch"
+                    )
+                except Exception as e:
+                    logger.error(f"Batch analysis failed for posting {index}: {str(e)}")
+                    result["error"] = "AI analysis failed for this posting"
+            return result
+        
+        tasks = [asyncio.create_task(analyze(index)) for index in ranked[:top_n]]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield await finished
+        finally:
+            # The client went away or stopped reading; don't keep spending model calls on it
+            for task in tasks:
+                task.cancel()
+    
+    def _prepare_resume(self, resume_content: Dict[str, Any]) -> Dict[str, Any]:
+        """Do the per-resume work once so it can be reused across postings"""
+        return {
+            "content": resume_content,
+            "formatted": (
+                compact_resume(resume_content) if self.compact_prompts
+                else self._format_resume_for_analysis(resume_content)
+            ),
+            "terms": self._index_resume(resume_content),
+            "sections": self.scorer.index_resume({
+                name: TERM_PATTERN.findall(" ".join(self._iter_field_values(value)).lower())
+                for name, value in resume_content.items()
+            })
+        }
+    
+    def _local_analysis(self, prepared: Dict[str, Any], job_description: str) -> Dict[str, Any]:
+        """Full analysis from the local scorer, without a model call"""
+        analysis = self.scorer.score(prepared["sections"], self._keyword_counts(job_description))
+        analysis.update(self._analyze_keywords(prepared["content"], job_description, prepared["terms"]))
+        analysis["analysis_method"] = "local"
+        return analysis
+    
+    async def _analyze_prepared(
+        self,
+        prepared: Dict[str, Any],
+        job_description: str,
+        keyword_analysis: Optional[Dict[str, Any]] = None,
+        endpoint: str = "analyze"
+    ) -> Dict[str, Any]:
+        """Run the model analysis for a prepared resume and merge in keyword analysis"""
+        cache_key = make_cache_key(
+            self.llm.model_name, self.prompt_version, prepared["content"], job_description
+        )
+        if self.cache:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        # Identical requests already in flight share that model call
+        return await self.inflight.do(
+            cache_key,
+            lambda: self._analyze_uncached(prepared, job_description, keyword_analysis, endpoint, cache_key)
+        )
+    
+    async def _analyze_uncached(
+        self,
+        prepared: Dict[str, Any],
+        job_description: str,
+        keyword_analysis: Optional[Dict[str, Any]],
+        endpoint: str,
+        cache_key: str
+    ) -> Dict[str, Any]:
+        # Create analysis prompt
+        with time_stage("job_match", "prompt_build"):
+            prompt = self._create_analysis_prompt(prepared["content"], job_description, prepared["formatted"])
+        with time_stage("job_match", "llm_call"):
+            response_text = await self.llm.generate(prompt, endpoint=endpoint)
+        record_llm_sizes("job_match", prompt, response_text)
+        
+        # Parse the response
+        analysis, complete = await self._parse_analysis_response(
+            response_text, prompt, prepared, job_description, endpoint
+        )
+        
+        # Add basic keyword analysis
+        if keyword_analysis is None:
+            with time_stage("job_match", "keywords"):
+                keyword_analysis = self._analyze_keywords(prepared["content"], job_description, prepared["terms"])
+        analysis.update(keyword_analysis)
+        
+        # Don't cache the fallback structure returned on parse failures
+        if self.cache and complete:
+            self.cache.set(cache_key, analysis)
+        return analysis
+    
+    def _score_postings(self, prepared: Dict[str, Any], job_descriptions: List[str]) -> List[Dict[str, Any]]:
+        """Keyword analysis for every posting against one prepared resume"""
+        return [
+            self._analyze_keywords(prepared["content"], job_description, prepared["terms"])
+            for job_description in job_descriptions
+        ]
+    
+    def _create_analysis_prompt(
+        self,
+        resume_content: Dict[str, Any],
+        job_description: str,
+        resume_text: Optional[str] = None
+    ) -> str:
         """Create prompt for job match analysis"""
-        resume_text = self._format_resume_for_analysis(resume_content)
+        if self.compact_prompts:
+            return self._create_compact_analysis_prompt(
+                resume_text if resume_text is not None else compact_resume(resume_content), job_description
+            )
+        
+        if resume_text is None:
+            resume_text = self._format_resume_for_analysis(resume_content)
         
         return f"""
         You are an expert recruiter and career advisor. Please analyze how well this resume matches the given job description.
@@ -104,6 +331,17 @@ class JobMatchService:
         Ensure the JSON is valid and provide actionable insights.
         """
     
+    def _create_compact_analysis_prompt(self, resume_text: str, job_description: str) -> str:
+        """Same instructions as the full prompt with a minified schema and compacted input"""
+        return (
+            "You are an expert recruiter. Analyze how well the resume matches the job: a 0-100 match score "
+            "from skills, experience and requirements alignment, missing keywords and skills, specific "
+            "suggestions, strengths and concerns.\n"
+            "Reply with only a JSON object in this shape (values show types; scores are integers 0-100):\n"
+            f"{minify_schema(self.ANALYSIS_SCHEMA)}\n"
+            f"RESUME:\n{resume_text}\nJOB:\n{compact_text(job_description)}"
+        )
+    
     def _format_resume_for_analysis(self, resume_content: Dict[str, Any]) -> str:
         """Format resume content for analysis"""
         formatted = []
@@ -132,19 +370,26 @@ class JobMatchService:
         
         return "\n".join(formatted)
     
-    def _analyze_keywords(self, resume_content: Dict[str, Any], job_description: str) -> Dict[str, Any]:
+    def _analyze_keywords(
+        self,
+        resume_content: Dict[str, Any],
+        job_description: str,
+        resume_terms: Optional[Set[str]] = None
+    ) -> Dict[str, Any]:
         """Basic keyword analysis"""
         try:
             # Extract keywords from job description
-            job_keywords = self._extract_keywords(job_description.lower())
+            job_keywords = self._extract_keywords(job_description)
             
-            # Extract keywords from resume
-            resume_text = json.dumps(resume_content).lower()
-            resume_keywords = set(resume_text.split())
+            # Index the resume's field values (not its key names)
+            if resume_terms is None:
+                resume_terms = self._index_resume(resume_content)
             
-            # Find missing keywords
-            missing_keywords = [kw for kw in job_keywords if kw not in resume_text]
-            found_keywords = [kw for kw in job_keywords if kw in resume_text]
+            # Split into found and missing keywords with whole-term lookups
+            found_keywords = []
+            missing_keywords = []
+            for kw in job_keywords:
+                (found_keywords if kw in resume_terms else missing_keywords).append(kw)
             
             # Calculate basic match percentage
             if job_keywords:
@@ -166,49 +411,77 @@ class JobMatchService:
     
     def _extract_keywords(self, text: str) -> List[str]:
         """Extract important keywords from text"""
+        # Unique keywords in order of first appearance
+        return list(self._keyword_counts(text))
+    
+    def _keyword_counts(self, text: str) -> Dict[str, int]:
+        """Count keywords in text, keyed in order of first appearance"""
         # Remove common words and extract meaningful terms
-        common_words = {'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'a', 'an', 'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should'}
+        words = KEYWORD_PATTERN.findall(text.lower())
+        return Counter(word for word in words if word not in STOP_WORDS)
+    
+    def _index_resume(self, resume_content: Dict[str, Any]) -> Set[str]:
+        """Build the set of terms that appear in the resume's field values"""
+        terms: Set[str] = set()
+        for value in self._iter_field_values(resume_content):
+            terms.update(TERM_PATTERN.findall(value.lower()))
+        return terms
+    
+    def resume_text(self, resume_content: Dict[str, Any]) -> str:
+        """The resume's field values as plain text, without key names; what the local scorer matches on"""
+        return "\n".join(self._iter_field_values(resume_content))
+    
+    def _iter_field_values(self, value: Any) -> Iterator[str]:
+        """Yield every string value in a nested resume structure"""
+        if isinstance(value, str):
+            yield value
+        elif isinstance(value, dict):
+            for item in value.values():
+                yield from self._iter_field_values(item)
+        elif isinstance(value, (list, tuple)):
+            for item in value:
+                yield from self._iter_field_values(item)
+        elif value is not None:
+            yield str(value)
+    
+    async def _parse_analysis_response(
+        self,
+        response_text: str,
+        prompt: str,
+        prepared: Dict[str, Any],
+        job_description: str,
+        endpoint: str
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Parse the AI analysis response. Missing or invalid fields are requested
+        once more on their own, then taken from the local analysis; returns the
+        analysis and whether it is complete (and can be cached).
+        """
+        with time_stage("job_match", "parse"):
+            analysis, repaired = extract_json(response_text)
         
-        # Clean and split text
-        words = re.findall(r'\b[a-zA-Z]{3,}\b', text.lower())
-        keywords = [word for word in words if word not in common_words]
+        if analysis is None:
+            logger.error("Failed to parse analysis JSON")
+            JSON_PARSE_FAILURES.inc(service="job_match")
+            # Fall back to the local analysis rather than a flat default score
+            analysis = self._local_analysis(prepared, job_description)
+            analysis["error"] = "Failed to parse detailed analysis"
+            return analysis, False
+        if repaired:
+            JSON_RESPONSE_REPAIRS.inc(service="job_match", repair="truncation")
         
-        # Return unique keywords
-        return list(set(keywords))
-    
-    def _parse_analysis_response(self, response_text: str) -> Dict[str, Any]:
-        """Parse the AI analysis response"""
-        try:
-            # Clean and extract JSON
-            response_text = response_text.strip()
-            start_idx = response_text.find('{')
-            end_idx = response_text.rfind('}') + 1
-            
-            if start_idx == -1 or end_idx == 0:
-                raise ValueError("No JSON found in response")
-            
-            json_text = response_text[start_idx:end_idx]
-            analysis = json.loads(json_text)
-            
-            # Validate and set defaults
-            if 'match_score' not in analysis:
-                analysis['match_score'] = 50
-            
-            return analysis
-            
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse analysis JSON: {str(e)}")
-            return {
-                "match_score": 50,
-                "overall_assessment": "Analysis parsing failed",
-                "strengths": [],
-                "missing_keywords": [],
-                "suggestions": ["Please review the job description and update your resume accordingly"],
-                "error": "Failed to parse detailed analysis"
-            }
-        except Exception as e:
-            logger.error(f"Error parsing analysis response: {str(e)}")
-            raise Exception(f"Failed to parse job analysis: {str(e)}")
+        async def reask(fields: List[str]) -> str:
+            with time_stage("job_match", "llm_reask"):
+                return await self.llm.generate(create_reask_prompt(prompt, fields), endpoint=endpoint)
+        
+        missing = await complete_response(analysis, JobAnalysis, reask, "job_match")
+        if missing:
+            local = self._local_analysis(prepared, job_description)
+            for field in missing:
+                analysis[field] = local[field]
+        
+        analysis = JobAnalysis.model_validate(analysis).model_dump(exclude_unset=True)
+        return analysis, not missing and not repaired
 
 # For testing
 if __name__ == "__main__":
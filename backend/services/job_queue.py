@@ -0,0 +1,449 @@
+import os
+import json
+import time
+import uuid
+import asyncio
+import sqlite3
+import logging
+import threading
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from .metrics import JOB_QUEUE_DEPTH, JOB_QUEUE_WAIT_SECONDS, JOBS_FINISHED, time_stage
+
+logger = logging.getLogger(__name__)
+
+# Workers per lane, e.g. "fast=2,llm=4". Each lane has its own workers, so
+# quick PDF renders never wait behind model calls.
+JOB_QUEUE_WORKERS = os.getenv("JOB_QUEUE_WORKERS", "fast=2,llm=4")
+JOB_QUEUE_MAX_PENDING = int(os.getenv("JOB_QUEUE_MAX_PENDING", 1000))
+JOB_RESULT_TTL_SECONDS = float(os.getenv("JOB_RESULT_TTL_SECONDS", 3600))
+# Persist jobs and results here so queued jobs survive a restart (empty = in memory only)
+JOB_QUEUE_DB = os.getenv("JOB_QUEUE_DB", "")
+
+FINISHED_STATUSES = ("succeeded", "failed")
+# How often a job owned by another worker process is re-read from the store while being watched
+STORE_POLL_SECONDS = 0.5
+# How often finished jobs past JOB_RESULT_TTL_SECONDS are dropped, even when no new jobs arrive
+JOB_EXPIRE_INTERVAL_SECONDS = 60
+
+
+class JobQueueFullError(Exception):
+    """Raised when too many jobs are already queued"""
+
+
+def _parse_lane_workers(spec: str) -> Dict[str, int]:
+    lanes = {}
+    for item in spec.split(","):
+        name, _, value = item.partition("=")
+        if name.strip() and value.strip().isdigit():
+            lanes[name.strip()] = max(1, int(value))
+    return lanes
+
+
+def _process_alive(pid: Optional[int]) -> bool:
+    if pid is None:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class Job:
+    def __init__(self, job_id: str, kind: str, payload: Dict[str, Any], created_at: float):
+        self.id = job_id
+        self.kind = kind
+        self.payload = payload
+        self.status = "queued"
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = created_at
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        # Binary results are dropped from memory once the store has them
+        self.result_in_store = False
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    def snapshot(self, include_result: bool = True) -> Dict[str, Any]:
+        """Public view of the job; binary results are left out"""
+        data = {
+            "id": self.id,
+            "type": self.kind,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if self.error:
+            data["error"] = self.error
+        if (include_result and self.status == "succeeded" and not self.result_in_store
+                and not isinstance(self.result, bytes)):
+            data["result"] = self.result
+        return data
+
+
+class SQLiteJobStore:
+    """
+    Durable record of jobs and their results, shared by all worker processes.
+    Each job records the pid of the process whose queue holds it.
+    """
+
+    COLUMNS = ("id, kind, payload, status, result, result_is_json, error, created_at, started_at, finished_at, "
+               "owner")
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._conn = self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, kind TEXT NOT NULL, payload TEXT NOT NULL, status TEXT NOT NULL, "
+            "result BLOB, result_is_json INTEGER, error TEXT, "
+            "created_at REAL NOT NULL, started_at REAL, finished_at REAL, owner INTEGER)"
+        )
+        try:
+            # Stores created before jobs had owners
+            conn.execute("ALTER TABLE jobs ADD COLUMN owner INTEGER")
+        except sqlite3.OperationalError:
+            pass
+        conn.commit()
+        return conn
+
+    def _db(self) -> sqlite3.Connection:
+        # A connection inherited through fork (see serve.py) must not be used by the child
+        if self._pid != os.getpid():
+            self._conn = self._connect()
+            self._pid = os.getpid()
+        return self._conn
+
+    @staticmethod
+    def _job(row: Tuple) -> Job:
+        job = Job(row[0], row[1], json.loads(row[2]), row[7])
+        job.status, job.error, job.started_at, job.finished_at = row[3], row[6], row[8], row[9]
+        job.result = json.loads(row[4]) if row[5] else row[4]
+        return job
+
+    def save(self, job: Job) -> None:
+        if isinstance(job.result, bytes) or job.result is None:
+            result, is_json = job.result, 0
+        else:
+            result, is_json = json.dumps(job.result), 1
+        with self._lock:
+            db = self._db()
+            db.execute(
+                f"INSERT OR REPLACE INTO jobs ({self.COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job.id, job.kind, json.dumps(job.payload), job.status, result, is_json, job.error,
+                 job.created_at, job.started_at, job.finished_at, os.getpid())
+            )
+            db.commit()
+
+    def load_one(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._db().execute(f"SELECT {self.COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._job(row) if row else None
+
+    def claim_orphans(self) -> List[Job]:
+        """
+        Take over unfinished jobs whose process is gone, or was an earlier
+        process with this pid (a restarted container), so they can be re-queued here
+        """
+        pid = os.getpid()
+        claimed = []
+        with self._lock:
+            db = self._db()
+            rows = db.execute(
+                f"SELECT {self.COLUMNS} FROM jobs WHERE status NOT IN (?, ?) ORDER BY created_at", FINISHED_STATUSES
+            ).fetchall()
+            for row in rows:
+                owner = row[10]
+                if owner != pid and _process_alive(owner):
+                    continue
+                # Another worker starting at the same time may get there first
+                cursor = db.execute("UPDATE jobs SET owner = ? WHERE id = ? AND owner IS ?", (pid, row[0], owner))
+                if cursor.rowcount:
+                    claimed.append(self._job(row))
+            db.commit()
+        return claimed
+
+    def delete_finished_before(self, cutoff: float) -> None:
+        with self._lock:
+            db = self._db()
+            db.execute("DELETE FROM jobs WHERE finished_at < ?", (cutoff,))
+            db.commit()
+
+
+class JobQueue:
+    """
+    In-process job queue for long-running operations.
+
+    Each job type is registered with a lane and an async handler. Every lane
+    has its own asyncio queue and workers, so lanes don't block each other.
+    Job state can be polled or watched; with a store, jobs and results are
+    persisted and unfinished jobs are re-queued on start. Finished jobs are
+    kept for JOB_RESULT_TTL_SECONDS and swept every JOB_EXPIRE_INTERVAL_SECONDS.
+    """
+
+    def __init__(
+        self,
+        lane_workers: Optional[Dict[str, int]] = None,
+        store: Optional[SQLiteJobStore] = None,
+        max_pending: int = JOB_QUEUE_MAX_PENDING,
+        result_ttl: float = JOB_RESULT_TTL_SECONDS
+    ):
+        self.lane_workers = lane_workers or _parse_lane_workers(JOB_QUEUE_WORKERS)
+        self.store = store
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+        self.jobs: Dict[str, Job] = {}
+        self._handlers: Dict[str, Tuple[str, Callable[[Dict[str, Any]], Awaitable[Any]]]] = {}
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._workers: List[asyncio.Task] = []
+        self._sweeper: Optional[asyncio.Task] = None
+        # The event loop the workers run on; lifespans in tests and benchmarks each bring their own
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._running: Set[asyncio.Task] = set()
+        self._closing = False
+        self._watchers: Dict[str, List[asyncio.Queue]] = {}
+
+    @classmethod
+    def from_env(cls) -> "JobQueue":
+        store = None
+        if JOB_QUEUE_DB:
+            try:
+                store = SQLiteJobStore(JOB_QUEUE_DB)
+            except sqlite3.Error as e:
+                logger.error(f"Persistent job queue disabled: {str(e)}")
+        return cls(store=store)
+
+    def register(self, kind: str, lane: str, handler: Callable[[Dict[str, Any]], Awaitable[Any]]) -> None:
+        if lane not in self.lane_workers:
+            raise ValueError(f"Unknown job queue lane: {lane}")
+        self._handlers[kind] = (lane, handler)
+
+    def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._workers:
+            return
+        if self._loop is not None and self._loop is not loop:
+            # Workers and queues from an earlier event loop died with it; jobs they held start over here
+            self._forget_workers()
+        self._loop = loop
+        self._closing = False
+        for lane, workers in self.lane_workers.items():
+            self._queues[lane] = asyncio.Queue()
+            for _ in range(workers):
+                self._workers.append(asyncio.create_task(self._work(lane)))
+        self._sweeper = asyncio.create_task(self._sweep())
+        for job in sorted(self.jobs.values(), key=lambda job: job.created_at):
+            if not job.finished:
+                job.status, job.started_at = "queued", None
+                self._enqueue(job)
+
+        if self.store is not None:
+            requeued = 0
+            try:
+                orphans = self.store.claim_orphans()
+            except sqlite3.Error as e:
+                logger.error(f"Could not re-queue unfinished jobs: {str(e)}")
+                orphans = []
+            for job in orphans:
+                if job.kind in self._handlers:
+                    # Jobs that were running when their process stopped start over
+                    job.status, job.started_at = "queued", None
+                    self.jobs[job.id] = job
+                    self._save(job)
+                    self._enqueue(job)
+                    requeued += 1
+            if requeued:
+                logger.info(f"Re-queued {requeued} unfinished jobs")
+        logger.info(f"Job queue started with lanes {self.lane_workers}")
+
+    async def shutdown(self, drain_timeout: float = 0.0) -> None:
+        """
+        Stop the workers. Jobs already running get up to drain_timeout seconds
+        to finish; queued jobs are left in the store, if any, for the next start.
+        """
+        if self._loop is not asyncio.get_running_loop():
+            # Started on a loop that is gone; there is nothing left to wait for
+            self._forget_workers()
+            return
+        self._closing = True
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+        busy = [worker for worker in self._workers if worker in self._running]
+        for worker in self._workers:
+            if worker not in self._running:
+                worker.cancel()
+        if busy and drain_timeout > 0:
+            logger.info(f"Waiting up to {drain_timeout:.0f}s for {len(busy)} running jobs")
+            await asyncio.wait(busy, timeout=drain_timeout)
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._forget_workers()
+
+    def _forget_workers(self) -> None:
+        self._workers = []
+        self._running = set()
+        self._queues = {}
+        self._sweeper = None
+        self._loop = None
+
+    def submit(self, kind: str, payload: Dict[str, Any]) -> Job:
+        """Queue a job and return it straight away"""
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job type: {kind}")
+        if self.pending() >= self.max_pending:
+            raise JobQueueFullError("Too many queued jobs")
+        self._expire()
+
+        job = Job(uuid.uuid4().hex, kind, payload, time.time())
+        self.jobs[job.id] = job
+        self._save(job)
+        self._enqueue(job)
+        return job
+
+    def result(self, job: Job) -> Any:
+        """A finished job's result, read back from the store if it was dropped from memory"""
+        if not job.result_in_store:
+            return job.result
+        stored = self.store.load_one(job.id) if self.store is not None else None
+        return stored.result if stored is not None else None
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """A job from this queue, or with a store, from any worker process's queue"""
+        job = self.jobs.get(job_id)
+        if job is None and self.store is not None:
+            try:
+                job = self.store.load_one(job_id)
+            except sqlite3.Error as e:
+                logger.error(f"Failed to load job {job_id}: {str(e)}")
+        return job
+
+    async def watch(self, job_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """Yield the job's snapshot now and after every status change until it finishes"""
+        if job_id not in self.jobs:
+            # Queued by another worker process; follow it through the store
+            async for snapshot in self._poll_store(job_id):
+                yield snapshot
+            return
+
+        job = self.jobs[job_id]
+        updates: asyncio.Queue = asyncio.Queue()
+        self._watchers.setdefault(job_id, []).append(updates)
+        try:
+            snapshot = job.snapshot()
+            yield snapshot
+            while snapshot["status"] not in FINISHED_STATUSES:
+                snapshot = await updates.get()
+                yield snapshot
+        finally:
+            self._watchers[job_id].remove(updates)
+            if not self._watchers[job_id]:
+                del self._watchers[job_id]
+
+    async def _poll_store(self, job_id: str) -> AsyncIterator[Dict[str, Any]]:
+        status = None
+        while True:
+            job = self.get(job_id)
+            if job is None:
+                return
+            if job.status != status:
+                status = job.status
+                yield job.snapshot()
+            if job.finished:
+                return
+            await asyncio.sleep(STORE_POLL_SECONDS)
+
+    def pending(self, lane: Optional[str] = None) -> int:
+        lanes = [lane] if lane else list(self._queues)
+        return sum(self._queues[name].qsize() for name in lanes if name in self._queues)
+
+    def stats(self) -> Dict[str, Any]:
+        counts: Dict[str, int] = {}
+        for job in self.jobs.values():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {
+            "lanes": {lane: {"workers": workers, "queued": self.pending(lane)}
+                      for lane, workers in self.lane_workers.items()},
+            "jobs": counts,
+            "persistent": self.store is not None,
+        }
+
+    def _enqueue(self, job: Job) -> None:
+        lane = self._handlers[job.kind][0]
+        self._queues[lane].put_nowait(job)
+        JOB_QUEUE_DEPTH.set(self._queues[lane].qsize(), lane=lane)
+
+    def _save(self, job: Job) -> bool:
+        """Persist the job if there is a store; True if it was saved"""
+        if self.store is None:
+            return False
+        try:
+            self.store.save(job)
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Failed to persist job {job.id}: {str(e)}")
+            return False
+
+    def _publish(self, job: Job) -> bool:
+        saved = self._save(job)
+        for updates in self._watchers.get(job.id, []):
+            updates.put_nowait(job.snapshot())
+        return saved
+
+    async def _sweep(self) -> None:
+        while True:
+            await asyncio.sleep(JOB_EXPIRE_INTERVAL_SECONDS)
+            self._expire()
+
+    def _expire(self) -> None:
+        cutoff = time.time() - self.result_ttl
+        expired = [job.id for job in self.jobs.values() if job.finished and job.finished_at < cutoff]
+        for job_id in expired:
+            del self.jobs[job_id]
+        if self.store is not None:
+            try:
+                self.store.delete_finished_before(cutoff)
+            except sqlite3.Error as e:
+                logger.error(f"Failed to expire stored jobs: {str(e)}")
+
+    async def _work(self, lane: str) -> None:
+        queue = self._queues[lane]
+        worker = asyncio.current_task()
+        while not self._closing:
+            job = await queue.get()
+            self._running.add(worker)
+            JOB_QUEUE_DEPTH.set(queue.qsize(), lane=lane)
+            job.status, job.started_at = "running", time.time()
+            JOB_QUEUE_WAIT_SECONDS.observe(job.started_at - job.created_at, lane=lane)
+            self._publish(job)
+
+            _, handler = self._handlers[job.kind]
+            try:
+                with time_stage("job_queue", job.kind):
+                    job.result = await handler(job.payload)
+                job.status = "succeeded"
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job {job.id} ({job.kind}) failed: {str(e)}")
+                job.status, job.error = "failed", str(e)
+            job.finished_at = time.time()
+            JOBS_FINISHED.inc(kind=job.kind, status=job.status)
+            if self._publish(job) and isinstance(job.result, bytes):
+                # The store has it; don't hold large binary results (PDFs) in memory as well
+                job.result, job.result_in_store = None, True
+            queue.task_done()
+            self._running.discard(worker)
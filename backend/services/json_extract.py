@@ -0,0 +1,283 @@
+import re
+import json
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+
+from .metrics import JSON_RESPONSE_REPAIRS
+
+logger = logging.getLogger(__name__)
+
+_UNPARSEABLE = object()
+
+CODE_FENCE_PATTERN = re.compile(r"```[a-zA-Z]*[ \t]*\n?")
+# How many opening braces to try before giving up on a response
+MAX_START_CANDIDATES = 5
+# How many truncation points to try when repairing a cut-off response
+MAX_REPAIR_ATTEMPTS = 32
+
+
+class IncrementalSectionParser:
+    """
+    Incrementally scan a model response containing one JSON object and report
+    each top-level field as soon as its value is complete.
+
+    Fields named in item_sections are lists of objects; for those, every list
+    item is reported on its own as soon as it closes. Events are
+    (field, index, value) tuples where index is None for whole fields.
+    Anything before the first "{" (prose, code fences) is skipped.
+    """
+
+    def __init__(self, item_sections: Iterable[str] = ()):
+        self.item_sections = set(item_sections)
+        self.buffer = ""
+        self.done = False
+        self._pos = 0
+        self._depth = 0
+        self._started = False
+        self._in_string = False
+        self._escape = False
+        self._expect_key = True
+        self._key: Optional[str] = None
+        self._key_start: Optional[int] = None
+        self._value_start: Optional[int] = None
+        self._item_start: Optional[int] = None
+        self._item_index = 0
+
+    def feed(self, text: str) -> List[Tuple[str, Optional[int], Any]]:
+        """Add more response text and return the fields completed by it"""
+        self.buffer += text
+        events: List[Tuple[str, Optional[int], Any]] = []
+        buffer = self.buffer
+
+        while self._pos < len(buffer) and not self.done:
+            pos = self._pos
+            ch = buffer[pos]
+            self._pos += 1
+
+            if not self._started:
+                if ch == '{':
+                    self._started = True
+                    self._depth = 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._key_start is not None:
+                        self._key = self._loads(buffer[self._key_start:pos + 1])
+                        self._key_start = None
+                continue
+
+            top_level = self._depth == 1
+            if top_level and not self._expect_key and self._value_start is None and not ch.isspace():
+                self._value_start = pos
+
+            if ch == '"':
+                self._in_string = True
+                if top_level and self._expect_key:
+                    self._key_start = pos
+            elif ch == ':' and top_level:
+                self._expect_key = False
+                self._value_start = None
+            elif ch == ',' and top_level:
+                self._emit_scalar(buffer, pos, events)
+                self._expect_key = True
+            elif ch in '{[':
+                if (ch == '{' and self._depth == 2 and self._key in self.item_sections
+                        and buffer[self._value_start] == '['):
+                    self._item_start = pos
+                self._depth += 1
+            elif ch in '}]':
+                self._depth -= 1
+                if self._depth == 2 and self._item_start is not None:
+                    item = self._loads(buffer[self._item_start:pos + 1])
+                    if item is not _UNPARSEABLE:
+                        events.append((self._key, self._item_index, item))
+                    self._item_index += 1
+                    self._item_start = None
+                elif self._depth == 1 and self._value_start is not None:
+                    if self._key not in self.item_sections:
+                        value = self._loads(buffer[self._value_start:pos + 1])
+                        if value is not _UNPARSEABLE:
+                            events.append((self._key, None, value))
+                    self._value_start = None
+                    self._item_index = 0
+                elif self._depth == 0:
+                    self._emit_scalar(buffer, pos, events)
+                    self.done = True
+
+        return events
+
+    def _emit_scalar(self, buffer: str, end: int, events: List[Tuple[str, Optional[int], Any]]) -> None:
+        if self._key is not None and self._value_start is not None:
+            value = self._loads(buffer[self._value_start:end].strip())
+            if value is not _UNPARSEABLE:
+                events.append((self._key, None, value))
+        self._value_start = None
+
+    @staticmethod
+    def _loads(text: str) -> Any:
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            logger.debug(f"Skipping unparseable streamed JSON fragment: {text[:80]}")
+            return _UNPARSEABLE
+
+
+class JSONExtractor:
+    """
+    Find the first JSON object in model output, fed all at once or chunk by chunk.
+
+    Anything before the object (prose, an opening code fence) and after its
+    closing brace (a closing fence, prose that mentions braces) is ignored. If
+    the output ends before the object closes, result() repairs it by cutting
+    back to the last complete member and closing the open containers, so a
+    cut-off field is dropped rather than kept half-written.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.repaired = False
+        self._pos = 0
+        self._start: Optional[int] = None
+        self._end: Optional[int] = None
+        self._closers: List[str] = []
+        self._in_string = False
+        self._escape = False
+        # (cut position, closers needed to make buffer[start:cut] a complete object)
+        self._cut_points: deque = deque(maxlen=MAX_REPAIR_ATTEMPTS)
+
+    @property
+    def done(self) -> bool:
+        return self._end is not None
+
+    def feed(self, text: str) -> bool:
+        """Add more output; returns True once the object has closed"""
+        self.buffer += text
+        buffer = self.buffer
+
+        while self._pos < len(buffer) and self._end is None:
+            pos = self._pos
+            ch = buffer[pos]
+            self._pos += 1
+
+            if self._start is None:
+                if ch == '{':
+                    self._start = pos
+                    self._closers = ['}']
+                    self._cut_points.append((pos + 1, '}'))
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if ch == '"':
+                self._in_string = True
+            elif ch in '{[':
+                self._closers.append('}' if ch == '{' else ']')
+            elif ch in '}]':
+                self._closers.pop()
+                if not self._closers:
+                    self._end = pos + 1
+            elif ch == ',':
+                self._cut_points.append((pos, ''.join(reversed(self._closers))))
+
+        return self._end is not None
+
+    def result(self) -> Optional[Dict[str, Any]]:
+        """The parsed object, repaired if the output was cut off, or None"""
+        if self._start is None:
+            return None
+        if self._end is not None:
+            value = IncrementalSectionParser._loads(self.buffer[self._start:self._end])
+            return value if isinstance(value, dict) else None
+
+        for cut, closers in reversed(self._cut_points):
+            value = IncrementalSectionParser._loads(self.buffer[self._start:cut] + closers)
+            if isinstance(value, dict):
+                self.repaired = True
+                return value
+        return None
+
+
+def extract_json(text: str) -> Tuple[Optional[Dict[str, Any]], bool]:
+    """
+    Extract the JSON object from a complete model response.
+
+    The body of a code fence is tried first, then each opening brace in turn,
+    so braces in prose before the object do not hide it. Returns the object
+    (or None) and whether it had to be repaired after truncation.
+    """
+    starts = []
+    fence = CODE_FENCE_PATTERN.search(text)
+    if fence is not None:
+        starts.append(fence.end())
+    position = text.find('{')
+    while position != -1 and len(starts) < MAX_START_CANDIDATES:
+        starts.append(position)
+        position = text.find('{', position + 1)
+
+    for start in dict.fromkeys(starts):
+        extractor = JSONExtractor()
+        extractor.feed(text[start:])
+        value = extractor.result()
+        if value is not None:
+            return value, extractor.repaired
+    return None, False
+
+
+def invalid_fields(data: Dict[str, Any], model: Type[BaseModel]) -> List[str]:
+    """Top-level fields of data that are missing or fail validation against model"""
+    try:
+        model.model_validate(data)
+        return []
+    except ValidationError as e:
+        bad = {str(error["loc"][0]) for error in e.errors() if error["loc"]}
+        return [name for name in model.model_fields if name in bad]
+
+
+async def complete_response(
+    data: Dict[str, Any],
+    model: Type[BaseModel],
+    reask: Callable[[List[str]], Awaitable[str]],
+    service: str
+) -> List[str]:
+    """
+    Fill in missing or invalid fields of a parsed response by asking the model
+    for just those fields once. Fields that are still unusable are removed from
+    data and returned.
+    """
+    bad = invalid_fields(data, model)
+    if not bad:
+        return []
+
+    JSON_RESPONSE_REPAIRS.inc(service=service, repair="reask")
+    logger.warning(f"Model response missing or invalid fields {bad}, asking for just those")
+    try:
+        extra, _ = extract_json(await reask(bad))
+    except Exception as e:
+        logger.error(f"Re-asking for missing fields failed: {str(e)}")
+        extra = None
+    for name in bad:
+        if extra and name in extra:
+            data[name] = extra[name]
+        else:
+            data.pop(name, None)
+
+    still_bad = invalid_fields(data, model)
+    for name in still_bad:
+        data.pop(name, None)
+    return still_bad
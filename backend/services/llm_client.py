@@ -0,0 +1,289 @@
+import os
+import json
+import random
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+GEMINI_MODEL_NAME = os.getenv("GEMINI_MODEL", "gemini-2.0-flash-lite")
+
+# "gemini" talks to the real API; "fake" answers locally (tests and benchmarks)
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")
+FAKE_LLM_LATENCY_SECONDS = float(os.getenv("FAKE_LLM_LATENCY_SECONDS", 0.5))
+
+# Per-worker limits for model calls
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 8))
+# Per-endpoint limits within the global one, e.g. "polish=4,analyze=4,batch=2"
+LLM_ENDPOINT_CONCURRENCY = os.getenv("LLM_ENDPOINT_CONCURRENCY", "batch=4")
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", 60))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 2))
+LLM_RETRY_BASE_SECONDS = float(os.getenv("LLM_RETRY_BASE_SECONDS", 0.5))
+LLM_RETRY_MAX_SECONDS = float(os.getenv("LLM_RETRY_MAX_SECONDS", 8))
+
+
+class LLMTimeoutError(Exception):
+    """Raised when a model call does not finish within its timeout"""
+
+
+class LLMBackendError(Exception):
+    """Backend failure carrying an HTTP-style status code"""
+
+    def __init__(self, message: str, code: int = 500):
+        super().__init__(message)
+        self.code = code
+
+
+def _is_retryable(error: Exception) -> bool:
+    # google.api_core exceptions carry the HTTP status as .code
+    code = getattr(error, "code", None)
+    return isinstance(code, int) and (code == 429 or 500 <= code < 600)
+
+
+def _parse_endpoint_limits(spec: str) -> Dict[str, int]:
+    limits = {}
+    for item in spec.split(","):
+        name, _, value = item.partition("=")
+        if name.strip() and value.strip().isdigit():
+            limits[name.strip()] = int(value)
+    return limits
+
+
+class GeminiBackend:
+    """
+    Google Gemini via the google-generativeai SDK.
+
+    The SDK is imported and configured on first use, so the app starts without
+    GOOGLE_API_KEY and without paying the import cost. All services share one
+    configured SDK client, whose gRPC channel keeps a single persistent HTTP/2
+    connection open and multiplexes concurrent calls over it.
+    """
+
+    def __init__(self):
+        self._genai = None
+        self._models: Dict[str, Any] = {}
+
+    def _get_model(self, model_name: str) -> Any:
+        if self._genai is None:
+            api_key = os.getenv("GOOGLE_API_KEY")
+            if not api_key:
+                raise ValueError("GOOGLE_API_KEY environment variable not set")
+            import google.generativeai as genai
+            genai.configure(api_key=api_key)
+            self._genai = genai
+        model = self._models.get(model_name)
+        if model is None:
+            model = self._models[model_name] = self._genai.GenerativeModel(model_name)
+        return model
+
+    async def generate(self, prompt: str, model_name: str) -> str:
+        response = await self._get_model(model_name).generate_content_async(prompt)
+        return response.text
+
+    async def stream(self, prompt: str, model_name: str) -> AsyncIterator[str]:
+        response = await self._get_model(model_name).generate_content_async(prompt, stream=True)
+        async for chunk in response:
+            try:
+                text = chunk.text
+            except ValueError:
+                # Chunks without text parts (e.g. a final finish-reason chunk)
+                continue
+            if text:
+                yield text
+
+
+class FakeBackend:
+    """
+    Local stand-in for the model with configurable latency, for tests and benchmarks.
+
+    `responder` maps a prompt to the response text; by default a minimal valid
+    resume/analysis JSON is returned. `blocking=True` sleeps synchronously, like
+    calling a sync SDK on the event loop. `fail_first` makes the first N calls
+    raise a retryable 503. `prefill_seconds_per_token` adds prompt processing
+    time (estimated tokens) before the first output.
+    """
+
+    DEFAULT_RESPONSE = json.dumps({
+        "contact_info": {"name": "Jane Doe", "email": "jane@example.com"},
+        "summary": "Experienced engineer.",
+        "experience": [],
+        "education": [],
+        "skills": ["Python"],
+        "improvements_made": ["Generated by the fake backend"],
+        "match_score": 70,
+        "overall_assessment": "Generated by the fake backend"
+    })
+
+    def __init__(
+        self,
+        latency: float = FAKE_LLM_LATENCY_SECONDS,
+        responder: Optional[Callable[[str], str]] = None,
+        blocking: bool = False,
+        fail_first: int = 0,
+        stream_chunk_chars: int = 64,
+        prefill_seconds_per_token: float = 0.0
+    ):
+        self.latency = latency
+        self.responder = responder or (lambda prompt: self.DEFAULT_RESPONSE)
+        self.blocking = blocking
+        self.fail_first = fail_first
+        self.stream_chunk_chars = stream_chunk_chars
+        self.prefill_seconds_per_token = prefill_seconds_per_token
+        self.calls = 0
+
+    async def _wait(self, seconds: float) -> None:
+        if self.blocking:
+            import time
+            time.sleep(seconds)
+        else:
+            await asyncio.sleep(seconds)
+
+    def _prefill(self, prompt: str) -> float:
+        return len(prompt) / 4 * self.prefill_seconds_per_token
+
+    def _next_call(self) -> None:
+        self.calls += 1
+        if self.calls <= self.fail_first:
+            raise LLMBackendError("Fake backend unavailable", code=503)
+
+    async def generate(self, prompt: str, model_name: str) -> str:
+        self._next_call()
+        await self._wait(self._prefill(prompt) + self.latency)
+        return self.responder(prompt)
+
+    async def stream(self, prompt: str, model_name: str) -> AsyncIterator[str]:
+        self._next_call()
+        text = self.responder(prompt)
+        chunks = [text[i:i + self.stream_chunk_chars] for i in range(0, len(text), self.stream_chunk_chars)]
+        await self._wait(self._prefill(prompt))
+        for chunk in chunks:
+            await self._wait(self.latency / max(len(chunks), 1))
+            yield chunk
+
+
+class LLMClient:
+    """
+    Shared model client for all services.
+
+    Every call takes a slot from a per-worker global semaphore and, if the endpoint
+    has its own limit, from that endpoint's semaphore too. Each attempt has its own
+    timeout. 429 and 5xx errors are retried with full-jitter exponential backoff.
+    """
+
+    def __init__(
+        self,
+        backend: Any,
+        model_name: str = GEMINI_MODEL_NAME,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        endpoint_limits: Optional[Dict[str, int]] = None,
+        timeout: float = LLM_TIMEOUT_SECONDS,
+        max_retries: int = LLM_MAX_RETRIES
+    ):
+        self.backend = backend
+        self.model_name = model_name
+        self.max_concurrency = max_concurrency
+        self.endpoint_limits = (
+            endpoint_limits if endpoint_limits is not None
+            else _parse_endpoint_limits(LLM_ENDPOINT_CONCURRENCY)
+        )
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._endpoint_slots: Dict[str, asyncio.Semaphore] = {}
+
+    def _semaphores(self, endpoint: str):
+        # Semaphores are tied to the loop they first wait on, so build them per loop
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+            self._endpoint_slots = {
+                name: asyncio.Semaphore(limit) for name, limit in self.endpoint_limits.items()
+            }
+        return self._slots, self._endpoint_slots.get(endpoint)
+
+    async def _backoff(self, attempt: int, error: Exception) -> None:
+        delay = random.uniform(0, min(LLM_RETRY_MAX_SECONDS, LLM_RETRY_BASE_SECONDS * 2 ** attempt))
+        logger.warning(f"Model call failed ({str(error)}), retrying in {delay:.2f}s")
+        await asyncio.sleep(delay)
+
+    async def generate(self, prompt: str, endpoint: str = "default") -> str:
+        """Return the full response text for a prompt"""
+        slots, endpoint_slots = self._semaphores(endpoint)
+        if endpoint_slots is not None:
+            await endpoint_slots.acquire()
+        try:
+            async with slots:
+                attempt = 0
+                while True:
+                    try:
+                        return await asyncio.wait_for(
+                            self.backend.generate(prompt, self.model_name), self.timeout
+                        )
+                    except asyncio.TimeoutError:
+                        logger.error(f"Model call timed out after {self.timeout:g}s")
+                        raise LLMTimeoutError(f"Model call timed out after {self.timeout:g}s")
+                    except Exception as e:
+                        if attempt >= self.max_retries or not _is_retryable(e):
+                            raise
+                        await self._backoff(attempt, e)
+                        attempt += 1
+        finally:
+            if endpoint_slots is not None:
+                endpoint_slots.release()
+
+    async def stream(self, prompt: str, endpoint: str = "default") -> AsyncIterator[str]:
+        """
+        Yield the response text chunk by chunk. The timeout covers the whole
+        stream; retries only happen before the first chunk has been yielded.
+        """
+        slots, endpoint_slots = self._semaphores(endpoint)
+        if endpoint_slots is not None:
+            await endpoint_slots.acquire()
+        try:
+            async with slots:
+                loop = asyncio.get_running_loop()
+                attempt = 0
+                while True:
+                    deadline = loop.time() + self.timeout
+                    chunks = self.backend.stream(prompt, self.model_name).__aiter__()
+                    received = False
+                    try:
+                        while True:
+                            try:
+                                chunk = await asyncio.wait_for(chunks.__anext__(), deadline - loop.time())
+                            except StopAsyncIteration:
+                                return
+                            received = True
+                            yield chunk
+                    except asyncio.TimeoutError:
+                        logger.error(f"Model stream timed out after {self.timeout:g}s")
+                        raise LLMTimeoutError(f"Model call timed out after {self.timeout:g}s")
+                    except Exception as e:
+                        if received or attempt >= self.max_retries or not _is_retryable(e):
+                            raise
+                        await self._backoff(attempt, e)
+                        attempt += 1
+        finally:
+            if endpoint_slots is not None:
+                endpoint_slots.release()
+
+
+_client: Optional[LLMClient] = None
+
+
+def get_llm_client() -> LLMClient:
+    """The process-wide client, created on first use from the environment"""
+    global _client
+    if _client is None:
+        backend = FakeBackend() if LLM_BACKEND == "fake" else GeminiBackend()
+        _client = LLMClient(backend)
+    return _client
+
+
+def set_llm_client(client: Optional[LLMClient]) -> None:
+    """Replace the process-wide client (tests and benchmarks)"""
+    global _client
+    _client = client
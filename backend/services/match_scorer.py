@@ -0,0 +1,157 @@
+import math
+import logging
+from collections import Counter
+from typing import Any, Dict, Iterable, List
+
+logger = logging.getLogger(__name__)
+
+# How much a job term found in each resume section counts (BM25F field weights)
+SECTION_WEIGHTS = {
+    "skills": 3.0,
+    "certifications": 2.0,
+    "experience": 2.0,
+    "summary": 1.0,
+    "education": 1.0,
+}
+# Typical section length in terms, used for BM25 length normalization
+SECTION_REFERENCE_LENGTHS = {
+    "skills": 20,
+    "certifications": 10,
+    "experience": 250,
+    "summary": 50,
+    "education": 30,
+}
+BM25_K1 = 1.2
+BM25_B = 0.5
+# Weighted term frequency that earns full credit for a term (one mention in experience)
+FULL_CREDIT_TF = 2.0
+# Raw coverage is raised to this power to spread scores over the LLM's 0-100 range
+SCORE_EXPONENT = 0.6
+
+# Stand-in for IDF without a posting corpus: words nearly every posting uses
+# carry little information about fit, so they get a small fixed weight
+COMMON_POSTING_TERMS = frozenset({
+    'about', 'ability', 'able', 'across', 'all', 'also', 'benefits', 'bonus', 'build', 'building',
+    'can', 'candidate', 'company', 'environment', 'etc', 'excellent', 'experience', 'from', 'good',
+    'great', 'help', 'highly', 'including', 'into', 'join', 'knowledge', 'looking', 'may', 'more',
+    'must', 'new', 'opportunity', 'other', 'our', 'plus', 'position', 'preferred', 'required',
+    'requirements', 'responsibilities', 'role', 'skills', 'strong', 'such', 'team', 'that',
+    'their', 'them', 'they', 'this', 'understanding', 'using', 'well', 'what', 'who', 'within',
+    'work', 'working', 'years', 'you', 'your'
+})
+COMMON_TERM_WEIGHT = 0.1
+
+
+def _saturate(tf: float) -> float:
+    return tf / (BM25_K1 + tf)
+
+
+class LocalMatchScorer:
+    """
+    Keyword-based resume/job match scoring that runs in well under a millisecond.
+
+    Job terms are weighted by how often the posting repeats them, with common
+    posting vocabulary down-weighted. Each term's credit comes from a BM25F
+    score over the resume sections: mentions are weighted by section,
+    length-normalized and saturated, so one mention in skills or experience
+    counts fully and further repetition adds nothing.
+    """
+
+    def index_resume(self, sections: Dict[str, Iterable[str]]) -> Dict[str, Counter]:
+        """Term counts per section, from each section's list of terms"""
+        return {name: Counter(terms) for name, terms in sections.items() if name in SECTION_WEIGHTS}
+
+    def score(self, section_counts: Dict[str, Counter], job_term_counts: Dict[str, int]) -> Dict[str, Any]:
+        """
+        Score a resume index against a posting's term counts (in order of first
+        appearance) and return an analysis with the same fields as the model's
+        """
+        weights = {
+            term: (COMMON_TERM_WEIGHT if term in COMMON_POSTING_TERMS else 1.0) * (1 + math.log(count))
+            for term, count in job_term_counts.items()
+        }
+        total_weight = sum(weights.values())
+        full_credit = _saturate(FULL_CREDIT_TF)
+
+        length_norms = {
+            name: 1 - BM25_B + BM25_B * sum(counts.values()) / SECTION_REFERENCE_LENGTHS[name]
+            for name, counts in section_counts.items()
+        }
+
+        credits: Dict[str, float] = {}
+        section_weight: Dict[str, float] = {name: 0.0 for name in SECTION_WEIGHTS}
+        section_terms: Dict[str, List[str]] = {name: [] for name in SECTION_WEIGHTS}
+        for term, weight in weights.items():
+            weighted_tf = 0.0
+            for name, counts in section_counts.items():
+                tf = counts.get(term)
+                if tf:
+                    weighted_tf += SECTION_WEIGHTS[name] * tf / length_norms[name]
+                    section_weight[name] += weight
+                    section_terms[name].append(term)
+            if weighted_tf:
+                credits[term] = min(1.0, _saturate(weighted_tf) / full_credit)
+
+        coverage = sum(weights[term] * credit for term, credit in credits.items()) / total_weight if total_weight else 0.0
+        match_score = round(100 * coverage ** SCORE_EXPONENT) if coverage else 0
+
+        missing = [term for term in weights if term not in credits]
+        missing.sort(key=lambda term: weights[term], reverse=True)
+        missing_keywords = [term for term in missing if term not in COMMON_POSTING_TERMS][:10]
+
+        return {
+            "match_score": match_score,
+            "overall_assessment": self._assessment(match_score, len(credits), len(weights)),
+            "strengths": self._strengths(section_terms, weights),
+            "missing_keywords": missing_keywords,
+            "missing_skills": [],
+            "knowledge_gaps": [],
+            "suggestions": self._suggestions(missing_keywords),
+            "concerns": (
+                ["Few of the posting's key terms appear in the resume"] if match_score < 40 else []
+            ),
+            "experience_match": self._section_match("experience", section_weight, section_terms, total_weight),
+            "skills_match": self._section_match("skills", section_weight, section_terms, total_weight),
+            "education_match": self._section_match("education", section_weight, section_terms, total_weight),
+        }
+
+    def _assessment(self, match_score: int, matched: int, total: int) -> str:
+        if match_score >= 75:
+            level = "Strong"
+        elif match_score >= 45:
+            level = "Partial"
+        else:
+            level = "Weak"
+        return f"{level} keyword alignment: the resume covers {matched} of {total} terms from the posting."
+
+    def _strengths(self, section_terms: Dict[str, List[str]], weights: Dict[str, float]) -> List[str]:
+        strengths = []
+        for name, label in (("skills", "Skills"), ("experience", "Experience"), ("certifications", "Certifications")):
+            terms = sorted(
+                (term for term in section_terms[name] if term not in COMMON_POSTING_TERMS),
+                key=lambda term: weights[term], reverse=True
+            )
+            if terms:
+                strengths.append(f"{label} cover {', '.join(terms[:6])}")
+        return strengths
+
+    def _suggestions(self, missing_keywords: List[str]) -> List[str]:
+        if not missing_keywords:
+            return ["The resume already mentions the posting's key terms; focus on quantified results"]
+        return [
+            f"If you have experience with {', '.join(missing_keywords[:5])}, mention it in your skills or experience",
+            "Mirror the posting's wording for tools and responsibilities you already have",
+        ]
+
+    def _section_match(
+        self,
+        name: str,
+        section_weight: Dict[str, float],
+        section_terms: Dict[str, List[str]],
+        total_weight: float
+    ) -> Dict[str, Any]:
+        share = section_weight[name] / total_weight if total_weight else 0.0
+        terms = [term for term in section_terms[name] if term not in COMMON_POSTING_TERMS]
+        notes = f"Matches {', '.join(terms[:8])}" if terms else f"No key posting terms found in {name}"
+        return {"score": round(100 * share ** SCORE_EXPONENT) if share else 0, "notes": notes}
+
@@ -0,0 +1,299 @@
+import time
+import asyncio
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+SIZE_BUCKETS = (100, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000, 250000)
+
+# Set inside worker processes: observations are collected here and shipped
+# back to the parent process instead of being recorded locally
+_capture: Optional[List[Tuple[str, Tuple[str, ...], float]]] = None
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def _format_labels(self, key: Tuple[str, ...], extra: str = "") -> str:
+        pairs = [f'{name}="{value}"' for name, value in zip(self.label_names, key)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def _record(self, key: Tuple[str, ...], value: float) -> None:
+        raise NotImplementedError
+
+    def _apply(self, value: float, labels: Dict[str, Any]) -> None:
+        key = self._key(labels)
+        if _capture is not None:
+            _capture.append((self.name, key, value))
+            return
+        self._record(key, value)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()):
+        super().__init__(name, help_text, label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        self._apply(amount, labels)
+
+    def _record(self, key: Tuple[str, ...], value: float) -> None:
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            return [f"{self.name}{self._format_labels(key)} {value}" for key, value in self._values.items()]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()):
+        super().__init__(name, help_text, label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels: Any) -> None:
+        self._apply(value, labels)
+
+    def _record(self, key: Tuple[str, ...], value: float) -> None:
+        with self._lock:
+            self._values[key] = value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            return [f"{self.name}{self._format_labels(key)} {value}" for key, value in self._values.items()]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help_text, label_names)
+        self.buckets = tuple(buckets)
+        # Per label set: [count per bucket..., +Inf count, sum]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        self._apply(value, labels)
+
+    def _record(self, key: Tuple[str, ...], value: float) -> None:
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+                    break
+            else:
+                series[len(self.buckets)] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = []
+        with self._lock:
+            for key, series in self._values.items():
+                cumulative = 0.0
+                for bound, count in zip(self.buckets, series):
+                    cumulative += count
+                    bucket_labels = self._format_labels(key, 'le="%s"' % bound)
+                    lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+                cumulative += series[len(self.buckets)]
+                bucket_labels = self._format_labels(key, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+                lines.append(f"{self.name}_sum{self._format_labels(key)} {series[-1]}")
+                lines.append(f"{self.name}_count{self._format_labels(key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> Any:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, label_names))
+
+    def gauge(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help_text, label_names))
+
+    def histogram(self, name: str, help_text: str, label_names: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, label_names, buckets))
+
+    def replay(self, observations: List[Tuple[str, Tuple[str, ...], float]]) -> None:
+        """Record observations captured in a worker process"""
+        for name, key, value in observations:
+            metric = self._metrics.get(name)
+            if metric is not None:
+                metric._record(key, value)
+
+    def render(self) -> str:
+        """Prometheus text exposition format"""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "resume_genie_stage_seconds", "Time spent in each service stage", ["service", "stage"]
+)
+PDF_FALLBACK_PAGES = REGISTRY.counter(
+    "resume_genie_pdf_fallback_pages_total", "Pages re-read with pdfplumber after PyMuPDF found no text"
+)
+JSON_PARSE_FAILURES = REGISTRY.counter(
+    "resume_genie_json_parse_failures_total", "Model responses that could not be parsed as JSON", ["service"]
+)
+JSON_RESPONSE_REPAIRS = REGISTRY.counter(
+    "resume_genie_json_response_repairs_total",
+    "Model responses repaired after truncation or completed by re-asking for missing fields",
+    ["service", "repair"]
+)
+LLM_PROMPT_CHARS = REGISTRY.histogram(
+    "resume_genie_llm_prompt_chars", "Prompt size in characters", ["service"], SIZE_BUCKETS
+)
+LLM_PROMPT_TOKENS = REGISTRY.histogram(
+    "resume_genie_llm_prompt_tokens_estimated", "Prompt size in tokens (estimated as chars / 4)",
+    ["service"], SIZE_BUCKETS
+)
+LLM_RESPONSE_CHARS = REGISTRY.histogram(
+    "resume_genie_llm_response_chars", "Response size in characters", ["service"], SIZE_BUCKETS
+)
+LLM_RESPONSE_TOKENS = REGISTRY.histogram(
+    "resume_genie_llm_response_tokens_estimated", "Response size in tokens (estimated as chars / 4)",
+    ["service"], SIZE_BUCKETS
+)
+LLM_COALESCED_CALLS = REGISTRY.counter(
+    "resume_genie_llm_coalesced_calls_total", "Requests that shared an identical in-flight model call",
+    ["service"]
+)
+POLISH_SECTIONS = REGISTRY.counter(
+    "resume_genie_polish_sections_total",
+    "Resume sections in structured polishes, by whether they were reused unchanged or sent to the model",
+    ["result"]
+)
+JOB_MATCH_ANALYSES = REGISTRY.counter(
+    "resume_genie_job_match_analyses_total", "Job match analyses by whether the local score or the model answered",
+    ["method"]
+)
+EVENT_LOOP_LAG = REGISTRY.histogram(
+    "resume_genie_event_loop_lag_seconds", "How late the event loop wakes up from a timed sleep"
+)
+WORKER_POOL_PENDING = REGISTRY.gauge(
+    "resume_genie_worker_pool_pending", "PDF tasks queued or running in the worker pool"
+)
+JOB_QUEUE_DEPTH = REGISTRY.gauge(
+    "resume_genie_job_queue_depth", "Jobs waiting in each job queue lane", ["lane"]
+)
+JOB_QUEUE_WAIT_SECONDS = REGISTRY.histogram(
+    "resume_genie_job_queue_wait_seconds", "Time jobs spend queued before a worker picks them up", ["lane"]
+)
+JOBS_FINISHED = REGISTRY.counter(
+    "resume_genie_jobs_finished_total", "Queued jobs finished, by type and outcome", ["kind", "status"]
+)
+CACHE_LOOKUPS = REGISTRY.gauge(
+    "resume_genie_cache_lookups", "Cache lookups since startup", ["cache", "result"]
+)
+COMPRESSED_RESPONSE_BYTES = REGISTRY.counter(
+    "resume_genie_compressed_response_bytes_total",
+    "Bytes of compressed HTTP responses before and after compression", ["encoding", "stage"]
+)
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "resume_genie_http_request_seconds", "HTTP request latency", ["path", "method", "status"]
+)
+
+
+@contextmanager
+def time_stage(service: str, stage: str) -> Iterator[None]:
+    """Record how long the enclosed block takes as one service stage"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - started, service=service, stage=stage)
+
+
+def record_llm_sizes(service: str, prompt: str, response: str) -> None:
+    LLM_PROMPT_CHARS.observe(len(prompt), service=service)
+    LLM_PROMPT_TOKENS.observe(len(prompt) / 4, service=service)
+    LLM_RESPONSE_CHARS.observe(len(response), service=service)
+    LLM_RESPONSE_TOKENS.observe(len(response) / 4, service=service)
+
+
+@contextmanager
+def capture() -> Iterator[List[Tuple[str, Tuple[str, ...], float]]]:
+    """Collect observations instead of recording them (used in worker processes)"""
+    global _capture
+    previous = _capture
+    _capture = []
+    try:
+        yield _capture
+    finally:
+        _capture = previous
+
+
+class RequestLatencyMiddleware:
+    """ASGI middleware recording HTTP latency per route template, method and status"""
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = [500]
+
+        async def send_with_status(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - started,
+                path=getattr(route, "path", "unmatched"),
+                method=scope["method"],
+                status=status[0]
+            )
+
+
+async def monitor_event_loop_lag(interval: float = 0.5) -> None:
+    """Background task measuring event-loop lag until cancelled"""
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.observe(max(0.0, loop.time() - started - interval))
@@ -1,53 +1,54 @@
 import os
-from typing import Dict, Any
-import io  # Import the in-memory buffer library
-from xhtml2pdf import pisa  # Import the xhtml2pdf library
-from jinja2 import Environment, FileSystemLoader
+from typing import Dict, Any, Optional
 import logging
 from datetime import datetime
 
+from .result_cache import MemoryCacheTier, make_cache_key
+from .pdf_renderers import PDFRenderer, get_renderer
+
 logger = logging.getLogger(__name__)
 
+# "xhtml2pdf" renders resume_template.html; "reportlab" lays out the same design directly
+PDF_RENDERER = os.getenv("PDF_RENDERER", "xhtml2pdf")
+
+PDF_CACHE_TTL_SECONDS = float(os.getenv("PDF_CACHE_TTL_SECONDS", 3600))
+PDF_CACHE_MAX_ENTRIES = int(os.getenv("PDF_CACHE_MAX_ENTRIES", 128))
+PDF_CACHE_MAX_BYTES = int(os.getenv("PDF_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
 class PDFGenerator:
-    def __init__(self):
-        # Setup Jinja2 environment (No change here)
-        template_dir = os.path.join(os.path.dirname(__file__), '..', 'templates')
-        self.env = Environment(loader=FileSystemLoader(template_dir))
+    def __init__(self, cache: Optional[MemoryCacheTier] = None, renderer: Optional[str] = None):
+        # Renderers compile their template or styles up front
+        self.renderer: PDFRenderer = get_renderer(renderer or PDF_RENDERER)
+        self.cache = cache
+    
+    def render_key(self, resume_content: Dict[str, Any]) -> str:
+        """
+        Canonical hash of everything that affects the rendered PDF: the content,
+        the renderer and its template or layout version, and the generated date
+        printed in the footer. Doubles as the ETag for /api/generate-pdf.
+        """
+        return make_cache_key(
+            self.renderer.name, self.renderer.version, resume_content, self._generated_date()
+        )
+    
+    def get_cached_pdf(self, key: str) -> Optional[bytes]:
+        if self.cache is None:
+            return None
+        return self.cache.get(key)
+    
+    def cache_pdf(self, key: str, pdf_bytes: bytes) -> None:
+        if self.cache is not None:
+            self.cache.set(key, pdf_bytes)
+    
+    def _generated_date(self) -> str:
+        return datetime.now().strftime("%B %Y")
     
     def generate_pdf(self, resume_content: Dict[str, Any]) -> bytes:
         """
         Generate a professional PDF from resume content
         """
         try:
-            # Load and render the HTML template (No change here)
-            template = self.env.get_template('resume_template.html')
-            html_content = template.render(
-                resume=resume_content,
-                generated_date=datetime.now().strftime("%B %Y")
-            )
-            
-            # --- This is the new section for xhtml2pdf ---
-            
-            # Create a PDF in memory
-            pdf_buffer = io.BytesIO()
-            
-            # Convert HTML to PDF
-            pisa_status = pisa.CreatePDF(
-                html_content,                # The HTML string to convert
-                dest=pdf_buffer              # The in-memory file to write to
-            )
-
-            # Check if PDF creation was successful
-            if pisa_status.err:
-                raise Exception(f"PDF generation error: {pisa_status.err}")
-
-            # Get the bytes from the buffer
-            pdf_buffer.seek(0)
-            pdf_bytes = pdf_buffer.read()
-            
-            # --- End of new section ---
-            
-            return pdf_bytes
+            return self.renderer.render(resume_content, self._generated_date())
             
         except Exception as e:
             logger.error(f"Error generating PDF: {str(e)}")
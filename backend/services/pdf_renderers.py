@@ -0,0 +1,99 @@
+import io
+import os
+import hashlib
+import logging
+from typing import Any, Dict, Optional
+
+from jinja2 import Environment, FileSystemLoader
+
+from .metrics import time_stage
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), '..', 'templates')
+TEMPLATE_NAME = 'resume_template.html'
+# Re-check the template file on every render; only useful while editing it
+TEMPLATE_AUTO_RELOAD = os.getenv("TEMPLATE_AUTO_RELOAD", "false").lower() == "true"
+
+
+class PDFRenderer:
+    """Turns resume content into PDF bytes"""
+
+    name = ""
+
+    @property
+    def version(self) -> str:
+        """Changes whenever the rendered output would change; part of the PDF cache key"""
+        raise NotImplementedError
+
+    def render(self, resume_content: Dict[str, Any], generated_date: str) -> bytes:
+        raise NotImplementedError
+
+    def warm_up(self) -> None:
+        """Load whatever the first render would otherwise have to"""
+
+
+class XHTML2PDFRenderer(PDFRenderer):
+    """Renders resume_template.html with Jinja2, then converts the HTML with xhtml2pdf"""
+
+    name = "xhtml2pdf"
+
+    def __init__(self):
+        # Setup Jinja2 environment and compile the template up front
+        self.env = Environment(loader=FileSystemLoader(TEMPLATE_DIR), auto_reload=TEMPLATE_AUTO_RELOAD)
+        self.template = self.env.get_template(TEMPLATE_NAME)
+        with open(os.path.join(TEMPLATE_DIR, TEMPLATE_NAME), 'rb') as f:
+            self.template_version = hashlib.sha256(f.read()).hexdigest()[:16]
+
+    @property
+    def version(self) -> str:
+        return self.template_version
+
+    def warm_up(self) -> None:
+        # xhtml2pdf takes about a second to import, so only processes that render load it
+        from xhtml2pdf import pisa  # noqa: F401
+
+    def render(self, resume_content: Dict[str, Any], generated_date: str) -> bytes:
+        from xhtml2pdf import pisa
+
+        # Render the HTML template
+        template = self.env.get_template(TEMPLATE_NAME) if TEMPLATE_AUTO_RELOAD else self.template
+        with time_stage("pdf_generator", "template_render"):
+            html_content = template.render(
+                resume=resume_content,
+                generated_date=generated_date
+            )
+
+        # Create a PDF in memory
+        pdf_buffer = io.BytesIO()
+
+        # Convert HTML to PDF
+        with time_stage("pdf_generator", "pdf_render"):
+            pisa_status = pisa.CreatePDF(
+                html_content,                # The HTML string to convert
+                dest=pdf_buffer              # The in-memory file to write to
+            )
+
+        # Check if PDF creation was successful
+        if pisa_status.err:
+            raise Exception(f"PDF generation error: {pisa_status.err}")
+
+        return pdf_buffer.getvalue()
+
+
+def _reportlab_renderer() -> PDFRenderer:
+    # Imported on first use so a process on the xhtml2pdf renderer doesn't load ReportLab's layout engine up front
+    from .reportlab_renderer import ReportLabRenderer
+    return ReportLabRenderer()
+
+
+RENDERERS = {
+    XHTML2PDFRenderer.name: XHTML2PDFRenderer,
+    "reportlab": _reportlab_renderer,
+}
+
+
+def get_renderer(name: Optional[str]) -> PDFRenderer:
+    if name not in RENDERERS:
+        raise ValueError(f"Unknown PDF renderer: {name}. Choose one of: {', '.join(RENDERERS)}")
+    return RENDERERS[name]()
@@ -1,9 +1,9 @@
 import io
-import fitz  # PyMuPDF
-import pdfplumber
-from typing import Optional
+from typing import Optional, Dict, Any, List, Union
 import logging
 
+from .metrics import time_stage, PDF_FALLBACK_PAGES
+
 logger = logging.getLogger(__name__)
 
 class PDFService:
@@ -13,51 +13,189 @@ class PDFService:
         Extract text from PDF using multiple libraries for better accuracy
         """
         try:
-            # First try with PyMuPDF
-            text = PDFService._extract_with_pymupdf(pdf_bytes)
-            if text and len(text.strip()) > 50:
-                return text
-            
-            # Fallback to pdfplumber if PyMuPDF doesn't work well
-            text = PDFService._extract_with_pdfplumber(pdf_bytes)
-            if text and len(text.strip()) > 50:
-                return text
-            
-            logger.warning("PDF text extraction yielded minimal content")
+            document = PDFService.extract_document(pdf_bytes)
+            text = document["text"]
+            if len(text.strip()) <= 50:
+                logger.warning("PDF text extraction yielded minimal content")
             return text or "Unable to extract meaningful text from PDF"
-            
+        
         except Exception as e:
             logger.error(f"Error extracting text from PDF: {str(e)}")
             raise Exception(f"Failed to extract text from PDF: {str(e)}")
     
     @staticmethod
-    def _extract_with_pymupdf(pdf_bytes: bytes) -> str:
-        """Extract text using PyMuPDF"""
+    def extract_document(
+        source: Union[bytes, str],
+        max_pages: Optional[int] = None,
+        with_lines: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Validate and extract a PDF in a single pass.
+        
+        `source` is either the PDF bytes or a path to a spooled upload, which
+        PyMuPDF reads from disk instead of from a copy in memory. When the
+        document has more than max_pages pages, only page_count is filled in.
+        
+        The document is opened once with PyMuPDF; pdfplumber only re-reads the
+        pages that came back empty but do contain fonts (a page without fonts,
+        such as a scanned image, has no text for either library). Returns validity, page count, per-page text,
+        the joined text and which extractor produced it ("pymupdf", "pdfplumber"
+        or "mixed"). With with_lines, "lines" also lists every visual line with
+        its font size and weight, for ResumeStructurer.
+        """
+        import fitz  # PyMuPDF; imported here so the API process can start without it
+        
+        document = {"valid": False, "page_count": 0, "pages": [], "text": "", "method": None}
+        
+        # Check PDF header
+        if PDFService._read_header(source) != b'%PDF':
+            return document
+        
         try:
-            doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-            text = ""
-            for page in doc:
-                text += page.get_text()
+            with time_stage("pdf", "open"):
+                if isinstance(source, str):
+                    doc = fitz.open(source, filetype="pdf")
+                else:
+                    doc = fitz.open(stream=source, filetype="pdf")
+        except Exception as e:
+            logger.error(f"PyMuPDF could not open PDF: {str(e)}")
+            return document
+        
+        if max_pages is not None and len(doc) > max_pages:
+            document["page_count"] = len(doc)
             doc.close()
-            return text.strip()
+            return document
+        
+        pages = []
+        fallback_pages = []
+        lines = []
+        try:
+            with time_stage("pdf", "pymupdf"):
+                for page in doc:
+                    text = PDFService._page_text_with_pymupdf(page)
+                    if not text and page.get_fonts():
+                        fallback_pages.append(page.number)
+                    pages.append(text)
+                    if with_lines and text:
+                        lines.extend(PDFService._page_lines(page))
+        finally:
+            doc.close()
+        
+        if not pages:
+            return document
+        
+        method = "pymupdf"
+        if fallback_pages:
+            # Fallback to pdfplumber for pages PyMuPDF couldn't read
+            PDF_FALLBACK_PAGES.inc(len(fallback_pages))
+            with time_stage("pdf", "pdfplumber"):
+                recovered = PDFService._extract_pages_with_pdfplumber(source, fallback_pages)
+            for index, text in recovered.items():
+                pages[index] = text
+            if recovered:
+                method = "pdfplumber" if len(recovered) == len(pages) else "mixed"
+        
+        document.update({
+            "valid": True,
+            "page_count": len(pages),
+            "pages": pages,
+            "text": "\n".join(text for text in pages if text),
+            "method": method
+        })
+        if with_lines:
+            # pdfplumber pages have no font data; add their text as plain lines
+            for index in fallback_pages:
+                lines.extend({"text": line, "size": None, "bold": False}
+                             for line in pages[index].splitlines() if line.strip())
+            document["lines"] = lines
+        return document
+    
+    @staticmethod
+    def _read_header(source: Union[bytes, str]) -> bytes:
+        if isinstance(source, str):
+            with open(source, 'rb') as f:
+                return f.read(4)
+        return source[:4]
+    
+    @staticmethod
+    def _page_text_with_pymupdf(page) -> str:
+        """Extract one page using PyMuPDF"""
+        try:
+            return page.get_text().strip()
         except Exception as e:
-            logger.error(f"PyMuPDF extraction failed: {str(e)}")
+            logger.error(f"PyMuPDF extraction failed on page {page.number}: {str(e)}")
             return ""
     
     @staticmethod
-    def _extract_with_pdfplumber(pdf_bytes: bytes) -> str:
-        """Extract text using pdfplumber"""
+    def _page_lines(page) -> List[Dict[str, Any]]:
+        """
+        Visual lines of one page with their largest font size and whether they
+        are bold. Spans on the same baseline are merged; spans laid out apart
+        (columns, right-aligned dates, skill chips) are joined with " | ".
+        """
+        spans = []
         try:
-            with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
-                text = ""
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-                return text.strip()
+            for block in page.get_text("dict")["blocks"]:
+                for line in block.get("lines", []):
+                    spans.extend(line["spans"])
+        except Exception as e:
+            logger.error(f"PyMuPDF line extraction failed on page {page.number}: {str(e)}")
+            return []
+        
+        rows: List[List[Dict[str, Any]]] = []
+        for span in sorted(spans, key=lambda span: (span["origin"][1], span["origin"][0])):
+            if rows and abs(rows[-1][0]["origin"][1] - span["origin"][1]) <= span["size"] * 0.3:
+                rows[-1].append(span)
+            else:
+                rows.append([span])
+        
+        lines = []
+        for row in rows:
+            row.sort(key=lambda span: span["origin"][0])
+            text, previous, gap_pending = "", None, False
+            for span in row:
+                if not span["text"].strip():
+                    # Whitespace-only spans separate inline items
+                    gap_pending = previous is not None
+                    continue
+                if previous is not None:
+                    gap = span["bbox"][0] - previous["bbox"][2]
+                    after_bullet = len(previous["text"].strip()) == 1
+                    if not after_bullet and (gap_pending or gap > span["size"] * 0.8):
+                        text = text.rstrip() + " | "
+                    elif gap > span["size"] * 0.15 and not text.endswith(" "):
+                        text += " "
+                text += span["text"]
+                previous, gap_pending = span, False
+            text = text.strip()
+            if not text:
+                continue
+            visible = [span for span in row if span["text"].strip()]
+            lines.append({
+                "text": text,
+                "size": round(max(span["size"] for span in visible), 1),
+                "bold": all(span["flags"] & 16 or "bold" in span["font"].lower() for span in visible)
+            })
+        return lines
+    
+    @staticmethod
+    def _extract_pages_with_pdfplumber(source: Union[bytes, str], page_numbers: List[int]) -> Dict[int, str]:
+        """Extract the given pages using pdfplumber"""
+        # Only needed for the rare pages PyMuPDF can't read, so not imported up front
+        import pdfplumber
+        
+        recovered = {}
+        try:
+            with pdfplumber.open(source if isinstance(source, str) else io.BytesIO(source)) as pdf:
+                for index in page_numbers:
+                    if index >= len(pdf.pages):
+                        continue
+                    page_text = pdf.pages[index].extract_text()
+                    if page_text and page_text.strip():
+                        recovered[index] = page_text.strip()
         except Exception as e:
             logger.error(f"pdfplumber extraction failed: {str(e)}")
-            return ""
+        return recovered
     
     @staticmethod
     def validate_pdf(pdf_bytes: bytes) -> bool:
@@ -68,6 +206,7 @@ class PDFService:
                 return False
             
             # Try to open with PyMuPDF
+            import fitz
             doc = fitz.open(stream=pdf_bytes, filetype="pdf")
             page_count = len(doc)
             doc.close()
@@ -79,4 +218,4 @@ class PDFService:
 # For testing
 if __name__ == "__main__":
     # Test with a sample PDF
-    pass
\ No newline at end of file
+    pass
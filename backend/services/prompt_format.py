@@ -0,0 +1,90 @@
+import os
+import re
+import json
+import logging
+from typing import Any, Dict, List
+
+logger = logging.getLogger(__name__)
+
+# "full" keeps the original verbose prompts; "compact" sends minified schemas
+# and a compact resume serialization
+PROMPT_MODE = os.getenv("PROMPT_MODE", "full")
+
+# Resume sections included in analysis prompts, in prompt order
+RESUME_SECTIONS = ("contact_info", "summary", "experience", "education", "skills", "certifications")
+
+_INLINE_WHITESPACE = re.compile(r"[ \t\r\f\v]+")
+_BLANK_LINES = re.compile(r"\n\s*\n+")
+
+
+def compact_text(text: str) -> str:
+    """Collapse runs of spaces and blank lines but keep line breaks"""
+    text = _INLINE_WHITESPACE.sub(" ", text)
+    text = _BLANK_LINES.sub("\n", text)
+    return "\n".join(line.strip() for line in text.split("\n")).strip()
+
+
+def minify_schema(schema: Dict[str, Any]) -> str:
+    return json.dumps(schema, separators=(",", ":"))
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token for English text)"""
+    return round(len(text) / 4)
+
+
+def create_reask_prompt(prompt: str, fields: List[str]) -> str:
+    """Ask again with the original prompt, for only the fields that were missing or invalid"""
+    return (
+        f"{prompt}\n\nA previous reply was missing or had invalid values for some fields. "
+        f"Reply with only a JSON object containing exactly these fields: {', '.join(fields)}."
+    )
+
+
+def _is_empty(value: Any) -> bool:
+    return value is None or value == "" or value == [] or value == {}
+
+
+def _inline(value: Any) -> str:
+    """One-line rendering of a field value, skipping empty parts"""
+    if isinstance(value, dict):
+        return " | ".join(_inline(item) for item in value.values() if not _is_empty(item))
+    if isinstance(value, (list, tuple)):
+        return "; ".join(_inline(item) for item in value if not _is_empty(item))
+    return _INLINE_WHITESPACE.sub(" ", str(value).replace("\n", " ")).strip()
+
+
+def compact_resume(resume_content: Dict[str, Any]) -> str:
+    """
+    Serialize structured resume content for a prompt: one line per scalar
+    section or list entry, empty fields dropped and whitespace collapsed,
+    instead of Python reprs of every dict
+    """
+    lines: List[str] = []
+    for section in RESUME_SECTIONS:
+        value = resume_content.get(section)
+        if _is_empty(value):
+            continue
+        label = section.replace("_", " ").capitalize()
+        if isinstance(value, list) and any(isinstance(item, dict) for item in value):
+            lines.append(f"{label}:")
+            for item in value:
+                if isinstance(item, dict):
+                    scalars = {k: v for k, v in item.items() if not isinstance(v, (list, dict))}
+                    nested = [v for v in item.values() if isinstance(v, (list, dict)) and not _is_empty(v)]
+                    entry = _inline(scalars)
+                    if nested:
+                        entry = f"{entry}: {'; '.join(_inline(v) for v in nested)}" if entry else _inline(nested)
+                else:
+                    entry = _inline(item)
+                if entry:
+                    lines.append(f"- {entry}")
+        else:
+            if isinstance(value, dict):
+                items, separator = list(value.values()), " | "
+            elif isinstance(value, list):
+                items, separator = value, ", "
+            else:
+                items, separator = [value], ""
+            lines.append(f"{label}: {separator.join(_inline(item) for item in items if not _is_empty(item))}")
+    return "\n".join(lines)
@@ -0,0 +1,211 @@
+import io
+from typing import Any, Dict, List
+from xml.sax.saxutils import escape
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_RIGHT
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.platypus import (
+    Flowable, HRFlowable, KeepTogether, ListFlowable, ListItem, Paragraph, SimpleDocTemplate, Spacer, Table,
+    TableStyle
+)
+
+from .metrics import time_stage
+from .pdf_renderers import PDFRenderer
+
+
+def _px(value: float) -> float:
+    """CSS pixels to points"""
+    return value * 0.75
+
+
+class _Chips(Flowable):
+    """Boxed labels laid out left to right and wrapped onto new lines, like inline-block spans"""
+
+    def __init__(self, labels: List[str], font_size: float, pad_x: float, pad_y: float,
+                 gap_x: float, gap_y: float, fill: str, stroke: str, text_color: str):
+        super().__init__()
+        self.labels = labels
+        self.font_size = font_size
+        self.pad_x, self.pad_y = pad_x, pad_y
+        self.gap_x, self.gap_y = gap_x, gap_y
+        self.fill, self.stroke, self.text_color = fill, stroke, text_color
+        self.box_height = font_size + 2 * pad_y
+        self._placed = []
+
+    def wrap(self, available_width: float, available_height: float):
+        self._placed = []
+        x, line = 0.0, 0
+        for label in self.labels:
+            width = min(stringWidth(label, "Helvetica", self.font_size) + 2 * self.pad_x, available_width)
+            if x and x + width > available_width:
+                x, line = 0.0, line + 1
+            self._placed.append((label, x, line, width))
+            x += width + self.gap_x
+        lines = line + 1 if self.labels else 0
+        self.width = available_width
+        self.height = lines * self.box_height + max(lines - 1, 0) * self.gap_y
+        return self.width, self.height
+
+    def draw(self):
+        canvas = self.canv
+        canvas.setFont("Helvetica", self.font_size)
+        for label, x, line, width in self._placed:
+            y = self.height - (line + 1) * self.box_height - line * self.gap_y
+            canvas.setFillColor(colors.HexColor(self.fill))
+            canvas.setStrokeColor(colors.HexColor(self.stroke))
+            canvas.setLineWidth(_px(1))
+            canvas.rect(x, y, width, self.box_height, stroke=1, fill=1)
+            canvas.setFillColor(colors.HexColor(self.text_color))
+            canvas.drawString(x + self.pad_x, y + self.pad_y + self.font_size * 0.22, label)
+
+
+class ReportLabRenderer(PDFRenderer):
+    """
+    Lays the resume out directly with ReportLab, following the styles of
+    resume_template.html. There is no HTML or CSS to parse, so it is several
+    times faster than xhtml2pdf and scales linearly with the number of entries.
+    """
+
+    name = "reportlab"
+    # Bump whenever the layout below changes so cached PDFs are invalidated
+    LAYOUT_VERSION = "reportlab-v1"
+
+    def __init__(self):
+        base = ParagraphStyle("base", fontName="Helvetica", fontSize=11, leading=11 * 1.4,
+                              textColor=colors.HexColor("#333333"))
+        self.styles = {
+            "name": ParagraphStyle("name", base, fontName="Helvetica-Bold", fontSize=24, leading=28,
+                                   textColor=colors.HexColor("#1e40af"), alignment=TA_CENTER,
+                                   spaceAfter=_px(8)),
+            "contact": ParagraphStyle("contact", base, fontSize=10, leading=14,
+                                      textColor=colors.HexColor("#666666"), alignment=TA_CENTER),
+            "section_title": ParagraphStyle("section_title", base, fontName="Helvetica-Bold", fontSize=14,
+                                            leading=17, textColor=colors.HexColor("#1e40af"), keepWithNext=1),
+            "summary": ParagraphStyle("summary", base, fontName="Helvetica-Oblique",
+                                      textColor=colors.HexColor("#555555"), spaceAfter=_px(15)),
+            "item_title": ParagraphStyle("item_title", base, fontName="Helvetica-Bold", fontSize=12,
+                                         leading=12 * 1.4, textColor=colors.HexColor("#1f2937")),
+            "company": ParagraphStyle("company", base, fontName="Helvetica-Bold",
+                                      textColor=colors.HexColor("#374151")),
+            "location": ParagraphStyle("location", base, textColor=colors.HexColor("#6b7280"), alignment=TA_RIGHT),
+            "duration": ParagraphStyle("duration", base, fontName="Helvetica-Oblique",
+                                       textColor=colors.HexColor("#6b7280"), alignment=TA_RIGHT),
+            "achievement": ParagraphStyle("achievement", base, textColor=colors.HexColor("#374151")),
+            "details": ParagraphStyle("details", base, textColor=colors.HexColor("#6b7280"), spaceBefore=_px(4)),
+            "footer": ParagraphStyle("footer", base, fontSize=8, leading=11,
+                                     textColor=colors.HexColor("#9ca3af"), alignment=TA_CENTER,
+                                     spaceBefore=_px(10)),
+        }
+        self.info_table_style = TableStyle([
+            ("LEFTPADDING", (0, 0), (-1, -1), 0),
+            ("RIGHTPADDING", (0, 0), (-1, -1), 0),
+            ("TOPPADDING", (0, 0), (-1, -1), 0),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), _px(3)),
+            ("VALIGN", (0, 0), (-1, -1), "TOP"),
+        ])
+
+    @property
+    def version(self) -> str:
+        return self.LAYOUT_VERSION
+
+    def render(self, resume_content: Dict[str, Any], generated_date: str) -> bytes:
+        with time_stage("pdf_generator", "layout"):
+            story = self._story(resume_content, generated_date)
+
+        pdf_buffer = io.BytesIO()
+        margin = 0.75 * inch
+        contact_info = resume_content.get('contact_info') or {}
+        doc = SimpleDocTemplate(
+            pdf_buffer, pagesize=A4, leftMargin=margin, rightMargin=margin, topMargin=margin,
+            bottomMargin=margin, title=str(contact_info.get('name') or 'Resume')
+        )
+        with time_stage("pdf_generator", "pdf_render"):
+            doc.build(story)
+        return pdf_buffer.getvalue()
+
+    def _text(self, value: Any, style: str) -> Paragraph:
+        return Paragraph(escape(str(value)), self.styles[style])
+
+    def _section(self, title: str) -> List[Flowable]:
+        rule = HRFlowable(width="100%", thickness=_px(1), color=colors.HexColor("#cccccc"),
+                          spaceBefore=_px(3), spaceAfter=_px(12))
+        # Never leave a section title alone at the bottom of a page
+        rule.keepWithNext = True
+        return [self._text(title, "section_title"), rule]
+
+    def _info_table(self, rows) -> Table:
+        """Two-column rows: bold left text and muted right-aligned text"""
+        table = Table(rows, colWidths=["70%", "30%"])
+        table.setStyle(self.info_table_style)
+        return table
+
+    def _story(self, resume: Dict[str, Any], generated_date: str) -> List[Flowable]:
+        contact_info = resume.get('contact_info') or {}
+        story: List[Flowable] = [self._text(contact_info.get('name') or 'Your Name', "name")]
+
+        contact_parts = [contact_info.get(key) for key in ("email", "phone", "location", "linkedin")]
+        contact_line = " • ".join(str(part) for part in contact_parts if part)
+        if contact_line:
+            story.append(self._text(contact_line, "contact"))
+        story.append(HRFlowable(width="100%", thickness=_px(2), color=colors.HexColor("#2563eb"),
+                                spaceBefore=_px(15), spaceAfter=_px(20)))
+
+        if resume.get('summary'):
+            story += self._section("Professional Summary")
+            story.append(self._text(resume['summary'], "summary"))
+
+        if resume.get('experience'):
+            story += self._section("Professional Experience")
+            for exp in resume['experience']:
+                item = [self._info_table([
+                    [self._text(exp.get('title') or 'Position Title', "item_title"),
+                     self._text(exp['location'], "location") if exp.get('location') else ""],
+                    [self._text(exp.get('company') or 'Company Name', "company"),
+                     self._text(exp['duration'], "duration") if exp.get('duration') else ""],
+                ])]
+                if exp.get('achievements'):
+                    item.append(ListFlowable(
+                        [ListItem(self._text(achievement, "achievement"), spaceAfter=_px(4))
+                         for achievement in exp['achievements']],
+                        bulletType="bullet", start="•", leftIndent=_px(20), bulletFontSize=11,
+                        bulletColor=colors.HexColor("#374151"), spaceBefore=_px(6)
+                    ))
+                item.append(Spacer(1, _px(15)))
+                story.append(KeepTogether(item))
+
+        if resume.get('education'):
+            story += self._section("Education")
+            for edu in resume['education']:
+                item = [self._info_table([
+                    [self._text(edu.get('degree') or 'Degree', "item_title"),
+                     self._text(edu['location'], "location") if edu.get('location') else ""],
+                    [self._text(edu.get('school') or 'School Name', "company"),
+                     self._text(edu['graduation'], "duration") if edu.get('graduation') else ""],
+                ])]
+                if edu.get('details'):
+                    item.append(self._text(edu['details'], "details"))
+                item.append(Spacer(1, _px(15)))
+                story.append(KeepTogether(item))
+
+        if resume.get('skills'):
+            story += self._section("Technical Skills")
+            story.append(_Chips([str(skill) for skill in resume['skills']], 10, _px(12), _px(6),
+                                _px(4), _px(8), "#f3f4f6", "#e5e7eb", "#333333"))
+            story.append(Spacer(1, _px(20)))
+
+        if resume.get('certifications'):
+            story += self._section("Certifications")
+            story.append(_Chips([str(cert) for cert in resume['certifications']], 10, _px(8), _px(4),
+                                _px(4), _px(4), "#dbeafe", "#bfdbfe", "#333333"))
+            story.append(Spacer(1, _px(20)))
+
+        story += [
+            Spacer(1, _px(10)),
+            HRFlowable(width="100%", thickness=_px(1), color=colors.HexColor("#e5e7eb"), spaceAfter=0),
+            self._text(f"Generated by Resume Genie • {generated_date}", "footer"),
+        ]
+        return story
@@ -0,0 +1,89 @@
+from typing import List, Optional
+
+from pydantic import BaseModel, ConfigDict, field_validator
+
+
+def _clamp_score(value: float) -> int:
+    return max(0, min(100, round(value)))
+
+
+class _ResponseModel(BaseModel):
+    # Keep any extra fields the model adds
+    model_config = ConfigDict(extra="allow")
+
+
+class ContactInfo(_ResponseModel):
+    name: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    location: Optional[str] = None
+    linkedin: Optional[str] = None
+    website: Optional[str] = None
+
+
+class ExperienceEntry(_ResponseModel):
+    title: Optional[str] = None
+    company: Optional[str] = None
+    duration: Optional[str] = None
+    location: Optional[str] = None
+    achievements: List[str] = []
+
+
+class EducationEntry(_ResponseModel):
+    degree: Optional[str] = None
+    school: Optional[str] = None
+    graduation: Optional[str] = None
+    location: Optional[str] = None
+    details: Optional[str] = None
+
+
+class PolishedResume(_ResponseModel):
+    """Response of the polish prompt"""
+    contact_info: ContactInfo
+    summary: str
+    experience: List[ExperienceEntry]
+    education: List[EducationEntry]
+    skills: List[str]
+    certifications: List[str] = []
+    improvements_made: List[str] = []
+
+
+class ProseEntry(_ResponseModel):
+    achievements: List[str] = []
+
+
+class PolishedProse(_ResponseModel):
+    """Response of the prose-only polish prompt for locally structured resumes"""
+    summary: str
+    experience: List[ProseEntry]
+    improvements_made: List[str] = []
+
+
+class SectionMatch(_ResponseModel):
+    score: float
+    notes: str = ""
+
+    @field_validator("score")
+    @classmethod
+    def _clamp(cls, value: float) -> int:
+        return _clamp_score(value)
+
+
+class JobAnalysis(_ResponseModel):
+    """Response of the job match analysis prompt"""
+    match_score: float
+    overall_assessment: str
+    strengths: List[str] = []
+    missing_keywords: List[str] = []
+    missing_skills: List[str] = []
+    knowledge_gaps: List[str] = []
+    suggestions: List[str] = []
+    concerns: List[str] = []
+    experience_match: Optional[SectionMatch] = None
+    skills_match: Optional[SectionMatch] = None
+    education_match: Optional[SectionMatch] = None
+
+    @field_validator("match_score")
+    @classmethod
+    def _clamp(cls, value: float) -> int:
+        return _clamp_score(value)
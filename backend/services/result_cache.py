@@ -0,0 +1,230 @@
+import os
+import re
+import json
+import time
+import hashlib
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+RESULT_CACHE_TTL_SECONDS = float(os.getenv("RESULT_CACHE_TTL_SECONDS", 24 * 3600))
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", 512))
+RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+RESULT_CACHE_DB = os.getenv("RESULT_CACHE_DB", "")
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so cosmetic differences map to the same key"""
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def make_cache_key(model_name: str, prompt_version: str, *parts: Any) -> str:
+    """
+    Hash the normalized inputs together with the prompt version and model name.
+    Strings are whitespace-normalized; anything else is serialized as canonical JSON.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{model_name}\0{prompt_version}".encode("utf-8"))
+    for part in parts:
+        if isinstance(part, str):
+            encoded = normalize_text(part)
+        else:
+            encoded = json.dumps(part, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        digest.update(b"\0")
+        digest.update(encoded.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class MemoryCacheTier:
+    """In-process LRU with TTL, bounded by entry count and total size of str or bytes values"""
+
+    name = "memory"
+
+    def __init__(self, ttl: float, max_entries: int, max_bytes: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Union[str, bytes]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at < time.time():
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Union[str, bytes], expires_at: Optional[float] = None) -> None:
+        size = len(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, expires_at or time.time() + self.ttl)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key: str) -> None:
+        value, _ = self._entries.pop(key)
+        self._bytes -= len(value)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+        }
+
+
+class SQLiteCacheTier:
+    """On-disk tier that survives restarts"""
+
+    name = "disk"
+
+    def __init__(self, path: str, ttl: float):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._conn = self._connect()
+        self.hits = 0
+        self.misses = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS result_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        conn.commit()
+        return conn
+
+    def _db(self) -> sqlite3.Connection:
+        # A connection inherited through fork (see serve.py) must not be used by the child
+        if self._pid != os.getpid():
+            self._conn = self._connect()
+            self._pid = os.getpid()
+        return self._conn
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            db = self._db()
+            row = db.execute(
+                "SELECT value, expires_at FROM result_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] < time.time():
+                if row is not None:
+                    db.execute("DELETE FROM result_cache WHERE key = ?", (key,))
+                    db.commit()
+                self.misses += 1
+                return None
+            self.hits += 1
+            return row[0]
+
+    def set(self, key: str, value: str, expires_at: Optional[float] = None) -> None:
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO result_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at or time.time() + self.ttl)
+            )
+            db.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            db = self._db()
+            db.execute("DELETE FROM result_cache")
+            db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._db().execute("SELECT COUNT(*) FROM result_cache").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "entries": entries, "path": self.path}
+
+
+class ResultCache:
+    """
+    Tiered cache for LLM results. Lookups go through the tiers in order and a hit
+    in a slower tier is copied into the faster ones. Values must be JSON-serializable.
+    """
+
+    def __init__(self, tiers: List[Any]):
+        self.tiers = tiers
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls) -> "ResultCache":
+        tiers: List[Any] = [
+            MemoryCacheTier(RESULT_CACHE_TTL_SECONDS, RESULT_CACHE_MAX_ENTRIES, RESULT_CACHE_MAX_BYTES)
+        ]
+        if RESULT_CACHE_DB:
+            try:
+                tiers.append(SQLiteCacheTier(RESULT_CACHE_DB, RESULT_CACHE_TTL_SECONDS))
+            except sqlite3.Error as e:
+                logger.error(f"Disk result cache disabled: {str(e)}")
+        return cls(tiers)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        for index, tier in enumerate(self.tiers):
+            try:
+                value = tier.get(key)
+            except Exception as e:
+                logger.error(f"Result cache {tier.name} lookup failed: {str(e)}")
+                continue
+            if value is not None:
+                for faster in self.tiers[:index]:
+                    faster.set(key, value)
+                self.hits += 1
+                return json.loads(value)
+        self.misses += 1
+        return None
+
+    def set(self, key: str, result: Dict[str, Any]) -> None:
+        value = json.dumps(result, ensure_ascii=False)
+        for tier in self.tiers:
+            try:
+                tier.set(key, value)
+            except Exception as e:
+                logger.error(f"Result cache {tier.name} write failed: {str(e)}")
+
+    def clear(self) -> None:
+        for tier in self.tiers:
+            tier.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "tiers": {tier.name: tier.stats() for tier in self.tiers},
+        }
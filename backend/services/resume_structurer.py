@@ -0,0 +1,304 @@
+import re
+import logging
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Lines are {"text", "size", "bold"}; size is None for plain text without font data.
+# Segments of one visual line that were laid out apart (table columns, skill
+# chips, right-aligned dates) are joined with SEGMENT_SEPARATOR.
+SEGMENT_SEPARATOR = " | "
+
+HEADINGS = {
+    "summary": ("summary", "professional summary", "profile", "professional profile", "objective",
+                "career objective", "about", "about me", "executive summary"),
+    "experience": ("experience", "professional experience", "work experience", "employment",
+                   "employment history", "work history", "career history", "relevant experience"),
+    "education": ("education", "academic background", "education and training"),
+    "skills": ("skills", "technical skills", "core competencies", "key skills", "competencies",
+               "technologies", "skills and tools", "tools and technologies"),
+    "certifications": ("certifications", "certificates", "licenses and certifications",
+                       "certifications and licenses", "licenses"),
+    # Recognized so their lines don't run into the previous section, but not kept
+    "other": ("projects", "publications", "awards", "honors", "honors and awards", "volunteer experience",
+              "volunteering", "interests", "languages", "references", "activities"),
+}
+HEADING_LOOKUP = {title: section for section, titles in HEADINGS.items() for title in titles}
+
+_MONTH = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?"
+_DATE = rf"(?:{_MONTH}\s+\d{{4}}|\d{{1,2}}/\d{{4}}|(?:19|20)\d{{2}})"
+DATE_RANGE_PATTERN = re.compile(rf"{_DATE}\s*(?:-|–|—|to)\s*(?:{_DATE}|present|current|now)", re.I)
+DATE_PATTERN = re.compile(rf"(?:expected\s+)?{_DATE}", re.I)
+EMAIL_PATTERN = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+PHONE_PATTERN = re.compile(r"\+?\(?\d[\d\s().-]{7,}\d")
+LINKEDIN_PATTERN = re.compile(r"(?:https?://)?(?:www\.)?linkedin\.com/[^\s|,•]+", re.I)
+URL_PATTERN = re.compile(
+    r"(?:https?://)?(?:www\.)?[a-z0-9-]+(?:\.[a-z0-9-]+)*\.(?:com|io|dev|net|org|me|co|ai|app)(?:/[^\s|,•]*)?", re.I
+)
+_LOCATION = r"(?:[A-Z][A-Za-z.'-]*(?:\s[A-Z][A-Za-z.'-]*)*,\s*(?:[A-Z]{2}|[A-Z][a-z]+(?:\s[A-Z][a-z]+)*)|Remote)"
+LOCATION_PATTERN = re.compile(_LOCATION)
+# A location at the end of a segment, e.g. "Acme Corp, Seattle, WA"
+TRAILING_LOCATION_PATTERN = re.compile(rf"(?:^|(?<=[\s,]))({_LOCATION})$")
+BULLET_PATTERN = re.compile(r"^\s*(?:[•·▪◦●■►\-–*]|\d{1,2}[.)])\s+")
+DEGREE_PATTERN = re.compile(
+    r"\b(?:bachelor|master|b\.?sc?|m\.?sc?|b\.?a|m\.?a|mba|ph\.?d|doctor|associate|diploma|b\.?eng|m\.?eng)\b", re.I
+)
+SCHOOL_PATTERN = re.compile(r"\b(?:university|college|institute|school|academy|polytechnic)\b", re.I)
+DETAIL_PATTERN = re.compile(r"\b(?:gpa|honou?rs|cum laude|dean|coursework|thesis|minor)\b", re.I)
+HEADER_SPLIT_PATTERN = re.compile(r"\s+\|\s+|\s+[—–]\s+|\s+-\s+|\s+at\s+|,\s+|\s{3,}")
+CONTACT_SPLIT_PATTERN = re.compile(r"\s*[•|·]\s*|\s{3,}")
+LIST_GROUP_PATTERN = re.compile(r"\s*[;|•·]\s*")
+# The footer PDFGenerator prints, in case a generated resume is uploaded again
+FOOTER_PATTERN = re.compile(r"^generated by resume genie\b", re.I)
+
+
+def _strip_bullet(text: str) -> str:
+    return BULLET_PATTERN.sub("", text, count=1).strip()
+
+
+def _clean(text: str) -> str:
+    return text.strip(" \t|,;•·-–—")
+
+
+def _prose(text: str) -> str:
+    """Rejoin a prose line that the layout split into segments"""
+    return _clean(_strip_bullet(text).replace(SEGMENT_SEPARATOR, " "))
+
+
+class ResumeStructurer:
+    """
+    Deterministic resume parser: turns extracted lines into the same
+    contact_info/summary/experience/education/skills/certifications shape
+    the polish prompt asks the model for, in milliseconds.
+
+    Section headings are matched against common titles; font size and bold
+    (from PDFService.extract_document(..., with_lines=True)) pick out the name
+    and entry header lines, and regexes find emails, phones, links, locations
+    and date ranges. Works on plain text too, with less certainty about where
+    entries start.
+    """
+
+    def structure(self, lines: List[Dict[str, Any]]) -> Dict[str, Any]:
+        lines = [line for line in lines if line["text"].strip() and not FOOTER_PATTERN.match(line["text"].strip())]
+        sections: Dict[str, List[Dict[str, Any]]] = {"header": []}
+        current = "header"
+        for line in lines:
+            section = self._heading(line)
+            if section:
+                current = section
+                sections.setdefault(current, [])
+            else:
+                sections[current].append(line)
+
+        body_size = self._body_size(lines)
+        result: Dict[str, Any] = {"contact_info": self._contact_info(sections["header"], body_size)}
+        if sections.get("summary"):
+            result["summary"] = " ".join(_prose(line["text"]) for line in sections["summary"])
+        result["experience"] = self._experience(sections.get("experience", []), body_size)
+        result["education"] = self._education(sections.get("education", []))
+        result["skills"] = self._list_items(sections.get("skills", []), strip_labels=True)
+        result["certifications"] = self._list_items(sections.get("certifications", []))
+        return result
+
+    def structure_text(self, text: str) -> Dict[str, Any]:
+        """Structure plain extracted text; runs of 3+ spaces are treated as column gaps"""
+        lines = []
+        for raw in text.splitlines():
+            segments = [segment.strip() for segment in re.split(r"\s{3,}|\t+", raw) if segment.strip()]
+            if segments:
+                lines.append({"text": SEGMENT_SEPARATOR.join(segments), "size": None, "bold": False})
+        return self.structure(lines)
+
+    @staticmethod
+    def is_complete(structured: Dict[str, Any]) -> bool:
+        """Whether the local result is good enough to polish only its prose"""
+        # Client-supplied structures may be malformed; anything unexpected counts as incomplete
+        if not isinstance(structured, dict):
+            return False
+        contact = structured.get("contact_info")
+        found = sum(1 for section in ("experience", "education", "skills") if structured.get(section))
+        return isinstance(contact, dict) and bool(contact.get("name")) and found >= 2
+
+    def _heading(self, line: Dict[str, Any]) -> Optional[str]:
+        text = line["text"]
+        if SEGMENT_SEPARATOR in text or len(text) > 40:
+            return None
+        normalized = re.sub(r"[^a-z ]", "", text.lower().replace("&", " and ")).strip()
+        return HEADING_LOOKUP.get(re.sub(r"\s+", " ", normalized))
+
+    @staticmethod
+    def _body_size(lines: List[Dict[str, Any]]) -> Optional[float]:
+        sizes = Counter()
+        for line in lines:
+            if line.get("size"):
+                sizes[round(line["size"], 1)] += len(line["text"])
+        return sizes.most_common(1)[0][0] if sizes else None
+
+    def _contact_info(self, lines: List[Dict[str, Any]], body_size: Optional[float]) -> Dict[str, Any]:
+        contact: Dict[str, Any] = {}
+        name_line = None
+        if lines and body_size:
+            largest = max(lines, key=lambda line: line.get("size") or 0)
+            if (largest.get("size") or 0) > body_size:
+                name_line = largest
+        for line in lines:
+            tokens = [token for token in CONTACT_SPLIT_PATTERN.split(line["text"]) if token.strip()]
+            leftover = []
+            for token in tokens:
+                if not self._contact_token(token, contact):
+                    leftover.append(token.strip())
+            if (name_line is None and leftover and 1 <= len(leftover[0].split()) <= 5
+                    and not any(char.isdigit() for char in leftover[0])):
+                name_line = {"text": leftover[0]}
+        if name_line is not None:
+            contact["name"] = _clean(name_line["text"].split(SEGMENT_SEPARATOR)[0])
+        return contact
+
+    @staticmethod
+    def _contact_token(token: str, contact: Dict[str, Any]) -> bool:
+        token = token.strip()
+        match = EMAIL_PATTERN.search(token)
+        if match and "email" not in contact:
+            contact["email"] = match.group(0)
+            return True
+        match = LINKEDIN_PATTERN.search(token)
+        if match and "linkedin" not in contact:
+            contact["linkedin"] = match.group(0)
+            return True
+        match = PHONE_PATTERN.search(token)
+        if (match and sum(char.isdigit() for char in match.group(0)) >= 7
+                and not DATE_RANGE_PATTERN.search(match.group(0)) and "phone" not in contact):
+            contact["phone"] = match.group(0).strip()
+            return True
+        match = URL_PATTERN.fullmatch(token)
+        if match and "website" not in contact:
+            contact["website"] = match.group(0)
+            return True
+        match = LOCATION_PATTERN.fullmatch(token)
+        if match and "location" not in contact:
+            contact["location"] = match.group(0)
+            return True
+        return False
+
+    def _is_entry_header(self, lines: List[Dict[str, Any]], index: int, body_size: Optional[float]) -> bool:
+        line = lines[index]
+        if BULLET_PATTERN.match(line["text"]):
+            return False
+        if line.get("bold") or DATE_RANGE_PATTERN.search(line["text"]):
+            return True
+        if body_size and line.get("size") and line["size"] > body_size:
+            return True
+        # A title line directly above the company/date line
+        following = lines[index + 1] if index + 1 < len(lines) else None
+        return bool(
+            following and not BULLET_PATTERN.match(following["text"])
+            and DATE_RANGE_PATTERN.search(following["text"]) and not line["text"].rstrip().endswith(".")
+        )
+
+    def _experience(self, lines: List[Dict[str, Any]], body_size: Optional[float]) -> List[Dict[str, Any]]:
+        entries: List[Dict[str, Any]] = []
+        for index, line in enumerate(lines):
+            text = line["text"]
+            entry = entries[-1] if entries else None
+            if self._is_entry_header(lines, index, body_size):
+                if entry is None or entry["achievements"] or len(entry["headers"]) >= 2:
+                    entries.append({"headers": [], "achievements": []})
+                entries[-1]["headers"].append(text)
+            elif BULLET_PATTERN.match(text) or entry is None:
+                if entry is None:
+                    entry = {"headers": [], "achievements": []}
+                    entries.append(entry)
+                entry["achievements"].append(_prose(text))
+            elif entry["achievements"] and (
+                text[:1].islower() or not entry["achievements"][-1].endswith((".", "!", "?"))
+            ):
+                # Wrapped continuation of the previous bullet
+                entry["achievements"][-1] = f"{entry['achievements'][-1]} {_prose(text)}"
+            else:
+                entry["achievements"].append(_prose(text))
+        return [self._experience_entry(entry) for entry in entries]
+
+    def _experience_entry(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        fields = self._header_fields(entry["headers"])
+        parts = fields.pop("parts")
+        fields["title"] = parts[0] if parts else ""
+        fields["company"] = parts[1] if len(parts) > 1 else ""
+        fields["achievements"] = [text for text in entry["achievements"] if text]
+        return fields
+
+    def _header_fields(self, headers: List[str]) -> Dict[str, Any]:
+        """Pull the date range and location out of entry header lines and split the rest"""
+        fields: Dict[str, Any] = {"duration": "", "location": ""}
+        parts: List[str] = []
+        for header in headers:
+            match = DATE_RANGE_PATTERN.search(header)
+            if match and not fields["duration"]:
+                fields["duration"] = match.group(0)
+                header = header.replace(match.group(0), " | ")
+            for segment in re.split(r"\s+\|\s+|\s*\|\s*$|^\s*\|\s*", header):
+                segment = _clean(segment)
+                if not segment:
+                    continue
+                location = TRAILING_LOCATION_PATTERN.search(segment)
+                if location and not fields["location"]:
+                    fields["location"] = location.group(1)
+                    segment = _clean(segment[:location.start(1)])
+                parts.extend(_clean(part) for part in HEADER_SPLIT_PATTERN.split(segment) if _clean(part))
+        fields["parts"] = parts
+        return fields
+
+    def _education(self, lines: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        entries: List[Dict[str, Any]] = []
+        for line in lines:
+            text = _strip_bullet(line["text"])
+            entry = entries[-1] if entries else None
+            is_degree = bool(DEGREE_PATTERN.search(text))
+            is_school = bool(SCHOOL_PATTERN.search(text))
+            if entry is None or (is_degree and entry.get("degree")) or (
+                is_school and entry.get("school") and not is_degree
+            ):
+                entry = {"degree": "", "school": "", "graduation": "", "location": "", "details": []}
+                entries.append(entry)
+
+            if DETAIL_PATTERN.search(text) and not (is_degree or is_school):
+                entry["details"].append(_clean(text))
+                continue
+            segments = []
+            for segment in text.split(SEGMENT_SEPARATOR):
+                # "Master of Science, Stanford University" holds both degree and school
+                if DEGREE_PATTERN.search(segment) and SCHOOL_PATTERN.search(segment):
+                    segments.extend(HEADER_SPLIT_PATTERN.split(segment))
+                else:
+                    segments.append(segment)
+            for segment in filter(None, map(_clean, segments)):
+                date = DATE_RANGE_PATTERN.search(segment) or DATE_PATTERN.search(segment)
+                if date and not entry["graduation"]:
+                    entry["graduation"] = date.group(0)
+                    segment = _clean(segment.replace(date.group(0), ""))
+                location = LOCATION_PATTERN.fullmatch(segment)
+                if location and not entry["location"]:
+                    entry["location"] = segment
+                elif segment and DEGREE_PATTERN.search(segment) and not entry["degree"]:
+                    entry["degree"] = segment
+                elif segment and not entry["school"] and (SCHOOL_PATTERN.search(segment) or entry["degree"]):
+                    entry["school"] = segment
+                elif segment:
+                    entry["details"].append(segment)
+        for entry in entries:
+            entry["details"] = ", ".join(entry["details"])
+        return entries
+
+    @staticmethod
+    def _list_items(lines: List[Dict[str, Any]], strip_labels: bool = False) -> List[str]:
+        items: List[str] = []
+        for line in lines:
+            for group in LIST_GROUP_PATTERN.split(_strip_bullet(line["text"])):
+                if strip_labels and ":" in group:
+                    # "Languages: Python, Go" -> the items after the label
+                    group = group.split(":", 1)[1]
+                for item in group.split(","):
+                    item = _clean(item)
+                    if item and len(item) <= 80 and item not in items:
+                        items.append(item)
+        return items
@@ -0,0 +1,72 @@
+import copy
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict
+
+from .metrics import LLM_COALESCED_CALLS
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    """A shared call and the number of callers still waiting for it"""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Deduplicate concurrent identical calls. While a call for a key is in flight,
+    later callers with the same key wait for it instead of starting their own,
+    and each gets a deep copy of its result (or its exception).
+
+    The call runs in its own task rather than in the first caller's request, so
+    that caller being cancelled (a client disconnecting) doesn't fail the others.
+    It is cancelled only once every caller waiting for it has gone.
+    """
+
+    def __init__(self, service: str):
+        self.service = service
+        self._calls: Dict[str, _Call] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        call = self._calls.get(key)
+        leader = call is None or call.task.get_loop() is not loop
+        if leader:
+            call = _Call(loop.create_task(fn()))
+            self._calls[key] = call
+            self.calls += 1
+            call.task.add_done_callback(lambda task: self._finished(key, call))
+        else:
+            self.coalesced += 1
+            LLM_COALESCED_CALLS.inc(service=self.service)
+
+        call.waiters += 1
+        try:
+            # Shield so a cancelled caller does not cancel the shared call
+            result = await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Nobody wants the result any more; later callers start afresh
+                self._forget(key, call)
+                call.task.cancel()
+        return result if leader else copy.deepcopy(result)
+
+    def _finished(self, key: str, call: _Call) -> None:
+        self._forget(key, call)
+        # Mark the exception as retrieved in case nobody was waiting
+        if not call.task.cancelled():
+            call.task.exception()
+
+    def _forget(self, key: str, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"calls": self.calls, "coalesced": self.coalesced, "in_flight": len(self._calls)}
@@ -0,0 +1,248 @@
+import os
+import re
+import logging
+import tempfile
+from typing import Any, AsyncIterator, Dict, Optional, Sequence, Set, Union
+
+from multipart.multipart import MultipartParser, parse_options_header
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", 10 * 1024 * 1024))
+UPLOAD_MAX_PAGES = int(os.getenv("UPLOAD_MAX_PAGES", 50))
+# Uploads larger than this are spooled to UPLOAD_TEMP_DIR instead of kept in memory
+UPLOAD_SPOOL_BYTES = int(os.getenv("UPLOAD_SPOOL_BYTES", 1024 * 1024))
+UPLOAD_TEMP_DIR = os.getenv(
+    "UPLOAD_TEMP_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'temp')
+)
+# Limit for text form fields sent alongside the file (e.g. a job description)
+UPLOAD_MAX_FIELD_BYTES = int(os.getenv("UPLOAD_MAX_FIELD_BYTES", 64 * 1024))
+
+PDF_MAGIC = b'%PDF'
+# Object headers ("12 0 obj") and page objects, but not the "/Type /Pages" page tree nodes
+PAGE_OBJECT_PATTERN = re.compile(rb'(?<![0-9])([0-9]+)\s+[0-9]+\s+obj\b|/Type\s*/Page(?![A-Za-z])')
+_PAGE_PATTERN_OVERLAP = 32
+
+
+class UploadRejectedError(Exception):
+    """Raised when an upload is rejected while it is being received"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class PDFUpload:
+    """
+    A received PDF, held in memory when small and spooled to a temp file otherwise.
+    `source` is what PDFService.extract_document accepts: bytes or a file path.
+    """
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.size = 0
+        # Text form fields received with the file
+        self.fields: Dict[str, str] = {}
+        self.path: Optional[str] = None
+        self._buffer = bytearray()
+        self._file = None
+
+    @property
+    def source(self) -> Union[bytes, str]:
+        return self.path if self.path else bytes(self._buffer)
+
+    def write(self, data: bytes) -> None:
+        self.size += len(data)
+        if self._file is None and self.size > UPLOAD_SPOOL_BYTES:
+            os.makedirs(UPLOAD_TEMP_DIR, exist_ok=True)
+            self._file = tempfile.NamedTemporaryFile(
+                dir=UPLOAD_TEMP_DIR, prefix="upload_", suffix=".pdf", delete=False
+            )
+            self.path = self._file.name
+            self._file.write(self._buffer)
+            self._buffer = bytearray()
+        if self._file is not None:
+            self._file.write(data)
+        else:
+            self._buffer.extend(data)
+
+    def finish(self) -> None:
+        if self._file is not None:
+            self._file.close()
+
+    def cleanup(self) -> None:
+        """Remove the spooled file, if any"""
+        self.finish()
+        if self.path and os.path.exists(self.path):
+            try:
+                os.remove(self.path)
+            except OSError as e:
+                logger.error(f"Failed to remove spooled upload {self.path}: {str(e)}")
+
+
+class _PDFUploadReceiver:
+    """Multipart callbacks that check the "file" part while it arrives"""
+
+    def __init__(self, field_name: str, max_bytes: int, max_pages: int, text_fields: Sequence[str] = ()):
+        self.field_name = field_name.encode()
+        self.text_fields = {name.encode() for name in text_fields}
+        self.fields: Dict[str, str] = {}
+        self._text_field: Optional[bytes] = None
+        self._text_value = bytearray()
+        self.max_bytes = max_bytes
+        self.max_pages = max_pages
+        self.upload: Optional[PDFUpload] = None
+        self._in_file_part = False
+        self._header_field = b""
+        self._header_value = b""
+        self._disposition: Dict[bytes, bytes] = {}
+        self._head = b""
+        self._tail = b""
+        # Object numbers of the page objects seen; an incrementally saved PDF
+        # repeats updated pages under the same number, so they count once
+        self._page_objects: Set[bytes] = set()
+        self._current_object = b""
+
+    def callbacks(self) -> Dict[str, Any]:
+        return {
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        }
+
+    def _on_part_begin(self) -> None:
+        self._disposition = {}
+        self._header_field = b""
+        self._header_value = b""
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        if self._header_field.lower() == b"content-disposition":
+            _, self._disposition = parse_options_header(self._header_value)
+        self._header_field = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self) -> None:
+        name = self._disposition.get(b"name")
+        self._text_field = name if name in self.text_fields and b"filename" not in self._disposition else None
+        self._text_value = bytearray()
+        self._in_file_part = (
+            self._disposition.get(b"name") == self.field_name and self.upload is None
+        )
+        if not self._in_file_part:
+            return
+
+        filename = self._disposition.get(b"filename", b"").decode("utf-8", "replace")
+        if not filename.lower().endswith('.pdf'):
+            raise UploadRejectedError(400, "Only PDF files are allowed")
+        self.upload = PDFUpload(filename)
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._text_field is not None:
+            self._text_value.extend(data[start:end])
+            if len(self._text_value) > UPLOAD_MAX_FIELD_BYTES:
+                raise UploadRejectedError(
+                    413, f"Form field {self._text_field.decode()} is too large."
+                )
+            return
+        if not self._in_file_part:
+            return
+        chunk = data[start:end]
+
+        # Check the magic bytes as soon as they arrive
+        if len(self._head) < len(PDF_MAGIC):
+            self._head += chunk[:len(PDF_MAGIC) - len(self._head)]
+            if not PDF_MAGIC.startswith(self._head[:len(PDF_MAGIC)]):
+                raise UploadRejectedError(400, "Invalid PDF file or corrupted file")
+
+        if self.upload.size + len(chunk) > self.max_bytes:
+            raise UploadRejectedError(
+                413, f"PDF is too large. The maximum size is {self.max_bytes // (1024 * 1024)} MB."
+            )
+
+        # Count page objects across chunk boundaries. Pages inside compressed
+        # object streams are invisible here; the exact count is checked on open.
+        window = self._tail + chunk
+        for match in PAGE_OBJECT_PATTERN.finditer(window):
+            if match.end() <= len(self._tail):
+                continue
+            if match.group(1) is not None:
+                self._current_object = match.group(1)
+            else:
+                self._page_objects.add(self._current_object or b"?%d" % len(self._page_objects))
+        self._tail = window[-_PAGE_PATTERN_OVERLAP:]
+        if len(self._page_objects) > self.max_pages:
+            raise UploadRejectedError(
+                413, f"PDF has too many pages. The maximum is {self.max_pages}."
+            )
+
+        self.upload.write(chunk)
+
+    def _on_part_end(self) -> None:
+        if self._text_field is not None:
+            self.fields[self._text_field.decode()] = self._text_value.decode("utf-8", "replace")
+            self._text_field = None
+        if self._in_file_part:
+            self.upload.finish()
+            if len(self._head) < len(PDF_MAGIC):
+                raise UploadRejectedError(400, "Invalid PDF file or corrupted file")
+        self._in_file_part = False
+
+
+async def receive_pdf_upload(
+    content_type: str,
+    content_length: Optional[str],
+    stream: AsyncIterator[bytes],
+    field_name: str = "file",
+    max_bytes: int = UPLOAD_MAX_BYTES,
+    max_pages: int = UPLOAD_MAX_PAGES,
+    text_fields: Sequence[str] = ()
+) -> PDFUpload:
+    """
+    Receive a multipart PDF upload chunk by chunk.
+
+    The declared Content-Length, the %PDF magic bytes, the size limit and an
+    estimated page count (page objects, once per object number, so incremental
+    saves don't inflate it) are all checked while the body is still arriving, so
+    oversized or non-PDF uploads are rejected without being buffered. Small
+    uploads stay in memory; larger ones are spooled to UPLOAD_TEMP_DIR.
+    Text parts named in text_fields are collected into upload.fields.
+    """
+    media_type, params = parse_options_header(content_type or "")
+    boundary = params.get(b"boundary")
+    if media_type != b"multipart/form-data" or not boundary:
+        raise UploadRejectedError(400, "Expected a multipart/form-data upload")
+
+    # Allow some room for the multipart framing around the file
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes + 64 * 1024:
+        raise UploadRejectedError(
+            413, f"PDF is too large. The maximum size is {max_bytes // (1024 * 1024)} MB."
+        )
+
+    receiver = _PDFUploadReceiver(field_name, max_bytes, max_pages, text_fields)
+    parser = MultipartParser(boundary, receiver.callbacks())
+    try:
+        async for chunk in stream:
+            if chunk:
+                parser.write(chunk)
+        parser.finalize()
+    except Exception:
+        if receiver.upload is not None:
+            receiver.upload.cleanup()
+        raise
+
+    if receiver.upload is None:
+        raise UploadRejectedError(400, "No PDF file was uploaded")
+    receiver.upload.fields = receiver.fields
+    return receiver.upload
@@ -0,0 +1,152 @@
+import os
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional, Union
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# PDF_WORKERS=0 runs PDF work inline on the event loop (the old behaviour)
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", os.cpu_count() or 1))
+PDF_WORKER_QUEUE_LIMIT = int(os.getenv("PDF_WORKER_QUEUE_LIMIT", max(PDF_WORKERS, 1) * 4))
+PDF_TASK_TIMEOUT_SECONDS = float(os.getenv("PDF_TASK_TIMEOUT_SECONDS", 30))
+
+
+class WorkerPoolBusyError(Exception):
+    """Raised when the worker queue is full and new work should be rejected"""
+
+
+class WorkerTimeoutError(Exception):
+    """Raised when a worker task does not finish within its timeout"""
+
+
+# Task functions run inside the worker processes, so they must be module-level
+_generator = None
+
+
+def _get_generator():
+    global _generator
+    if _generator is None:
+        from .pdf_generator import PDFGenerator
+        _generator = PDFGenerator()
+    return _generator
+
+
+def _run_captured(fn: Callable, *args: Any):
+    """Run a task in a worker process and return its metrics along with its result"""
+    with metrics.capture() as observations:
+        result = fn(*args)
+    return result, observations
+
+
+def warm_up() -> bool:
+    """Import the PDF libraries and compile the template in this process"""
+    import fitz  # noqa: F401
+    from . import pdf_service  # noqa: F401
+    _get_generator().renderer.warm_up()
+    return True
+
+
+def extract_document_task(
+    source: Union[bytes, str],
+    max_pages: Optional[int] = None,
+    structure: bool = False
+) -> Dict[str, Any]:
+    """
+    Validate and extract a PDF in one pass (see PDFService.extract_document).
+    With structure, also adds "structured_content" from ResumeStructurer.
+    """
+    from .pdf_service import PDFService
+    document = PDFService.extract_document(source, max_pages, with_lines=structure)
+    if structure and document["valid"]:
+        from .resume_structurer import ResumeStructurer
+        with metrics.time_stage("pdf", "structure"):
+            document["structured_content"] = ResumeStructurer().structure(document.pop("lines"))
+    return document
+
+
+def generate_pdf_task(resume_content: Dict[str, Any]) -> bytes:
+    """Render a resume to PDF bytes"""
+    return _get_generator().generate_pdf(resume_content)
+
+
+class WorkerPool:
+    """
+    Process pool for CPU-bound PDF parsing and rendering.
+
+    At most queue_limit tasks may be queued or running at once; beyond that
+    submit() raises WorkerPoolBusyError so the API can shed load with a 503.
+    A timed-out task is abandoned, but the worker process finishes it before
+    taking new work, so it keeps counting against queue_limit until then.
+    """
+
+    def __init__(
+        self,
+        workers: int = PDF_WORKERS,
+        queue_limit: int = PDF_WORKER_QUEUE_LIMIT,
+        timeout: float = PDF_TASK_TIMEOUT_SECONDS
+    ):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.timeout = timeout
+        self.pending = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def start(self) -> None:
+        """Start the worker processes and warm each one up"""
+        if self.workers <= 0 or self._executor is not None:
+            return
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        futures = [self._executor.submit(warm_up) for _ in range(self.workers)]
+        for future in futures:
+            future.result()
+        logger.info(f"PDF worker pool started with {self.workers} processes")
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    async def submit(self, fn: Callable, *args: Any) -> Any:
+        """Run fn(*args) in a worker process, or inline when the pool is disabled"""
+        if self.pending >= self.queue_limit:
+            raise WorkerPoolBusyError("PDF worker queue is full")
+
+        if self.workers <= 0:
+            self.pending += 1
+            try:
+                return fn(*args)
+            finally:
+                self.pending -= 1
+
+        if self._executor is None:
+            self.start()
+        loop = asyncio.get_running_loop()
+        future = self._executor.submit(_run_captured, fn, *args)
+        self.pending += 1
+        # Counted until the worker process is really done with it, not just until we stop waiting
+        future.add_done_callback(lambda _: self._release(loop))
+        try:
+            with metrics.time_stage("worker_pool", fn.__name__):
+                result, observations = await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+            metrics.REGISTRY.replay(observations)
+            return result
+        except asyncio.TimeoutError:
+            logger.error(f"PDF task {fn.__name__} timed out after {self.timeout:.0f}s")
+            raise WorkerTimeoutError(f"PDF task timed out after {self.timeout:.0f}s")
+
+    def _release(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Done-callback of an executor future; runs on the executor's management thread"""
+        try:
+            loop.call_soon_threadsafe(self._decrement)
+        except RuntimeError:
+            # The loop is already closed (shutdown); nothing is waiting on the count any more
+            self._decrement()
+
+    def _decrement(self) -> None:
+        self.pending -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {"workers": self.workers, "pending": self.pending, "queue_limit": self.queue_limit}
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Tests run offline against the fake model backend
+os.environ.setdefault("LLM_BACKEND", "fake")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
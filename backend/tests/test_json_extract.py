@@ -0,0 +1,105 @@
+import json
+import asyncio
+from typing import List
+
+from pydantic import BaseModel
+
+from services.json_extract import IncrementalSectionParser, JSONExtractor, complete_response, extract_json
+
+
+class Resume(BaseModel):
+    summary: str
+    skills: List[str]
+
+
+def test_truncated_object_is_repaired_to_last_complete_member():
+    value, repaired = extract_json('{"summary": "Backend engineer", "skills": ["Python", "Go"], "notes": "cut of')
+
+    assert repaired
+    assert value == {"summary": "Backend engineer", "skills": ["Python", "Go"]}
+
+
+def test_truncated_object_fed_in_chunks_is_repaired_the_same_way():
+    extractor = JSONExtractor()
+    for chunk in ('{"summary": "Backend', ' engineer", "skills": ["Py', 'thon", "Go"], "no'):
+        assert not extractor.feed(chunk)
+
+    assert extractor.result() == {"summary": "Backend engineer", "skills": ["Python", "Go"]}
+    assert extractor.repaired
+
+
+def test_fenced_object_with_prose_around_it():
+    text = 'Here is the {improved} resume:\n```json\n{"summary": "Lead {platform} work", "skills": []}\n```\nDone.'
+
+    value, repaired = extract_json(text)
+
+    assert value == {"summary": "Lead {platform} work", "skills": []}
+    assert not repaired
+
+
+def test_prose_wrapped_object_without_fence():
+    value, repaired = extract_json('Sure! {"summary": "Engineer", "skills": ["SQL"]} Let me know if {anything} else.')
+
+    assert value == {"summary": "Engineer", "skills": ["SQL"]}
+    assert not repaired
+
+
+def test_cut_off_field_is_dropped_then_filled_by_reask():
+    value, repaired = extract_json('{"skills": ["Python", "Kubernetes"], "summary": "Engineer who bui')
+    assert repaired
+    assert value == {"skills": ["Python", "Kubernetes"]}
+
+    asked = []
+
+    async def reask(fields):
+        asked.append(fields)
+        return 'Here you go: {"summary": "Engineer who builds platforms"}'
+
+    missing = asyncio.run(complete_response(value, Resume, reask, "test"))
+
+    assert asked == [["summary"]]
+    assert missing == []
+    assert value == {"skills": ["Python", "Kubernetes"], "summary": "Engineer who builds platforms"}
+
+
+def test_field_still_invalid_after_reask_is_removed():
+    data = {"summary": "Engineer", "skills": "Python"}
+
+    async def reask(fields):
+        return '{"skills": null}'
+
+    missing = asyncio.run(complete_response(data, Resume, reask, "test"))
+
+    assert missing == ["skills"]
+    assert data == {"summary": "Engineer"}
+
+
+def test_section_events_arrive_in_order_across_chunk_boundaries():
+    response = "```json\n" + json.dumps({
+        "summary": "Engineer, \"quoted\" {braces}",
+        "experience": [{"title": "Lead", "achievements": ["Cut costs [30%]"]}, {"title": "Dev"}],
+        "skills": ["Python", "Go"],
+        "match_score": 80,
+    }) + "\n```"
+    parser = IncrementalSectionParser(item_sections=["experience"])
+
+    events = []
+    for offset in range(0, len(response), 7):
+        events.extend(parser.feed(response[offset:offset + 7]))
+
+    assert events == [
+        ("summary", None, 'Engineer, "quoted" {braces}'),
+        ("experience", 0, {"title": "Lead", "achievements": ["Cut costs [30%]"]}),
+        ("experience", 1, {"title": "Dev"}),
+        ("skills", None, ["Python", "Go"]),
+        ("match_score", None, 80),
+    ]
+    assert parser.done
+
+
+def test_section_is_not_emitted_before_it_closes():
+    parser = IncrementalSectionParser()
+
+    assert parser.feed('{"summary": "Eng') == []
+    assert parser.feed('ineer", "skills": ["Python"') == [("summary", None, "Engineer")]
+    assert parser.feed("]}") == [("skills", None, ["Python"])]
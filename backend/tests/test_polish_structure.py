@@ -0,0 +1,41 @@
+import asyncio
+
+import httpx
+
+import main
+from services.resume_structurer import ResumeStructurer
+
+RESUME_TEXT = "Jane Doe\nSoftware Engineer with ten years of experience building web services. " * 3
+STRUCTURE = {
+    "contact_info": None,
+    "summary": "Engineer",
+    "experience": [{"title": "Engineer", "company": "Acme", "achievements": ["Shipped things"]}],
+    "skills": ["Python"],
+}
+
+
+def post(path: str, body: dict) -> httpx.Response:
+    async def send():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post(path, json=body)
+    return asyncio.run(send())
+
+
+def test_null_contact_info_is_incomplete():
+    assert not ResumeStructurer.is_complete(STRUCTURE)
+    assert not ResumeStructurer.is_complete({**STRUCTURE, "contact_info": "Jane Doe"})
+
+
+def test_polish_with_null_contact_info_falls_back_to_the_text():
+    response = post("/api/polish", {"text": RESUME_TEXT, "structured_content": STRUCTURE})
+
+    assert response.status_code == 200
+    assert response.json()["polished_content"]["contact_info"]["name"]
+
+
+def test_incremental_polish_with_null_contact_info_falls_back_to_the_text():
+    response = post("/api/polish/incremental", {"text": RESUME_TEXT, "structured_content": STRUCTURE})
+
+    assert response.status_code == 200
+    assert response.json()["polish_method"] == "full"
@@ -0,0 +1,85 @@
+import os
+import asyncio
+
+import fitz
+import httpx
+import pytest
+
+from services import upload_ingest
+from services.upload_ingest import UploadRejectedError, receive_pdf_upload
+
+BOUNDARY = "testboundary"
+CONTENT_TYPE = f"multipart/form-data; boundary={BOUNDARY}"
+
+
+def make_pdf(pages: int) -> bytes:
+    doc = fitz.open()
+    for number in range(pages):
+        doc.new_page().insert_text((72, 72), f"Page {number + 1} of a resume")
+    return doc.tobytes()
+
+
+def multipart(filename: str, data: bytes) -> bytes:
+    return (
+        f"--{BOUNDARY}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        "Content-Type: application/pdf\r\n\r\n"
+    ).encode() + data + f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+async def chunks(body: bytes, size: int = 64 * 1024):
+    for offset in range(0, len(body), size):
+        yield body[offset:offset + size]
+
+
+def receive(body: bytes, **limits):
+    return asyncio.run(receive_pdf_upload(CONTENT_TYPE, None, chunks(body), **limits))
+
+
+def test_oversize_upload_returns_413_and_removes_spooled_file(tmp_path, monkeypatch):
+    import main
+    monkeypatch.setattr(upload_ingest, "UPLOAD_TEMP_DIR", str(tmp_path))
+    # Past the spool threshold before the size cap, so a temp file exists when it is rejected
+    body = multipart("resume.pdf", b"%PDF-1.4\n" + b"0" * (upload_ingest.UPLOAD_MAX_BYTES + 1))
+
+    async def post():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            # Streamed without a Content-Length, so only the running byte count can catch it
+            return await client.post("/api/upload", content=chunks(body), headers={"Content-Type": CONTENT_TYPE})
+
+    response = asyncio.run(post())
+
+    assert response.status_code == 413
+    assert [name for name in os.listdir(tmp_path) if name.startswith("upload_")] == []
+
+
+def test_non_pdf_body_with_pdf_name_is_rejected():
+    with pytest.raises(UploadRejectedError) as rejected:
+        receive(multipart("resume.pdf", b"PK\x03\x04 this is a zip file"))
+    assert rejected.value.status_code == 400
+
+
+def test_page_limit_is_enforced():
+    with pytest.raises(UploadRejectedError) as rejected:
+        receive(multipart("resume.pdf", make_pdf(3)), max_pages=2)
+    assert rejected.value.status_code == 413
+
+    upload = receive(multipart("resume.pdf", make_pdf(2)), max_pages=2)
+    assert upload.size > 0
+
+
+def test_incrementally_saved_pages_are_counted_once(tmp_path):
+    path = str(tmp_path / "edited.pdf")
+    with open(path, "wb") as f:
+        f.write(make_pdf(2))
+    doc = fitz.open(path)
+    for page in doc:
+        page.insert_text((72, 144), "Edited later")
+    doc.saveIncr()
+    doc.close()
+    with open(path, "rb") as f:
+        data = f.read()
+
+    upload = receive(multipart("resume.pdf", data), max_pages=2)
+    assert upload.size == len(data)